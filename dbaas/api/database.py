@@ -103,6 +103,7 @@ class DatabaseAPI(viewsets.ModelViewSet):
             task_history.task_status = task_history.STATUS_PENDING
             task_history.arguments = "Database name: {}".format(data['name'])
             task_history.save()
+            task_history.add_database_lock(data['name'], data['environment'])
 
             result = create_database.delay(
                 name=data['name'], plan=data['plan'],
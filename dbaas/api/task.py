@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
-from rest_framework import viewsets, serializers
+from rest_framework import viewsets, serializers, status
+from rest_framework.decorators import link
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import filters
 from notification.models import TaskHistory
+from system.models import Configuration
+
+# Seconds a progress request may be held, each one holds a web worker
+PROGRESS_DEFAULT_MAX_WAIT = 5
+PROGRESS_DEFAULT_LIMIT = 500
 
 
 class TaskSerializer(serializers.HyperlinkedModelSerializer):
@@ -27,3 +33,27 @@ class TaskAPI(viewsets.ReadOnlyModelViewSet):
     queryset = TaskHistory.objects.all()
     filter_backends = (filters.DjangoFilterBackend,)
     filter_fields = ('task_id', 'task_status')
+
+    @link()
+    def progress(self, request, pk=None):
+        """
+        Lines added after 'cursor'. With 'wait' the request is held up to
+        that many seconds until new lines arrive or the task finishes
+        """
+        task = self.get_object()
+        try:
+            cursor = int(request.QUERY_PARAMS.get('cursor', 0))
+            wait = int(request.QUERY_PARAMS.get('wait', 0))
+            limit = int(request.QUERY_PARAMS.get('limit', PROGRESS_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'cursor, wait and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_wait = Configuration.get_by_name_as_int(
+            'task_progress_max_wait', default=PROGRESS_DEFAULT_MAX_WAIT)
+        return Response(task.progress(
+            sequence=cursor, timeout=max(min(wait, max_wait), 0),
+            limit=max(min(limit, PROGRESS_DEFAULT_LIMIT), 1)
+        ))
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from django.core.urlresolvers import reverse
+from rest_framework import status
+from notification.models import TaskHistory
+from notification.tests.factory import TaskHistoryFactory
+from . import DbaaSAPITestCase
+
+
+class TaskAPIProgressTestCase(DbaaSAPITestCase):
+
+    def setUp(self):
+        super(TaskAPIProgressTestCase, self).setUp()
+        self.task = TaskHistoryFactory(task_status=TaskHistory.STATUS_RUNNING)
+        for i in range(3):
+            self.task.add_detail('Line {}'.format(i))
+        self.task.flush_logs()
+        self.url = reverse('task-progress', kwargs={'pk': self.task.pk})
+
+    def test_lines_after_cursor(self):
+        response = self.client.get(self.url, {'cursor': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cursor'], 3)
+        self.assertEqual(response.data['task_status'], TaskHistory.STATUS_RUNNING)
+        self.assertEqual(
+            [line['message'] for line in response.data['lines']], ['Line 2']
+        )
+
+    def test_limit(self):
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(response.data['cursor'], 1)
+        self.assertEqual(len(response.data['lines']), 1)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'last'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 from django.contrib import admin
-from ..models import Snapshot, LogConfiguration
+from ..models import Snapshot, LogConfiguration, BackupRun
 from .snapshot import SnapshotAdmin
 from .log_configuration import LogConfigurationAdmin
+from .backup_run import BackupRunAdmin
 
 
 admin.site.register(Snapshot, SnapshotAdmin)
 admin.site.register(LogConfiguration, LogConfigurationAdmin)
+admin.site.register(BackupRun, BackupRunAdmin)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from django.conf.urls import patterns, url
+from django.contrib import admin, messages
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect
+from django.utils.html import format_html
+from notification.models import TaskHistory
+from ..models import BackupRunInstance
+
+
+class BackupRunAdmin(admin.ModelAdmin):
+    actions = None
+    list_display = ("id", "link_task", "success", "warning", "error",
+                    "not_eligible", "created_at", "finished_at",
+                    "backup_run_action")
+    search_fields = ("task__id", "task__task_id")
+    exclude = ("task", "retry_of")
+    readonly_fields = ("link_task", "retry_of", "finished_at")
+
+    def _count(self, backup_run, status):
+        return backup_run.counts()[status]
+
+    def success(self, backup_run):
+        return self._count(backup_run, BackupRunInstance.SUCCESS)
+
+    def warning(self, backup_run):
+        return self._count(backup_run, BackupRunInstance.WARNING)
+
+    def error(self, backup_run):
+        return self._count(backup_run, BackupRunInstance.ERROR)
+
+    def not_eligible(self, backup_run):
+        return self._count(backup_run, BackupRunInstance.SKIPPED)
+
+    def link_task(self, backup_run):
+        url = reverse(
+            'admin:notification_taskhistory_change', args=[backup_run.task_id]
+        )
+        return format_html(
+            "<a href={}>{}</a>".format(url, backup_run.task_id)
+        )
+    link_task.short_description = "Task"
+
+    def backup_run_action(self, backup_run):
+        if not backup_run.finished_at or \
+                backup_run.task_status != TaskHistory.STATUS_ERROR:
+            return 'N/A'
+
+        html = "<a title='Retry' class='btn btn-info' href='{}'>Retry failed</a>"
+        return format_html(html.format(
+            reverse('admin:backup_run_retry', args=[backup_run.id])
+        ))
+    backup_run_action.short_description = "Action"
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def retry(self, request, backup_run_id):
+        from ..tasks import retry_failed_backups
+        backup_run = self.model.objects.get(id=backup_run_id)
+        if not backup_run.finished_at:
+            error = "{} is still running".format(backup_run)
+        elif not backup_run.instances_to_retry():
+            error = "{} has no failed backups".format(backup_run)
+        else:
+            error = None
+        if error:
+            self.message_user(request, error, level=messages.ERROR)
+            url = reverse('admin:backup_backuprun_changelist')
+            return HttpResponseRedirect(url)
+
+        task_history = TaskHistory()
+        task_history.task_name = "retry_failed_backups"
+        task_history.task_status = task_history.STATUS_WAITING
+        task_history.arguments = "Retrying failed backups of {}".format(
+            backup_run
+        )
+        task_history.user = request.user
+        task_history.save()
+
+        retry_failed_backups.delay(
+            backup_run=backup_run, task_history=task_history,
+            user=request.user
+        )
+
+        url = reverse('admin:notification_taskhistory_changelist')
+        return HttpResponseRedirect(url)
+
+    def get_urls(self):
+        urls = super(BackupRunAdmin, self).get_urls()
+        my_urls = patterns(
+            '',
+            url(r'^/?(?P<backup_run_id>\d+)/retry/$',
+                self.admin_site.admin_view(self.retry),
+                name="backup_run_retry"),
+        )
+        return my_urls + urls
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from django.db import models
+from datetime import datetime
+from django.db import models, transaction
+from django.db.models import Count
 import simple_audit
 from django.utils.translation import ugettext_lazy as _
 from util.models import BaseModel
@@ -119,4 +121,174 @@ class LogConfiguration(BaseModel):
         return u"Backup config for %s environment and %s engine type" % (self.environment, self.engine_type)
 
 
+class BackupRun(BaseModel):
+
+    """
+    One backup of many instances split in lanes. Each task backs up the next
+    waiting instance of its lane and the last one to finish sets the status
+    of task with the totals
+    """
+
+    task = models.ForeignKey(
+        'notification.TaskHistory', related_name="backup_runs"
+    )
+    retry_of = models.ForeignKey(
+        'self', related_name="retries", null=True, blank=True,
+        on_delete=models.SET_NULL
+    )
+    finished_at = models.DateTimeField(
+        verbose_name=_("Finished at"), null=True, blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+
+    def __unicode__(self):
+        return u"Backup run %s" % (self.id)
+
+    @classmethod
+    def start(cls, task, lanes, retry_of=None):
+        """ lanes is a list of lists of instances backed up in order """
+        backup_run = cls.objects.create(task=task, retry_of=retry_of)
+        BackupRunInstance.objects.bulk_create([
+            BackupRunInstance(
+                backup_run=backup_run, instance=instance, lane=lane
+            )
+            for lane, instances in enumerate(lanes)
+            for instance in instances
+        ])
+        return backup_run
+
+    def counts(self):
+        """ Number of instances by BackupRunInstance status """
+        counts = dict.fromkeys(dict(BackupRunInstance.STATUS_CHOICES), 0)
+        counts.update(
+            self.instances.values_list('status').annotate(Count('id'))
+        )
+        return counts
+
+    @property
+    def task_status(self):
+        from notification.models import TaskHistory
+        counts = self.counts()
+        if counts[BackupRunInstance.ERROR] or \
+                counts[BackupRunInstance.WAITING] or \
+                counts[BackupRunInstance.RUNNING]:
+            return TaskHistory.STATUS_ERROR
+        if counts[BackupRunInstance.WARNING]:
+            return TaskHistory.STATUS_WARNING
+        return TaskHistory.STATUS_SUCCESS
+
+    @property
+    def summary(self):
+        counts = self.counts()
+        return "Backup finished: {} success, {} warning, {} error, {} not " \
+            "eligible".format(
+                counts[BackupRunInstance.SUCCESS],
+                counts[BackupRunInstance.WARNING],
+                counts[BackupRunInstance.ERROR],
+                counts[BackupRunInstance.SKIPPED],
+            )
+
+    def instances_to_retry(self):
+        """ Instances with error or whose task never finished """
+        return [
+            run_instance.instance for run_instance in self.instances.filter(
+                status__in=BackupRunInstance.NOT_DONE + (
+                    BackupRunInstance.ERROR,
+                )
+            ).select_related('instance__databaseinfra')
+        ]
+
+    def next_instance(self, lane):
+        """
+        Claims the next waiting instance of lane and returns its id, None
+        when the lane is done. A row is claimed by one task only, even when
+        tasks of the same lane are running at the same time
+        """
+        waiting = self.instances.filter(
+            lane=lane, status=BackupRunInstance.WAITING
+        ).order_by('id')
+        for run_instance in waiting:
+            claimed = BackupRunInstance.objects.filter(
+                id=run_instance.id, status=BackupRunInstance.WAITING
+            ).update(status=BackupRunInstance.RUNNING)
+            if claimed:
+                return run_instance.instance_id
+        return None
+
+    def set_result(self, instance, status):
+        """
+        Records the backup of instance, ignoring a repeated delivery of its
+        task. Returns True when it was the last one and the run finished
+        """
+        recorded = self.instances.filter(
+            instance=instance, status__in=BackupRunInstance.NOT_DONE
+        ).update(status=status)
+        if not recorded:
+            return False
+        return self._finish_if_done()
+
+    def give_up(self):
+        """
+        Finishes a run whose tasks were lost, the instances not backed up
+        are errors that can be retried. Returns True when the run finished
+        """
+        self.instances.filter(
+            status__in=BackupRunInstance.NOT_DONE
+        ).update(status=BackupRunInstance.ERROR)
+        return self._finish_if_done()
+
+    def _finish_if_done(self):
+        with transaction.atomic():
+            backup_run = BackupRun.objects.select_for_update().get(pk=self.pk)
+            if backup_run.finished_at or backup_run.instances.filter(
+                status__in=BackupRunInstance.NOT_DONE
+            ).exists():
+                return False
+            backup_run.finished_at = datetime.now()
+            backup_run.save()
+
+        self.finished_at = backup_run.finished_at
+        self.finish()
+        return True
+
+    def finish(self):
+        self.task.update_status_for(
+            self.task_status, details="\n{}".format(self.summary)
+        )
+
+
+class BackupRunInstance(BaseModel):
+
+    WAITING = 0
+    SUCCESS = 1
+    WARNING = 2
+    ERROR = 3
+    SKIPPED = 4
+    RUNNING = 5
+    STATUS_CHOICES = (
+        (WAITING, 'Waiting'),
+        (SUCCESS, 'Success'),
+        (WARNING, 'Warning'),
+        (ERROR, 'Error'),
+        (SKIPPED, 'Not eligible'),
+        (RUNNING, 'Running'),
+    )
+    NOT_DONE = (WAITING, RUNNING)
+
+    backup_run = models.ForeignKey(BackupRun, related_name="instances")
+    instance = models.ForeignKey(
+        'physical.Instance', related_name="backup_runs")
+    status = models.IntegerField(choices=STATUS_CHOICES, default=WAITING)
+    lane = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (
+            ('backup_run', 'instance')
+        )
+
+    def __unicode__(self):
+        return u"Backup of %s on run %s" % (self.instance, self.backup_run_id)
+
+
 simple_audit.register(LogConfiguration)
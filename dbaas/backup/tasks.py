@@ -4,11 +4,12 @@ from dbaas.celery import app
 from util.decorators import only_one
 from physical.models import DatabaseInfra, Plan, Instance
 from logical.models import Database
-from models import Snapshot
+from models import Snapshot, BackupRun, BackupRunInstance
 from notification.models import TaskHistory
 from system.models import Configuration
 import datetime
 import time
+from collections import OrderedDict
 from datetime import date, timedelta
 from util import exec_remote_command
 from dbaas_cloudstack.models import HostAttr as Cloudstack_HostAttr
@@ -23,6 +24,14 @@ from workflow.steps.util.nfsaas_utils import create_snapshot, delete_snapshot, \
 
 LOG = logging.getLogger(__name__)
 
+# Backups running at the same time, in total and in one environment (0 is
+# no limit) and on one NFS filer
+DEFAULT_BACKUP_WORKERS = 4
+DEFAULT_BACKUP_WORKERS_PER_ENVIRONMENT = 0
+DEFAULT_BACKUP_WORKERS_PER_FILER = 1
+# Hours after which a backup run whose tasks were lost is finished
+DEFAULT_BACKUP_RUN_TIMEOUT = 12
+
 
 def set_backup_error(databaseinfra, snapshot, errormsg):
     LOG.error(errormsg)
@@ -117,8 +126,9 @@ def make_instance_snapshot_backup(instance, error):
 
     snapshot_final_status = Snapshot.SUCCESS
 
+    locked = False
+    databaseinfra = instance.databaseinfra
     try:
-        databaseinfra = instance.databaseinfra
         driver = databaseinfra.get_driver()
         client = driver.get_client(instance)
         cloudstack_hostattr = Cloudstack_HostAttr.objects.get(
@@ -208,6 +218,221 @@ def make_instance_snapshot_backup(instance, error):
     return snapshot
 
 
+def get_backup_workers():
+    return Configuration.get_by_name_as_int(
+        'backup_workers', default=DEFAULT_BACKUP_WORKERS
+    )
+
+
+def get_backup_workers_per_environment():
+    return Configuration.get_by_name_as_int(
+        'backup_workers_per_environment',
+        default=DEFAULT_BACKUP_WORKERS_PER_ENVIRONMENT
+    )
+
+
+def get_backup_workers_per_filer():
+    return Configuration.get_by_name_as_int(
+        'backup_workers_per_filer', default=DEFAULT_BACKUP_WORKERS_PER_FILER
+    )
+
+
+def get_backup_run_timeout():
+    return Configuration.get_by_name_as_int(
+        'backup_run_timeout', default=DEFAULT_BACKUP_RUN_TIMEOUT
+    )
+
+
+def get_filer(export_path):
+    """ NFS filer of an export path (filer:/vol/path) """
+    if not export_path:
+        return None
+    return export_path.split(':')[0]
+
+
+def get_instances_filers(instances):
+    """ Filer of the active export of each instance host, by host id """
+    from dbaas_nfsaas.models import HostAttr as Nfsaas_HostAttr
+    exports = Nfsaas_HostAttr.objects.filter(
+        host__in=[instance.hostname_id for instance in instances],
+        is_active=True
+    )
+    return dict(
+        (export.host_id, get_filer(export.nfsaas_path)) for export in exports
+    )
+
+
+def get_backup_lanes(instances, filers, workers, per_environment, per_filer):
+    """
+    Splits instances in lists backed up one after the other. Instances of
+    the same environment are in at most per_environment lists, the ones of
+    the same filer in at most per_filer lists and there are at most workers
+    lists (0 is no limit)
+    """
+    # Each instance takes a slot of its environment and of its filer, the
+    # instances sharing a slot are joined in the same lane
+    parents = {}
+
+    def find(key):
+        while parents.setdefault(key, key) != key:
+            key = parents[key]
+        return key
+
+    counts = {}
+
+    def slot(key, maximum):
+        count = counts.get(key, 0)
+        counts[key] = count + 1
+        return key + (count % maximum,)
+
+    instance_keys = []
+    for instance in instances:
+        keys = [('instance', instance.id)]
+        if per_environment > 0:
+            keys.append(slot(
+                ('environment', instance.databaseinfra.environment_id),
+                per_environment
+            ))
+        filer = filers.get(instance.hostname_id)
+        if filer is not None and per_filer > 0:
+            keys.append(slot(('filer', filer), per_filer))
+
+        root = find(keys[0])
+        for key in keys[1:]:
+            other = find(key)
+            if other != root:
+                parents[other] = root
+        instance_keys.append(keys[0])
+
+    lanes = OrderedDict()
+    for instance, key in zip(instances, instance_keys):
+        lanes.setdefault(find(key), []).append(instance)
+
+    lanes = sorted(lanes.values(), key=len, reverse=True)
+    if workers <= 0 or len(lanes) <= workers:
+        return lanes
+
+    # Lanes are joined, the longest ones first on the shortest joined lane
+    joined = [[] for _ in range(workers)]
+    for lane in lanes:
+        min(joined, key=len).extend(lane)
+    return joined
+
+
+def make_backup_for(instance, task_history):
+    """ Returns (BackupRunInstance status, message) of the backup of instance """
+    try:
+        if not instance.databaseinfra.get_driver().check_instance_is_eligible_for_backup(instance):
+            LOG.info('Instance %s is not eligible for backup' % (str(instance)))
+            return BackupRunInstance.SKIPPED, None
+    except Exception as e:
+        msg = "Backup for %s was unsuccessful. Error: %s" % (
+            str(instance), str(e))
+        LOG.error(msg)
+        return BackupRunInstance.ERROR, msg
+
+    time_now = str(time.strftime("%m/%d/%Y %H:%M:%S"))
+    start_msg = "\n{} - Starting backup for {} ...".format(time_now, instance)
+    task_history.update_details(persist=True, details=start_msg)
+
+    error = {}
+    status = BackupRunInstance.SUCCESS
+    try:
+        snapshot = make_instance_snapshot_backup(
+            instance=instance, error=error
+        )
+        if snapshot and snapshot.was_successful:
+            msg = "Backup for %s was successful" % (str(instance))
+            LOG.info(msg)
+        elif snapshot and snapshot.has_warning:
+            status = BackupRunInstance.WARNING
+            msg = "Backup for %s has warning" % (str(instance))
+            LOG.info(msg)
+        else:
+            status = BackupRunInstance.ERROR
+            msg = "Backup for %s was unsuccessful. Error: %s" % (
+                str(instance), error['errormsg'])
+            LOG.error(msg)
+        LOG.info(msg)
+    except Exception as e:
+        status = BackupRunInstance.ERROR
+        msg = "Backup for %s was unsuccessful. Error: %s" % (
+            str(instance), str(e))
+        LOG.error(msg)
+
+    return status, msg
+
+
+@app.task(acks_late=True)
+def make_instance_backup(backup_run_id, lane):
+    """
+    Backs up the next waiting instance of a lane of a BackupRun and sends
+    the task of the one after it. It never raises. When a task is lost
+    (e.g. its pool process is killed) the rest of its lane is finished as
+    errors by finish_stuck_backup_runs
+    """
+    try:
+        backup_run = BackupRun.objects.select_related('task').get(
+            id=backup_run_id
+        )
+        instance_id = backup_run.next_instance(lane)
+    except Exception as e:
+        LOG.error("Could not get next backup of lane %s of run %s: %s" % (
+            lane, backup_run_id, e))
+        return
+    if instance_id is None:
+        return
+
+    task_history = backup_run.task
+    try:
+        instance = Instance.objects.select_related(
+            'databaseinfra__environment', 'hostname'
+        ).get(id=instance_id)
+        status, msg = make_backup_for(instance, task_history)
+    except Exception as e:
+        status = BackupRunInstance.ERROR
+        msg = "Backup for instance %s was unsuccessful. Error: %s" % (
+            instance_id, str(e))
+        LOG.error(msg)
+
+    try:
+        if msg:
+            time_now = str(time.strftime("%m/%d/%Y %H:%M:%S"))
+            task_history.update_details(
+                persist=True, details="\n{} - {}".format(time_now, msg)
+            )
+        backup_run.set_result(instance_id, status)
+    except Exception as e:
+        LOG.error("Could not record backup of instance %s: %s" % (
+            instance_id, e))
+    finally:
+        make_instance_backup.delay(backup_run_id, lane)
+
+
+def dispatch_backups(task_history, instances, retry_of=None):
+    """ Starts one make_instance_backup task per instance of a new BackupRun """
+    if not instances:
+        task_history.update_status_for(
+            TaskHistory.STATUS_SUCCESS, details="\nThere are no backups to make"
+        )
+        return None
+
+    lanes = get_backup_lanes(
+        instances, get_instances_filers(instances), get_backup_workers(),
+        get_backup_workers_per_environment(), get_backup_workers_per_filer()
+    )
+    backup_run = BackupRun.start(task_history, lanes, retry_of)
+    for lane in range(len(lanes)):
+        make_instance_backup.delay(backup_run.id, lane)
+
+    task_history.update_details(
+        persist=True, details="\n{} backups started in {} lanes".format(
+            len(instances), len(lanes)
+        )
+    )
+    return backup_run
+
+
 @app.task(bind=True)
 @only_one(key="makedatabasebackupkey")
 def make_databases_backup(self):
@@ -217,66 +442,61 @@ def make_databases_backup(self):
     task_history = TaskHistory.register(request=self.request,
                                         worker_name=worker_name, user=None)
 
-    status = TaskHistory.STATUS_SUCCESS
-    databaseinfras = DatabaseInfra.objects.filter(
-        plan__provider=Plan.CLOUDSTACK, plan__has_persistence=True
+    # The lock is released once backups are dispatched, a run still going
+    # on must not have its instances backed up again
+    running = BackupRun.objects.filter(finished_at__isnull=True).first()
+    if running:
+        task_history.update_status_for(
+            TaskHistory.STATUS_WARNING,
+            details="Backups not started, {} is still running".format(running)
+        )
+        return
+
+    instances = list(Instance.objects.filter(
+        databaseinfra__plan__provider=Plan.CLOUDSTACK,
+        databaseinfra__plan__has_persistence=True
+    ).select_related('databaseinfra').order_by('databaseinfra', 'id'))
+
+    # The task finishes when the last backup finishes
+    dispatch_backups(task_history, instances)
+
+    return
+
+
+@app.task(bind=True)
+def retry_failed_backups(self, backup_run, task_history=None, user=None):
+    worker_name = get_worker_name()
+    task_history = TaskHistory.register(
+        request=self.request, task_history=task_history, user=user,
+        worker_name=worker_name
+    )
+    task_history.update_details(
+        persist=True, details="Retrying failed backups of {}".format(backup_run)
     )
-    error = {}
-    backup_number = 0
-    backups_per_group = len(databaseinfras) / 12
-    for databaseinfra in databaseinfras:
-        if backups_per_group > 0:
-            if backup_number < backups_per_group:
-                backup_number += 1
-            else:
-                backup_number = 0
-                waiting_msg = "\nWaiting 5 minutes to start the next backup group"
-                task_history.update_details(persist=True, details=waiting_msg)
-                time.sleep(300)
-
-        instances = Instance.objects.filter(databaseinfra=databaseinfra)
-        for instance in instances:
-            try:
-                if not instance.databaseinfra.get_driver().check_instance_is_eligible_for_backup(instance):
-                    LOG.info('Instance %s is not eligible for backup' % (str(instance)))
-                    continue
-            except Exception as e:
-                status = TaskHistory.STATUS_ERROR
-                msg = "Backup for %s was unsuccessful. Error: %s" % (
-                    str(instance), str(e))
-                LOG.error(msg)
-            else:
-                time_now = str(time.strftime("%m/%d/%Y %H:%M:%S"))
-                start_msg = "\n{} - Starting backup for {} ...".format(time_now, instance)
-                task_history.update_details(persist=True, details=start_msg)
-                try:
-                    snapshot = make_instance_snapshot_backup(
-                        instance=instance, error=error
-                    )
-                    if snapshot and snapshot.was_successful:
-                        msg = "Backup for %s was successful" % (str(instance))
-                        LOG.info(msg)
-                    elif snapshot and snapshot.has_warning:
-                        status = TaskHistory.STATUS_WARNING
-                        msg = "Backup for %s has warning" % (str(instance))
-                        LOG.info(msg)
-                    else:
-                        status = TaskHistory.STATUS_ERROR
-                        msg = "Backup for %s was unsuccessful. Error: %s" % (
-                            str(instance), error['errormsg'])
-                        LOG.error(msg)
-                    LOG.info(msg)
-                except Exception as e:
-                    status = TaskHistory.STATUS_ERROR
-                    msg = "Backup for %s was unsuccessful. Error: %s" % (
-                        str(instance), str(e))
-                    LOG.error(msg)
 
-            time_now = str(time.strftime("%m/%d/%Y %H:%M:%S"))
-            msg = "\n{} - {}".format(time_now, msg)
-            task_history.update_details(persist=True, details=msg)
+    dispatch_backups(
+        task_history, backup_run.instances_to_retry(), retry_of=backup_run
+    )
 
-    task_history.update_status_for(status, details="\nBackup finished")
+    return
+
+
+@app.task(bind=True)
+def finish_stuck_backup_runs(self):
+    """
+    Finishes backup runs still waiting for backups after
+    backup_run_timeout hours, their tasks were lost. Running it again or
+    at the same time as the last backup of a run finishes it only once
+    """
+    deadline = datetime.datetime.now() - timedelta(
+        hours=get_backup_run_timeout()
+    )
+    backup_runs = BackupRun.objects.filter(
+        finished_at__isnull=True, created_at__lte=deadline
+    ).select_related('task')
+    for backup_run in backup_runs:
+        LOG.warning("Finishing stuck {}".format(backup_run))
+        backup_run.give_up()
 
     return
 
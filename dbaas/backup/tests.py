@@ -15,3 +15,236 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+class BackupRunTestCase(TestCase):
+
+    def setUp(self):
+        from notification.tests.factory import TaskHistoryFactory
+        from physical.tests.factory import InstanceFactory
+        from .models import BackupRun
+
+        self.task = TaskHistoryFactory()
+        self.instances = [
+            InstanceFactory(port=port) for port in (27017, 27018, 27019)
+        ]
+        self.backup_run = BackupRun.start(self.task, [self.instances])
+
+    def reload_task(self):
+        from notification.models import TaskHistory
+        return TaskHistory.objects.get(id=self.task.id)
+
+    def test_last_result_finishes_the_task(self):
+        from notification.models import TaskHistory
+        from .models import BackupRunInstance
+
+        first, second, third = self.instances
+        self.assertFalse(
+            self.backup_run.set_result(first, BackupRunInstance.SUCCESS)
+        )
+        self.assertFalse(
+            self.backup_run.set_result(second, BackupRunInstance.WARNING)
+        )
+        # A repeated delivery is not counted again
+        self.assertFalse(
+            self.backup_run.set_result(second, BackupRunInstance.ERROR)
+        )
+        self.assertEqual(self.reload_task().task_status,
+                         TaskHistory.STATUS_PENDING)
+
+        self.assertTrue(
+            self.backup_run.set_result(third, BackupRunInstance.SKIPPED)
+        )
+        self.assertIsNotNone(self.backup_run.finished_at)
+        self.assertEqual(self.reload_task().task_status,
+                         TaskHistory.STATUS_WARNING)
+        self.assertEqual(
+            self.backup_run.summary,
+            "Backup finished: 1 success, 1 warning, 0 error, 1 not eligible"
+        )
+
+    def test_retry_only_failed_instances(self):
+        from notification.models import TaskHistory
+        from .models import BackupRunInstance
+
+        first, second, third = self.instances
+        self.backup_run.set_result(first, BackupRunInstance.SUCCESS)
+        self.backup_run.set_result(second, BackupRunInstance.ERROR)
+
+        self.assertEqual(self.backup_run.task_status, TaskHistory.STATUS_ERROR)
+        self.assertEqual(
+            set(self.backup_run.instances_to_retry()), set([second, third])
+        )
+
+    def test_next_instance_is_claimed_once(self):
+        from .models import BackupRunInstance
+
+        first, second, third = self.instances
+        self.assertEqual(self.backup_run.next_instance(0), first.id)
+        self.assertEqual(self.backup_run.next_instance(0), second.id)
+        self.assertIsNone(self.backup_run.next_instance(1))
+        self.assertEqual(
+            self.backup_run.counts()[BackupRunInstance.RUNNING], 2
+        )
+
+        self.assertFalse(
+            self.backup_run.set_result(first, BackupRunInstance.SUCCESS)
+        )
+        self.assertIn(second, self.backup_run.instances_to_retry())
+
+    def test_lane_backs_up_its_instances_in_order(self):
+        import mock
+        from notification.models import TaskHistory
+        from . import tasks
+        from .models import BackupRunInstance
+
+        backed_up = []
+
+        def make_backup_for(instance, task_history):
+            backed_up.append(instance)
+            if len(backed_up) == 2:
+                raise EnvironmentError('filer is down')
+            return BackupRunInstance.SUCCESS, 'ok'
+
+        # Each task sends the next one of the lane, run here one by one
+        with mock.patch.object(tasks, 'make_backup_for', new=make_backup_for), \
+                mock.patch.object(tasks.make_instance_backup, 'delay') as delay:
+            delay.side_effect = tasks.make_instance_backup
+            tasks.make_instance_backup(self.backup_run.id, 0)
+
+        self.assertEqual(backed_up, self.instances)
+        self.assertEqual(self.backup_run.counts()[BackupRunInstance.ERROR], 1)
+        self.assertEqual(self.reload_task().task_status,
+                         TaskHistory.STATUS_ERROR)
+
+    def test_unknown_backup_run(self):
+        import mock
+        from . import tasks
+
+        with mock.patch.object(tasks.make_instance_backup, 'delay') as delay:
+            tasks.make_instance_backup(0, 0)
+
+        self.assertFalse(delay.called)
+
+    def test_stuck_backup_run_is_finished(self):
+        from datetime import datetime, timedelta
+        from notification.models import TaskHistory
+        from . import tasks
+        from .models import BackupRun, BackupRunInstance
+
+        first, second, third = self.instances
+        self.backup_run.next_instance(0)
+        self.backup_run.set_result(first, BackupRunInstance.SUCCESS)
+        self.backup_run.next_instance(0)
+        recent = BackupRun.start(self.task, [[first]])
+        BackupRun.objects.filter(id=self.backup_run.id).update(
+            created_at=datetime.now() - timedelta(days=1)
+        )
+
+        tasks.finish_stuck_backup_runs()
+
+        backup_run = BackupRun.objects.get(id=self.backup_run.id)
+        self.assertIsNotNone(backup_run.finished_at)
+        self.assertEqual(backup_run.counts()[BackupRunInstance.ERROR], 2)
+        self.assertEqual(
+            set(backup_run.instances_to_retry()), set([second, third])
+        )
+        self.assertEqual(self.reload_task().task_status,
+                         TaskHistory.STATUS_ERROR)
+        self.assertIsNone(BackupRun.objects.get(id=recent.id).finished_at)
+
+    def test_no_backups_while_a_run_is_unfinished(self):
+        import mock
+        from notification.models import TaskHistory
+        from notification.tests.factory import TaskHistoryFactory
+        from . import tasks
+
+        task = TaskHistoryFactory()
+        with mock.patch('util.decorators.REDIS_CLIENT'), \
+                mock.patch.object(tasks, 'get_worker_name'), \
+                mock.patch.object(
+                    tasks.TaskHistory, 'register', return_value=task
+                ), \
+                mock.patch.object(tasks, 'dispatch_backups') as dispatch:
+            tasks.make_databases_backup()
+            self.assertFalse(dispatch.called)
+
+            self.backup_run.give_up()
+            tasks.make_databases_backup()
+            self.assertTrue(dispatch.called)
+
+        self.assertEqual(task.task_status, TaskHistory.STATUS_WARNING)
+
+    def test_dispatch_in_lanes(self):
+        import mock
+        from notification.tests.factory import TaskHistoryFactory
+        from . import tasks
+
+        with mock.patch.object(tasks.make_instance_backup, 'delay') as delay, \
+                mock.patch.object(tasks, 'get_backup_workers', new=lambda: 2):
+            backup_run = tasks.dispatch_backups(
+                TaskHistoryFactory(), self.instances
+            )
+
+        self.assertEqual(backup_run.instances.count(), 3)
+        self.assertEqual(
+            sorted(call[0] for call in delay.call_args_list),
+            [(backup_run.id, 0), (backup_run.id, 1)]
+        )
+        self.assertEqual(
+            sorted(backup_run.instances.values_list('lane', flat=True)),
+            [0, 0, 1]
+        )
+
+
+class BackupLanesTestCase(TestCase):
+
+    def instance(self, id, host_id, environment_id=1):
+        import mock
+        instance = mock.Mock(id=id, hostname_id=host_id)
+        instance.databaseinfra.environment_id = environment_id
+        return instance
+
+    def lane_ids(self, lanes):
+        return [[instance.id for instance in lane] for lane in lanes]
+
+    def test_lanes_per_filer(self):
+        from .tasks import get_backup_lanes
+
+        instances = [self.instance(n, n) for n in range(6)]
+        filers = {0: 'filer_a', 1: 'filer_a', 2: 'filer_a', 3: 'filer_b'}
+
+        lanes = get_backup_lanes(instances, filers, 0, 0, 1)
+
+        self.assertEqual(self.lane_ids(lanes), [[0, 1, 2], [3], [4], [5]])
+
+    def test_lanes_per_environment(self):
+        from .tasks import get_backup_lanes
+
+        instances = [self.instance(n, n, n % 2) for n in range(6)]
+
+        lanes = get_backup_lanes(instances, {}, 0, 1, 0)
+
+        self.assertEqual(self.lane_ids(lanes), [[0, 2, 4], [1, 3, 5]])
+
+    def test_lanes_per_environment_and_filer(self):
+        from .tasks import get_backup_lanes
+
+        # Environment 0 has instances 0, 1 and 2, environment 1 has 3 and 4
+        instances = [self.instance(n, n, n // 3) for n in range(5)]
+        filers = {2: 'filer_a', 3: 'filer_a'}
+
+        lanes = get_backup_lanes(instances, filers, 0, 2, 1)
+
+        self.assertEqual(self.lane_ids(lanes), [[0, 2, 3], [1], [4]])
+
+    def test_lanes_are_joined_up_to_workers(self):
+        from .tasks import get_backup_lanes
+
+        instances = [self.instance(n, n) for n in range(6)]
+        filers = dict((n, 'filer_a') for n in range(4))
+
+        lanes = get_backup_lanes(instances, filers, 2, 0, 2)
+
+        self.assertEqual(len(lanes), 2)
+        self.assertEqual(sorted(len(lane) for lane in lanes), [3, 3])
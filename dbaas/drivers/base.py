@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 import logging
+from contextlib import contextmanager
 from django.utils.translation import ugettext_lazy as _
 from django_services.service.exceptions import InternalException
 
 LOG = logging.getLogger(__name__)
 
-__all__ = ['GenericDriverError', 'ConnectionError',
+__all__ = ['GenericDriverError', 'ConnectionError', 'CircuitOpenError',
            'AuthenticationError', 'DatabaseAlreadyExists', 'CredentialAlreadyExists', 'InvalidCredential',
            'BaseDriver', 'DatabaseStatus', 'DatabaseInfraStatus', 'DatabaseDoesNotExist']
 
@@ -34,6 +35,12 @@ class ConnectionError(GenericDriverError):
     pass
 
 
+class CircuitOpenError(ConnectionError):
+
+    """ Raised without connecting when databaseinfra is known to be unreachable """
+    pass
+
+
 class AuthenticationError(ConnectionError):
 
     """ Raised when there is any problem authenticating on databaseinfra """
@@ -96,6 +103,76 @@ class BaseDriver(object):
             self.replication_topology.class_path
         )
 
+    @contextmanager
+    def circuit(self, instance=None):
+        """
+        Fails fast while the databaseinfra (or instance) is unreachable.
+        Calls inside circuit_breaker.bypass() are not checked nor counted
+        """
+        from .circuit_breaker import CircuitBreaker, is_bypassed
+
+        if is_bypassed():
+            yield
+            return
+
+        breaker = CircuitBreaker(self.databaseinfra, instance)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                'Circuit open for databaseinfra %s' % (instance or self.databaseinfra))
+
+        try:
+            yield
+        except Exception as e:
+            if self.is_connection_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        else:
+            breaker.record_success()
+
+    def is_connection_failure(self, error):
+        """ Tells if error means that the databaseinfra could not be reached """
+        return False
+
+    @contextmanager
+    def pooled_client(self, instance, signature, create):
+        """
+        Yields a client reused from the connection pool of the databaseinfra
+        (or instance), create is called when there is no idle client.
+        Signature must change when addresses or credentials change
+        """
+        from .connection_pool import get_pool
+
+        if not self.databaseinfra.pk:
+            client = create()
+            try:
+                yield client
+            finally:
+                self.close_client(client)
+            return
+
+        pool = get_pool(
+            (type(self).__name__, self.databaseinfra.pk,
+             instance.pk if instance else None),
+            self.close_client, self.is_client_healthy
+        )
+        connection = pool.checkout(signature, create)
+        try:
+            yield connection.client
+        except Exception as e:
+            pool.checkin(connection, broken=self.is_connection_failure(e))
+            raise
+        else:
+            pool.checkin(connection)
+
+    def close_client(self, client):
+        client.close()
+
+    def is_client_healthy(self, client):
+        """ Checks a pooled client idle for a while before reusing it """
+        return True
+
     def test_connection(self, credential=None):
         """ Tests the connection to the database """
         raise NotImplementedError()
@@ -253,26 +330,28 @@ class BaseDriver(object):
             )
 
     def check_replication_and_switch(self, instance, attempts=100):
-        from time import sleep
-        for attempt in range(0, attempts):
-            if self.is_replication_ok(instance):
-                self.switch_master()
-                LOG.info("Switch master returned ok...")
-
-                check_is_master_attempts = attempts
-                while self.check_instance_is_master(instance):
-                    if check_is_master_attempts == 0:
-                        break
-                    check_is_master_attempts -= 1
-                    sleep(10)
-                else:
-                    return
-
-                raise Exception("Could not change master")
-
-            LOG.info("Waiting 10s to check replication...")
-            sleep(10)
-        raise Exception("Could not switch master because of replication's delay")
+        from util.wait import wait_until
+        timeout = attempts * 10
+
+        replication_ok = wait_until(
+            lambda: self.is_replication_ok(instance), timeout=timeout,
+            max_interval=10, description='Replication of {}'.format(instance)
+        )
+        if not replication_ok:
+            raise Exception(
+                "Could not switch master because of replication's delay"
+            )
+
+        self.switch_master()
+        LOG.info("Switch master returned ok...")
+
+        master_changed = wait_until(
+            lambda: not self.check_instance_is_master(instance),
+            timeout=timeout, max_interval=10,
+            description='Master switch of {}'.format(instance)
+        )
+        if not master_changed:
+            raise Exception("Could not change master")
 
     def get_database_agents(self):
         """ Returns database agents list"""
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from redis.exceptions import RedisError
+from system.models import Configuration
+from util.decorators import REDIS_CLIENT
+
+LOG = logging.getLogger(__name__)
+
+STATE_KEY = "driver:circuit:{}"
+PROBE_KEY = "driver:circuit:{}:probe"
+
+DEFAULT_FAILURES = 3
+DEFAULT_BACKOFF = 30
+DEFAULT_MAX_BACKOFF = 600
+
+_local = threading.local()
+
+
+@contextmanager
+def bypass():
+    """
+    Calls made by the current thread inside the block neither wait for nor
+    change the circuits, e.g. workflows checking a database that is
+    expected to be down while it restarts
+    """
+    previous = is_bypassed()
+    _local.bypass = True
+    try:
+        yield
+    finally:
+        _local.bypass = previous
+
+
+def is_bypassed():
+    return getattr(_local, 'bypass', False)
+
+
+class CircuitBreaker(object):
+
+    """
+    Tracks consecutive connection failures of an infra or of an instance.
+    After 'circuit_breaker_failures' failures the circuit opens and calls
+    fail fast for 'circuit_breaker_backoff' seconds. Then a single call is
+    let through as a probe: if it fails the circuit opens again doubling the
+    backoff (up to 'circuit_breaker_max_backoff'), if it works the circuit
+    is closed. The state is kept in a Redis hash to be shared by all
+    processes, failures are counted with HINCRBY so concurrent failures are
+    never lost.
+    """
+
+    def __init__(self, databaseinfra, instance=None):
+        # Objects not saved yet (e.g. being validated) have no circuit
+        self.target = None
+        if instance:
+            if instance.pk:
+                self.target = 'instance:{}'.format(instance.pk)
+        elif databaseinfra and databaseinfra.pk:
+            self.target = 'infra:{}'.format(databaseinfra.pk)
+        self.name = instance or databaseinfra
+        self.state = None
+        self.is_probe = False
+
+    @property
+    def state_key(self):
+        return STATE_KEY.format(self.target)
+
+    @property
+    def probe_key(self):
+        return PROBE_KEY.format(self.target)
+
+    @property
+    def failures_to_open(self):
+        return Configuration.get_by_name_as_int(
+            'circuit_breaker_failures', default=DEFAULT_FAILURES
+        )
+
+    @property
+    def backoff(self):
+        return Configuration.get_by_name_as_int(
+            'circuit_breaker_backoff', default=DEFAULT_BACKOFF
+        )
+
+    @property
+    def max_backoff(self):
+        return Configuration.get_by_name_as_int(
+            'circuit_breaker_max_backoff', default=DEFAULT_MAX_BACKOFF
+        )
+
+    def load(self):
+        state = REDIS_CLIENT.hgetall(self.state_key)
+        if not state:
+            self.state = None
+            return self.state
+
+        # The circuit is opened right after the failure that reaches the
+        # limit is counted, in between it is not half open yet
+        self.state = {
+            'failures': int(state.get('failures', 0)),
+            'backoff': int(state.get('backoff', 0)),
+            'open_until': float(state.get('open_until', 'inf')),
+        }
+        return self.state
+
+    def allow(self):
+        """ Returns False when the call must fail fast """
+        if not self.target:
+            return True
+
+        try:
+            state = self.load()
+        except RedisError as e:
+            LOG.debug("Circuit breaker is not available: {}".format(e))
+            return True
+
+        if not state or state['failures'] < self.failures_to_open:
+            return True
+
+        if state['open_until'] > time.time():
+            return False
+
+        # Half open, only one call probes the target
+        try:
+            self.is_probe = bool(REDIS_CLIENT.set(
+                self.probe_key, 1, ex=self.max_backoff, nx=True
+            ))
+        except RedisError:
+            return True
+        return self.is_probe
+
+    def record_success(self):
+        if not self.state and not self.is_probe:
+            return
+
+        try:
+            REDIS_CLIENT.delete(self.state_key, self.probe_key)
+        except RedisError as e:
+            LOG.debug("Circuit breaker is not available: {}".format(e))
+
+        if self.state and self.state['failures'] >= self.failures_to_open:
+            LOG.info("Circuit closed for {}".format(self.name))
+        self.state = None
+        self.is_probe = False
+
+    def record_failure(self):
+        if not self.target:
+            return
+
+        failures_to_open = self.failures_to_open
+        try:
+            failures = REDIS_CLIENT.hincrby(self.state_key, 'failures', 1)
+            REDIS_CLIENT.expire(self.state_key, self.max_backoff * 2)
+
+            # Only the failure reaching the limit or the failed probe opens
+            # the circuit, failures of calls made before it opened are
+            # just counted
+            if failures == failures_to_open or \
+                    (self.is_probe and failures > failures_to_open):
+                backoff = int(REDIS_CLIENT.hget(self.state_key, 'backoff') or 0)
+                if backoff:
+                    backoff = min(backoff * 2, self.max_backoff)
+                else:
+                    backoff = self.backoff
+                REDIS_CLIENT.hmset(self.state_key, {
+                    'backoff': backoff, 'open_until': time.time() + backoff
+                })
+                LOG.warning("Circuit open for {} during {} seconds".format(
+                    self.name, backoff
+                ))
+
+            if self.is_probe:
+                REDIS_CLIENT.delete(self.probe_key)
+        except RedisError as e:
+            LOG.debug("Circuit breaker is not available: {}".format(e))
+
+        self.state = None
+        self.is_probe = False
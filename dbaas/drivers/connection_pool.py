@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import threading
+import time
+from system.models import Configuration
+
+LOG = logging.getLogger(__name__)
+
+# Idle connections kept by pool
+DEFAULT_MAX_SIZE = 5
+# Seconds that an idle connection is kept before being closed
+DEFAULT_IDLE_TIMEOUT = 300
+# Seconds idle after which a connection is checked before being reused
+DEFAULT_CHECK_INTERVAL = 30
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def get_max_size():
+    return Configuration.get_by_name_as_int(
+        'driver_pool_max_size', default=DEFAULT_MAX_SIZE
+    )
+
+
+def get_idle_timeout():
+    return Configuration.get_by_name_as_int(
+        'driver_pool_idle_timeout', default=DEFAULT_IDLE_TIMEOUT
+    )
+
+
+def get_check_interval():
+    return Configuration.get_by_name_as_int(
+        'driver_pool_check_interval', default=DEFAULT_CHECK_INTERVAL
+    )
+
+
+class PooledConnection(object):
+
+    def __init__(self, client, signature):
+        self.client = client
+        self.signature = signature
+        self.last_used = time.time()
+
+    @property
+    def idle_time(self):
+        return time.time() - self.last_used
+
+
+class ConnectionPool(object):
+
+    """
+    Keeps the connections of one databaseinfra (or instance) opened to be
+    reused by the process. The signature holds what the connections were
+    created with (addresses, credentials), when it changes every connection
+    is closed and new ones are created.
+    """
+
+    def __init__(self, key, close, is_healthy):
+        self.key = key
+        self.close = close
+        self.is_healthy = is_healthy
+        self.signature = None
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def discard(self, connection):
+        try:
+            self.close(connection.client)
+        except Exception:
+            LOG.warn('Error closing pooled connection %s. Ignoring...',
+                     self.key, exc_info=True)
+
+    def evict(self, signature):
+        """ Removes idle connections outdated or idle for too long """
+        idle_timeout = get_idle_timeout()
+        evicted, kept = [], []
+        for connection in self.idle:
+            if connection.signature != signature or \
+                    connection.idle_time > idle_timeout:
+                evicted.append(connection)
+            else:
+                kept.append(connection)
+        self.idle = kept
+        return evicted
+
+    def invalidate(self):
+        with self.lock:
+            evicted, self.idle = self.idle, []
+            self.signature = None
+        for connection in evicted:
+            self.discard(connection)
+
+    def checkout(self, signature, create):
+        with self.lock:
+            if signature != self.signature:
+                LOG.debug('Connection pool %s changed, renewing', self.key)
+                self.signature = signature
+            evicted = self.evict(signature)
+        for connection in evicted:
+            self.discard(connection)
+
+        check_interval = get_check_interval()
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                connection = self.idle.pop()
+
+            if connection.idle_time < check_interval:
+                return connection
+            if self.is_healthy(connection.client):
+                return connection
+            LOG.debug('Discarding broken connection from %s', self.key)
+            self.discard(connection)
+
+        return PooledConnection(create(), signature)
+
+    def checkin(self, connection, broken=False):
+        with self.lock:
+            reuse = not broken and connection.signature == self.signature and \
+                len(self.idle) < get_max_size()
+            if reuse:
+                connection.last_used = time.time()
+                self.idle.append(connection)
+        if not reuse:
+            self.discard(connection)
+
+
+def get_pool(key, close, is_healthy):
+    with POOLS_LOCK:
+        pool = POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(key, close, is_healthy)
+            POOLS[key] = pool
+        return pool
+
+
+def invalidate(databaseinfra_id):
+    """ Closes every connection of databaseinfra kept by this process """
+    with POOLS_LOCK:
+        pools = [
+            pool for key, pool in POOLS.items() if key[1] == databaseinfra_id
+        ]
+    for pool in pools:
+        pool.invalidate()
+
+
+def clear():
+    with POOLS_LOCK:
+        pools = POOLS.values()
+        POOLS.clear()
+    for pool in pools:
+        pool.invalidate()
@@ -132,17 +132,35 @@ class MongoDB(BaseDriver):
     def unlock_database(self, client):
         client.unlock()
 
+    def is_connection_failure(self, error):
+        # clients connect lazily, failures come from the commands
+        if isinstance(error, AuthenticationError):
+            return False
+        return isinstance(error, (pymongo.errors.ConnectionFailure, ConnectionError))
+
+    def is_client_healthy(self, client):
+        try:
+            client.admin.command('ping')
+            return True
+        except pymongo.errors.PyMongoError:
+            return False
+
+    def __pool_signature(self, instance):
+        return (self.__get_admin_connection(instance),
+                self.databaseinfra.user, self.databaseinfra.password)
+
     @contextmanager
     def pymongo(self, instance=None, database=None):
-        client = None
         try:
-            client = self.__mongo_client__(instance)
-
-            if database is None:
-                return_value = client
-            else:
-                return_value = getattr(client, database.name)
-            yield return_value
+            with self.circuit(instance), self.pooled_client(
+                instance, self.__pool_signature(instance),
+                lambda: self.__mongo_client__(instance)
+            ) as client:
+                if database is None:
+                    return_value = client
+                else:
+                    return_value = getattr(client, database.name)
+                yield return_value
         except pymongo.errors.OperationFailure, e:
             if e.code == 18:
                 raise AuthenticationError('Invalid credentials to databaseinfra %s: %s' %
@@ -152,13 +170,6 @@ class MongoDB(BaseDriver):
         except pymongo.errors.PyMongoError, e:
             raise ConnectionError('Error connecting to databaseinfra %s (%s): %s' %
                                   (self.databaseinfra, self.__get_admin_connection(), e.message))
-        finally:
-            try:
-                if client:
-                    client.close()
-            except:
-                LOG.warn('Error disconnecting from databaseinfra %s. Ignoring...',
-                         self.databaseinfra, exc_info=True)
 
     def check_status(self, instance=None):
         with self.pymongo(instance=instance) as client:
@@ -186,10 +197,23 @@ class MongoDB(BaseDriver):
                     'Error connection to databaseinfra %s: %s' % (self.databaseinfra, e.message))
 
     def info(self):
+        """
+        Collects the infra status on a single connection: one ping, one
+        listDatabases and one dbStats for each database that exists.
+        dbStats may be read from a secondary setting
+        'mongodb_info_from_secondary' to 1
+        """
         databaseinfra_status = DatabaseInfraStatus(
             databaseinfra_model=self.databaseinfra)
 
+        if Configuration.get_by_name_as_int('mongodb_info_from_secondary', default=0):
+            read_preference = pymongo.ReadPreference.SECONDARY_PREFERRED
+        else:
+            read_preference = pymongo.ReadPreference.PRIMARY
+
         with self.pymongo() as client:
+            ok = client.admin.command('ping')
+            is_alive = not isinstance(ok, dict) or ok.get('ok', 0) == 1.0
             json_server_info = client.server_info()
             json_list_databases = client.admin.command('listDatabases')
 
@@ -198,26 +222,28 @@ class MongoDB(BaseDriver):
             databaseinfra_status.used_size_in_bytes = json_list_databases.get(
                 'totalSize', 0)
 
-            list_databases = self.list_databases()
+            list_databases = set(
+                db['name'] for db in json_list_databases['databases']
+            )
             for database in self.databaseinfra.databases.all():
                 database_name = database.name
-                json_db_status = getattr(
-                    client, database_name).command('dbStats')
                 db_status = DatabaseStatus(database)
-                # is_alive?
-                try:
-                    if self.check_status() and (database_name in list_databases):
-                        db_status.is_alive = True
-                except:
-                    pass
-
-                storageSize = json_db_status.get("storageSize") or 0
-                db_status.used_size_in_bytes = storageSize
-                db_status.total_size_in_bytes = json_db_status.get(
-                    "fileSize") or 0
+                db_status.used_size_in_bytes = 0
+                db_status.total_size_in_bytes = 0
                 databaseinfra_status.databases_status[
                     database_name] = db_status
 
+                if database_name not in list_databases:
+                    continue
+
+                db_status.is_alive = is_alive
+                json_db_status = client[database_name].command(
+                    'dbStats', read_preference=read_preference)
+                db_status.used_size_in_bytes = json_db_status.get(
+                    "storageSize") or 0
+                db_status.total_size_in_bytes = json_db_status.get(
+                    "fileSize") or 0
+
         return databaseinfra_status
 
     def create_user(self, credential, roles=["readWrite", "dbAdmin"]):
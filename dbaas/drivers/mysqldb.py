@@ -15,6 +15,7 @@ from . import InvalidCredential
 from . import DatabaseStatus
 from . import DatabaseDoesNotExist
 from . import CredentialAlreadyExists
+from physical.status_cache import get_driver_cache, set_driver_cache
 from util import make_db_random_password
 from system.models import Configuration
 from util import exec_remote_command
@@ -28,10 +29,12 @@ ER_ACCESS_DENIED_ERROR = 1045
 ER_CANNOT_USER = 1396
 ER_WRONG_STRING_LENGTH = 1470
 ER_CAN_NOT_CONNECT = 2003
+SERVER_GONE_AWAY = 2006
 LOST_CONNECTION = 2013
 
 CLONE_DATABASE_SCRIPT_NAME = "mysql_clone.sh"
 MYSQL_CONNECTION_DEFAULT_TIMEOUT = 5
+MYSQL_SIZES_DEFAULT_CACHE_TIME = 300
 
 
 class MySQL(BaseDriver):
@@ -94,29 +97,38 @@ class MySQL(BaseDriver):
     def unlock_database(self, client):
         client.query("unlock tables")
 
+    def is_connection_failure(self, error):
+        return isinstance(error, _mysql_exceptions.OperationalError) and \
+            error.args[0] in (ER_CAN_NOT_CONNECT, SERVER_GONE_AWAY, LOST_CONNECTION)
+
+    def is_client_healthy(self, client):
+        try:
+            client.ping()
+            return True
+        except _mysql_exceptions.MySQLError:
+            return False
+
+    def __pool_signature(self, instance):
+        return (self.__get_admin_connection(instance),
+                self.databaseinfra.user, self.databaseinfra.password)
+
     @contextmanager
     def mysqldb(self, instance=None, database=None):
-        client = None
         try:
-            yield self.__mysql_client__(instance)
+            with self.circuit(instance), self.pooled_client(
+                instance, self.__pool_signature(instance),
+                lambda: self.__mysql_client__(instance)
+            ) as client:
+                yield client
         except _mysql_exceptions.OperationalError as e:
             if e.args[0] == ER_ACCESS_DENIED_ERROR:
                 raise AuthenticationError(e.args[1])
             elif e.args[0] == ER_CAN_NOT_CONNECT:
                 raise ConnectionError(e.args[1])
-            elif e.args[0] == LOST_CONNECTION:
+            elif e.args[0] in (SERVER_GONE_AWAY, LOST_CONNECTION):
                 raise ConnectionError(e.args[1])
             else:
                 raise GenericDriverError(e.args)
-        finally:
-            try:
-                if client:
-                    LOG.debug(
-                        'Disconnecting mysql databaseinfra %s', self.databaseinfra)
-                    client.close()
-            except:
-                LOG.warn('Error disconnecting from databaseinfra %s. Ignoring...',
-                         self.databaseinfra, exc_info=True)
 
     def __query(self, query_string, instance=None):
         with self.mysqldb(instance=instance) as client:
@@ -140,6 +152,9 @@ class MySQL(BaseDriver):
                     raise InvalidCredential(e.args[1])
                 elif e.args[0] == ER_WRONG_STRING_LENGTH:
                     raise InvalidCredential(e.args[1])
+                elif self.is_connection_failure(e):
+                    # the connection is discarded by the pool
+                    raise
                 else:
                     raise GenericDriverError(e.args)
             except Exception as e:
@@ -148,50 +163,58 @@ class MySQL(BaseDriver):
     def query(self, query_string, instance=None):
         return self.__query(query_string, instance)
 
-    def info(self):
-        from logical.models import Database
+    def __databases_size(self):
+        """
+        Bytes used by each schema. Reading table sizes makes MySQL open every
+        table, so sizes are shared by all processes for
+        'mysql_info_size_cache_time' seconds or until a forced refresh
+        """
+        cache_time = Configuration.get_by_name_as_int(
+            'mysql_info_size_cache_time', default=MYSQL_SIZES_DEFAULT_CACHE_TIME)
+        if self.databaseinfra.pk and cache_time:
+            sizes = get_driver_cache(self.databaseinfra.pk, 'mysql.sizes')
+            if sizes is not None:
+                return sizes
+
+        # Virtual schemas have no data on disk and are skipped
+        db_sizes = self.__query("SELECT table_schema 'Database', ifnull(SUM(data_length + index_length), 0) 'Size' \
+                                FROM information_schema.TABLES \
+                                WHERE table_schema NOT IN ('information_schema', 'performance_schema') \
+                                GROUP BY table_schema")
+
+        sizes = {}
+        for database in db_sizes or []:
+            sizes[database['Database']] = int(database['Size'])
+
+        if self.databaseinfra.pk and cache_time:
+            set_driver_cache(
+                self.databaseinfra.pk, 'mysql.sizes', sizes, cache_time
+            )
+        return sizes
 
+    def info(self):
         databaseinfra_status = DatabaseInfraStatus(
             databaseinfra_model=self.databaseinfra)
 
         r = self.__query("SELECT VERSION()")
         databaseinfra_status.version = r[0]['VERSION()']
 
-        my_all_dbs = self.__query("SHOW DATABASES")
-        db_sizes = self.__query("SELECT s.schema_name 'Database', ifnull(SUM( t.data_length + t.index_length), 0) 'Size' \
-                                FROM information_schema.SCHEMATA s \
-                                  left outer join information_schema.TABLES t on s.schema_name = t.table_schema \
-                                GROUP BY s.schema_name")
+        # The queries above and below succeed only if infra is alive
+        list_databases = self.list_databases()
+        all_dbs = self.__databases_size()
 
-        all_dbs = {}
-        for database in db_sizes:
-            all_dbs[database['Database']] = int(database['Size'])
+        for database_model in self.databaseinfra.databases.all():
+            database_name = database_model.name
+            if database_name not in list_databases:
+                continue
 
-        list_databases = self.list_databases()
-        for database_name in all_dbs.keys():
-            database_model = None
-            try:
-                # LOG.debug("checking status for database %s" % database_name)
-                database_model = Database.objects.get(
-                    name=database_name, databaseinfra=self.databaseinfra)
-            except Database.DoesNotExist:
-                pass
-
-            if database_model:
-                db_status = DatabaseStatus(database_model)
-                # is_alive?
-                try:
-                    if self.check_status() and (database_name in list_databases):
-                        db_status.is_alive = True
-                except Exception as e:
-                    LOG.warning(
-                        "could not retrieve db status for %s: %s" % (database_name, e))
-
-                db_status.total_size_in_bytes = 0
-                db_status.used_size_in_bytes = all_dbs[database_name]
-
-                databaseinfra_status.databases_status[
-                    database_name] = db_status
+            db_status = DatabaseStatus(database_model)
+            db_status.is_alive = True
+            db_status.total_size_in_bytes = 0
+            db_status.used_size_in_bytes = all_dbs.get(database_name, 0)
+
+            databaseinfra_status.databases_status[
+                database_name] = db_status
 
         databaseinfra_status.used_size_in_bytes = sum(all_dbs.values())
 
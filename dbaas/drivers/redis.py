@@ -153,14 +153,37 @@ class Redis(BaseDriver):
     def unlock_database(self, client):
         pass
 
+    def is_connection_failure(self, error):
+        # clients connect lazily, failures come from the commands
+        return isinstance(error, (
+            redis.exceptions.ConnectionError, redis.exceptions.TimeoutError,
+            ConnectionError
+        ))
+
+    def close_client(self, client):
+        client.connection_pool.disconnect()
+
+    def is_client_healthy(self, client):
+        try:
+            return client.ping()
+        except redis.exceptions.RedisError:
+            return False
+
+    def __pool_signature(self, instance):
+        if (instance and instance.instance_type == Instance.REDIS) or (not self.databaseinfra.plan.is_ha and not instance):
+            address = self.__get_admin_single_connection(instance)
+        else:
+            address = self.__get_admin_sentinel_connection(instance)
+        return (address, self.databaseinfra.name, self.databaseinfra.password)
+
     @contextmanager
     def redis(self, instance=None, database=None):
-        client = None
         try:
-            client = self.__redis_client__(instance)
-
-            return_value = client
-            yield return_value
+            with self.circuit(instance), self.pooled_client(
+                instance, self.__pool_signature(instance),
+                lambda: self.__redis_client__(instance)
+            ) as client:
+                yield client
         except Exception as e:
             raise ConnectionError(
                 'Error connecting to databaseinfra %s : %s' % (self.databaseinfra, str(e)))
@@ -13,12 +13,30 @@ class BaseTopology(object):
             'workflow.steps.util.deploy.create_dbmonitor.CreateDbMonitor',
         )
 
+    def deploy_dependencies(self):
+        """
+        Steps that deploy_first_steps wait for, as {step: (step, ...)}.
+        Steps not declared wait for every step before them. Steps that may
+        run at the same time share workflow_dict, they must not write the
+        same keys nor both save the databaseinfra
+        """
+        return {}
+
     def get_deploy_steps(self):
         return self.deploy_first_steps() + self.monitoring_steps() + self.deploy_last_steps()
 
+    def get_deploy_dependencies(self):
+        dependencies = dict(self.deploy_dependencies())
+        for step in self.monitoring_steps():
+            dependencies[step] = (self.deploy_first_steps()[-1],)
+        return dependencies
+
     def get_clone_steps(self):
         raise NotImplementedError()
 
+    def get_clone_dependencies(self):
+        return self.deploy_dependencies()
+
     def get_resize_extra_steps(self):
         return (
             'workflow.steps.util.resize.agents.Start',
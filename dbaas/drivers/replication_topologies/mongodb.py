@@ -16,6 +16,24 @@ class BaseMongoDB(BaseTopology):
             'workflow.steps.util.deploy.start_monit.StartMonit',
         )
 
+    def deploy_dependencies(self):
+        return {
+            'workflow.steps.util.deploy.create_dns.CreateDns': (
+                'workflow.steps.mongodb.deploy.create_virtualmachines.CreateVirtualMachine',
+            ),
+            'workflow.steps.util.deploy.create_nfs.CreateNfs': (
+                'workflow.steps.mongodb.deploy.create_virtualmachines.CreateVirtualMachine',
+            ),
+            'workflow.steps.util.deploy.config_backup_log.ConfigBackupLog': (
+                'workflow.steps.util.deploy.create_nfs.CreateNfs',
+                'workflow.steps.mongodb.deploy.init_database.InitDatabaseMongoDB',
+            ),
+            'workflow.steps.util.deploy.check_dns.CheckDns': (
+                'workflow.steps.util.deploy.create_dns.CreateDns',
+                'workflow.steps.mongodb.deploy.init_database.InitDatabaseMongoDB',
+            ),
+        }
+
     def deploy_last_steps(self):
         return (
             'workflow.steps.util.deploy.build_database.BuildDatabase',
@@ -28,6 +28,27 @@ class BaseMysql(BaseTopology):
             'workflow.steps.util.deploy.start_monit.StartMonit',
         )
 
+    def deploy_dependencies(self):
+        return {
+            'workflow.steps.mysql.deploy.create_dns.CreateDns': (
+                'workflow.steps.mysql.deploy.create_secondary_ip.CreateSecondaryIp',
+            ),
+            'workflow.steps.util.deploy.create_nfs.CreateNfs': (
+                'workflow.steps.mysql.deploy.create_virtualmachines.CreateVirtualMachine',
+            ),
+            'workflow.steps.mysql.deploy.create_flipper.CreateFlipper': (
+                'workflow.steps.mysql.deploy.create_secondary_ip.CreateSecondaryIp',
+            ),
+            'workflow.steps.util.deploy.config_backup_log.ConfigBackupLog': (
+                'workflow.steps.util.deploy.create_nfs.CreateNfs',
+                'workflow.steps.mysql.deploy.init_database.InitDatabase',
+            ),
+            'workflow.steps.util.deploy.check_dns.CheckDns': (
+                'workflow.steps.mysql.deploy.create_dns.CreateDns',
+                'workflow.steps.mysql.deploy.init_database.InitDatabase',
+            ),
+        }
+
     def deploy_last_steps(self):
         return (
             'workflow.steps.util.deploy.build_database.BuildDatabase',
@@ -217,6 +238,25 @@ class MySQLFoxHA(MySQLSingle):
             'workflow.steps.util.database.StartSlave',
         ) + super(BaseMysql, self).get_resize_extra_steps()
 
+    def deploy_dependencies(self):
+        return {
+            'workflow.steps.mysql.deploy.create_dns_foxha.CreateDnsFoxHA': (
+                'workflow.steps.mysql.deploy.create_virtualmachines_fox.CreateVirtualMachine',
+                'workflow.steps.mysql.deploy.create_vip.CreateVip',
+            ),
+            'workflow.steps.util.deploy.create_nfs.CreateNfs': (
+                'workflow.steps.mysql.deploy.create_virtualmachines_fox.CreateVirtualMachine',
+            ),
+            'workflow.steps.util.deploy.config_backup_log.ConfigBackupLog': (
+                'workflow.steps.util.deploy.create_nfs.CreateNfs',
+                'workflow.steps.mysql.deploy.init_database_foxha.InitDatabaseFoxHA',
+            ),
+            'workflow.steps.util.deploy.check_dns.CheckDns': (
+                'workflow.steps.mysql.deploy.create_dns_foxha.CreateDnsFoxHA',
+                'workflow.steps.mysql.deploy.init_database_foxha.InitDatabaseFoxHA',
+            ),
+        }
+
     def deploy_last_steps(self):
         return (
             'workflow.steps.util.deploy.build_database.BuildDatabase',
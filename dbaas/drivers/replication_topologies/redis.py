@@ -16,6 +16,24 @@ class BaseRedis(BaseTopology):
             'workflow.steps.util.deploy.start_monit.StartMonit',
         )
 
+    def deploy_dependencies(self):
+        return {
+            'workflow.steps.redis.deploy.create_dns.CreateDns': (
+                'workflow.steps.redis.deploy.create_virtualmachines.CreateVirtualMachine',
+            ),
+            'workflow.steps.util.deploy.create_nfs.CreateNfs': (
+                'workflow.steps.redis.deploy.create_virtualmachines.CreateVirtualMachine',
+            ),
+            'workflow.steps.util.deploy.config_backup_log.ConfigBackupLog': (
+                'workflow.steps.util.deploy.create_nfs.CreateNfs',
+                'workflow.steps.redis.deploy.init_database.InitDatabaseRedis',
+            ),
+            'workflow.steps.util.deploy.check_dns.CheckDns': (
+                'workflow.steps.redis.deploy.create_dns.CreateDns',
+                'workflow.steps.redis.deploy.init_database.InitDatabaseRedis',
+            ),
+        }
+
     def deploy_last_steps(self):
         return (
             'workflow.steps.util.deploy.build_database.BuildDatabase',
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+import redis
+from django.test import TestCase
+from physical.tests import factory as factory_physical
+from physical.tests.test_status_cache import FakeRedis
+from .. import CircuitOpenError
+from .. import circuit_breaker
+from ..redis import Redis
+
+
+class CircuitBreakerTestCase(TestCase):
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(
+            circuit_breaker, 'REDIS_CLIENT', self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.databaseinfra = factory_physical.DatabaseInfraFactory()
+        self.driver = Redis(databaseinfra=self.databaseinfra)
+
+    def call(self, error=None):
+        with self.driver.circuit():
+            if error:
+                raise error
+
+    def fail(self, times=circuit_breaker.DEFAULT_FAILURES):
+        for _ in range(times):
+            self.assertRaises(
+                redis.exceptions.ConnectionError,
+                self.call, redis.exceptions.ConnectionError()
+            )
+
+    def test_open_after_consecutive_failures(self):
+        self.fail(circuit_breaker.DEFAULT_FAILURES - 1)
+        self.call()
+        self.fail(circuit_breaker.DEFAULT_FAILURES - 1)
+        self.call()
+
+        self.fail()
+        self.assertRaises(CircuitOpenError, self.call)
+
+    def test_other_errors_do_not_open(self):
+        for _ in range(circuit_breaker.DEFAULT_FAILURES):
+            self.assertRaises(ValueError, self.call, ValueError())
+        self.call()
+
+    @mock.patch('time.time')
+    def test_half_open_allows_one_probe(self, time):
+        time.return_value = 1000
+        self.fail()
+
+        time.return_value += circuit_breaker.DEFAULT_BACKOFF + 1
+        breaker = circuit_breaker.CircuitBreaker(self.databaseinfra)
+        self.assertTrue(breaker.allow())
+        self.assertRaises(CircuitOpenError, self.call)
+
+        breaker.record_success()
+        self.call()
+
+    @mock.patch('time.time')
+    def test_failed_probe_doubles_backoff(self, time):
+        time.return_value = 1000
+        self.fail()
+
+        time.return_value += circuit_breaker.DEFAULT_BACKOFF + 1
+        self.fail(1)
+
+        time.return_value += circuit_breaker.DEFAULT_BACKOFF + 1
+        self.assertRaises(CircuitOpenError, self.call)
+
+        time.return_value += circuit_breaker.DEFAULT_BACKOFF
+        self.call()
+
+    def test_concurrent_failures_are_all_counted(self):
+        self.fail(circuit_breaker.DEFAULT_FAILURES - 2)
+
+        # Both calls started before any of them failed
+        breakers = [
+            circuit_breaker.CircuitBreaker(self.databaseinfra)
+            for _ in range(2)
+        ]
+        for breaker in breakers:
+            self.assertTrue(breaker.allow())
+        for breaker in breakers:
+            breaker.record_failure()
+
+        self.assertRaises(CircuitOpenError, self.call)
+
+    def test_bypass(self):
+        with circuit_breaker.bypass():
+            self.fail()
+        self.call()
+
+        self.fail()
+        with circuit_breaker.bypass():
+            self.call()
+        self.assertRaises(CircuitOpenError, self.call)
+
+    def test_waiting_bypasses_the_circuit(self):
+        from util.wait import wait_until
+
+        self.fail()
+
+        self.assertTrue(wait_until(lambda: self.call() or True, timeout=1))
+        self.assertFalse(circuit_breaker.is_bypassed())
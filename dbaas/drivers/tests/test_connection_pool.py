@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from physical.models import Instance
+from physical.tests import factory as factory_physical
+from physical.tests.test_status_cache import FakeRedis
+from .. import circuit_breaker
+from .. import connection_pool
+from ..connection_pool import ConnectionPool
+from ..redis import Redis
+
+
+class ConnectionPoolTestCase(TestCase):
+
+    def setUp(self):
+        self.close = mock.Mock()
+        self.is_healthy = mock.Mock(return_value=True)
+        self.pool = ConnectionPool('key', self.close, self.is_healthy)
+        self.create = mock.Mock(side_effect=lambda: mock.Mock())
+
+    def test_reuse_connection(self):
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkin(connection)
+
+        self.assertIs(
+            self.pool.checkout('signature', self.create).client,
+            connection.client
+        )
+        self.assertEqual(self.create.call_count, 1)
+        self.assertFalse(self.is_healthy.called)
+
+    def test_broken_connection_is_closed(self):
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkin(connection, broken=True)
+
+        self.close.assert_called_once_with(connection.client)
+        self.pool.checkout('signature', self.create)
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_signature_change_renews_connections(self):
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkin(connection)
+
+        new_connection = self.pool.checkout('new signature', self.create)
+        self.assertIsNot(new_connection.client, connection.client)
+        self.close.assert_called_once_with(connection.client)
+
+    def test_connection_in_use_is_closed_after_signature_change(self):
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkout('new signature', self.create)
+        self.pool.checkin(connection)
+        self.close.assert_called_once_with(connection.client)
+
+    def test_keep_max_size_idle(self):
+        connections = [
+            self.pool.checkout('signature', self.create)
+            for _ in range(connection_pool.DEFAULT_MAX_SIZE + 1)
+        ]
+        for connection in connections:
+            self.pool.checkin(connection)
+
+        self.assertEqual(len(self.pool.idle), connection_pool.DEFAULT_MAX_SIZE)
+        self.close.assert_called_once_with(connections[-1].client)
+
+    @mock.patch('time.time')
+    def test_idle_connection_is_evicted(self, time):
+        time.return_value = 1000
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkin(connection)
+
+        time.return_value += connection_pool.DEFAULT_IDLE_TIMEOUT + 1
+        self.pool.checkout('signature', self.create)
+        self.close.assert_called_once_with(connection.client)
+        self.assertEqual(self.create.call_count, 2)
+
+    @mock.patch('time.time')
+    def test_health_check_on_checkout(self, time):
+        time.return_value = 1000
+        connection = self.pool.checkout('signature', self.create)
+        self.pool.checkin(connection)
+
+        self.is_healthy.return_value = False
+        time.return_value += connection_pool.DEFAULT_CHECK_INTERVAL + 1
+        self.pool.checkout('signature', self.create)
+
+        self.is_healthy.assert_called_once_with(connection.client)
+        self.close.assert_called_once_with(connection.client)
+        self.assertEqual(self.create.call_count, 2)
+
+
+class DriverConnectionPoolTestCase(TestCase):
+
+    def setUp(self):
+        connection_pool.clear()
+        self.addCleanup(connection_pool.clear)
+        patcher = mock.patch.object(
+            circuit_breaker, 'REDIS_CLIENT', FakeRedis()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.databaseinfra = factory_physical.DatabaseInfraFactory(
+            password='OPlpplpooi'
+        )
+        self.instance = factory_physical.InstanceFactory(
+            databaseinfra=self.databaseinfra, port=6379,
+            instance_type=Instance.REDIS
+        )
+
+    @mock.patch('redis.StrictRedis')
+    def test_client_is_reused(self, client):
+        driver = Redis(databaseinfra=self.databaseinfra)
+        driver.check_status()
+        Redis(databaseinfra=self.databaseinfra).check_status()
+        self.assertEqual(client.call_count, 1)
+
+    @mock.patch('redis.StrictRedis')
+    def test_client_is_renewed_when_infra_changes(self, client):
+        Redis(databaseinfra=self.databaseinfra).check_status()
+
+        self.databaseinfra.password = 'new password'
+        self.databaseinfra.save()
+        Redis(databaseinfra=self.databaseinfra).check_status()
+        self.assertEqual(client.call_count, 2)
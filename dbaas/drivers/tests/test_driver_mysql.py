@@ -9,6 +9,7 @@ from logical.tests import factory as factory_logical
 from logical.models import Database
 from ..mysqldb import MySQL
 from django.conf import settings
+from physical.tests.test_status_cache import FakeRedis
 
 LOG = logging.getLogger(__name__)
 
@@ -135,3 +136,50 @@ class ManageCredentialsMySQLTestCase(AbstractTestDriverMysql):
         self.assertTrue(self.credential.user in self.driver.list_users())
         self.driver.remove_user(self.credential)
         self.assertFalse(self.credential.user in self.driver.list_users())
+
+
+class InfoMySQLTestCase(AbstractTestDriverMysql):
+
+    def setUp(self):
+        super(InfoMySQLTestCase, self).setUp()
+        patcher = mock.patch(
+            'physical.status_cache.REDIS_CLIENT', FakeRedis()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ('db_a', 'db_b', 'db_c'):
+            factory_logical.DatabaseFactory(
+                name=name, databaseinfra=self.databaseinfra
+            )
+
+    def query(self, query_string, instance=None):
+        if 'VERSION()' in query_string:
+            return [{'VERSION()': '5.6.0'}]
+        if 'SHOW' in query_string:
+            return [{'Database': name} for name in ('mysql', 'db_a', 'db_b')]
+        return [
+            {'Database': 'mysql', 'Size': '10'},
+            {'Database': 'db_a', 'Size': '100'},
+        ]
+
+    def test_info(self):
+        with mock.patch.object(
+            MySQL, '_MySQL__query', side_effect=self.query
+        ) as query:
+            info = self.driver.info()
+            self.assertEqual(query.call_count, 3)
+
+            self.driver.info()
+            self.assertEqual(query.call_count, 5)
+
+        self.assertEqual(info.version, '5.6.0')
+        self.assertEqual(info.used_size_in_bytes, 110)
+        self.assertTrue(info.get_database_status('db_a').is_alive)
+        self.assertEqual(
+            info.get_database_status('db_a').used_size_in_bytes, 100
+        )
+        self.assertTrue(info.get_database_status('db_b').is_alive)
+        self.assertEqual(
+            info.get_database_status('db_b').used_size_in_bytes, 0
+        )
+        self.assertIsNone(info.get_database_status('db_c'))
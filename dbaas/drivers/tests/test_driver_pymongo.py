@@ -6,6 +6,7 @@ from drivers import DriverFactory
 from physical.tests import factory as factory_physical
 from logical.tests import factory as factory_logical
 from logical.models import Database
+from .. import connection_pool
 from ..mongodb import MongoDB
 
 
@@ -157,3 +158,69 @@ class ManageCredentialsMongoDBTestCase(AbstractTestDriverMongo):
             self.credential), "Error creating user %s. Invalid test" % self.credential)
         self.driver.remove_user(self.credential)
         self.assertIsNone(self.__find_user__(self.credential))
+
+
+class InfoMongoDBTestCase(AbstractTestDriverMongo):
+
+    def setUp(self):
+        super(InfoMongoDBTestCase, self).setUp()
+        connection_pool.clear()
+        self.addCleanup(connection_pool.clear)
+
+        self.databases = [
+            factory_logical.DatabaseFactory(
+                name=name, databaseinfra=self.databaseinfra
+            ) for name in ('db_a', 'db_b', 'db_c')
+        ]
+
+        self.commands = []
+        self.client = mock.MagicMock()
+        self.client.server_info.side_effect = self.server_info
+        self.client.admin.command.side_effect = self.admin_command
+        self.client.__getitem__.side_effect = self.database
+
+    def server_info(self):
+        self.commands.append('buildinfo')
+        return {'version': '3.4.0'}
+
+    def admin_command(self, command):
+        self.commands.append(command)
+        if command == 'listDatabases':
+            return {
+                'totalSize': 300,
+                'databases': [{'name': 'db_a'}, {'name': 'db_b'}]
+            }
+        return {'ok': 1.0}
+
+    def database(self, name):
+        def command(command, **kwargs):
+            self.commands.append(command)
+            return {'storageSize': 100, 'fileSize': 200}
+
+        database = mock.Mock()
+        database.command.side_effect = command
+        return database
+
+    def test_info(self):
+        with mock.patch.object(
+            MongoDB, '__mongo_client__', return_value=self.client
+        ) as mongo_client:
+            info = self.driver.info()
+
+        self.assertEqual(mongo_client.call_count, 1)
+        self.assertEqual(
+            sorted(self.commands),
+            ['buildinfo', 'dbStats', 'dbStats', 'listDatabases', 'ping']
+        )
+
+        self.assertEqual(info.version, '3.4.0')
+        self.assertEqual(info.used_size_in_bytes, 300)
+        for name in ('db_a', 'db_b'):
+            db_status = info.get_database_status(name)
+            self.assertTrue(db_status.is_alive)
+            self.assertEqual(db_status.used_size_in_bytes, 100)
+            self.assertEqual(db_status.total_size_in_bytes, 200)
+
+        db_status = info.get_database_status('db_c')
+        self.assertFalse(db_status.is_alive)
+        self.assertEqual(db_status.used_size_in_bytes, 0)
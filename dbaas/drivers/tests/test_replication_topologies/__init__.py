@@ -2,6 +2,50 @@
 from __future__ import absolute_import, unicode_literals
 from functools import wraps
 from django.test import TestCase
+from workflow.graph import StepGraph
+from workflow.workflow import is_instance_parallel
+
+# Steps (by class name) that read what other steps create: hosts and
+# instances of the VMs, VIP, secondary IPs, NFS exports and DNS records
+DATA_DEPENDENCIES = {
+    'CreateVip': ('CreateVirtualMachine',),
+    'CreateSecondaryIp': ('CreateVirtualMachine',),
+    'CreateDns': ('CreateVirtualMachine', 'CreateSecondaryIp'),
+    'CreateDnsFoxHA': ('CreateVirtualMachine', 'CreateVip'),
+    'CreateFlipper': ('CreateVirtualMachine', 'CreateSecondaryIp'),
+    'CreateNfs': ('CreateVirtualMachine',),
+    'ConfigBackupLog': (
+        'CreateVirtualMachine', 'CreateNfs', 'InitDatabase',
+        'InitDatabaseFoxHA', 'InitDatabaseMongoDB', 'InitDatabaseRedis',
+    ),
+    'CheckDns': (
+        'CreateDns', 'CreateDnsFoxHA', 'InitDatabase', 'InitDatabaseFoxHA',
+        'InitDatabaseMongoDB', 'InitDatabaseRedis',
+    ),
+    'InitDatabase': ('CreateNfs', 'CreateDns'),
+    'InitDatabaseFoxHA': ('CreateNfs', 'CreateDnsFoxHA', 'CreateVip'),
+    'InitDatabaseMongoDB': ('CreateNfs', 'CreateDns'),
+    'InitDatabaseRedis': ('CreateNfs', 'CreateDns'),
+}
+
+# Keys of workflow_dict that steps (by class name) write, 'databaseinfra'
+# also stands for saving the infra. Steps that may run at the same time
+# must not share any of them
+DATA_WRITES = {
+    'BuildDatabaseInfra': ('names', 'databaseinfra'),
+    'CreateVirtualMachine': (
+        'hosts', 'instances', 'databaseinfraattr', 'vms_id', 'databaseinfra',
+    ),
+    'CreateSecondaryIp': (
+        'databaseinfraattr', 'networkapi_equipment_id', 'databaseinfra',
+    ),
+    'CreateVip': ('vip', 'databaseinfra'),
+    'CreateDns': ('databaseinfra',),
+    'CreateDnsFoxHA': ('databaseinfra',),
+    'CreateNfs': ('disks',),
+    'InitDatabaseMongoDB': ('replicasetname',),
+    'BuildDatabase': ('database',),
+}
 
 
 def skip_unless_not_abstract(method):
@@ -152,3 +196,76 @@ class AbstractReplicationTopologySettingsTestCase(TestCase):
             self._get_upgrade_settings(),
             self.replication_topology.get_upgrade_steps()
         )
+
+    @skip_unless_not_abstract
+    def test_final_upgrade_group_runs_on_instances_in_parallel(self):
+        steps = self.replication_topology.get_upgrade_steps()[-1].values()[0]
+        self.assertTrue(is_instance_parallel(steps), steps)
+
+    @skip_unless_not_abstract
+    def test_deploy_dependencies(self):
+        steps = self.replication_topology.get_deploy_steps()
+        dependencies = self.replication_topology.get_deploy_dependencies()
+        self.assertLessEqual(set(dependencies), set(steps))
+        StepGraph(steps, dependencies)
+
+    @skip_unless_not_abstract
+    def test_clone_dependencies(self):
+        steps = self.replication_topology.get_clone_steps()
+        dependencies = self.replication_topology.get_clone_dependencies()
+        self.assertLessEqual(set(dependencies), set(steps))
+        StepGraph(steps, dependencies)
+
+    def _waits_for(self, graph):
+        """ {step: every step it waits for, directly or not} """
+        waits_for = {}
+        for step in graph.steps:
+            waited = set()
+            pending = list(graph.dependencies[step])
+            while pending:
+                dependency = pending.pop()
+                if dependency not in waited:
+                    waited.add(dependency)
+                    pending.extend(graph.dependencies[dependency])
+            waits_for[step] = waited
+        return waits_for
+
+    def _assert_data_dependencies(self, steps, dependencies):
+        graph = StepGraph(steps, dependencies)
+        names = dict((step, step.rsplit('.', 1)[1]) for step in steps)
+        waits_for = self._waits_for(graph)
+
+        for step in steps:
+            required = DATA_DEPENDENCIES.get(names[step], ())
+            present = set(required) & set(names.values())
+            waited = set(names[dependency] for dependency in waits_for[step])
+            missing = present - waited
+            self.assertFalse(missing, "{} does not wait for {}".format(
+                step, ', '.join(sorted(missing))
+            ))
+
+        for index, step in enumerate(steps):
+            for other in steps[:index]:
+                if other in waits_for[step]:
+                    continue
+                shared = set(DATA_WRITES.get(names[step], ())) & set(
+                    DATA_WRITES.get(names[other], ())
+                )
+                self.assertFalse(shared, "{} and {} may run at the same "
+                                 "time and both write {}".format(
+                                     other, step, ', '.join(sorted(shared))
+                                 ))
+
+    @skip_unless_not_abstract
+    def test_deploy_data_dependencies(self):
+        self._assert_data_dependencies(
+            self.replication_topology.get_deploy_steps(),
+            self.replication_topology.get_deploy_dependencies()
+        )
+
+    @skip_unless_not_abstract
+    def test_clone_data_dependencies(self):
+        self._assert_data_dependencies(
+            self.replication_topology.get_clone_steps(),
+            self.replication_topology.get_clone_dependencies()
+        )
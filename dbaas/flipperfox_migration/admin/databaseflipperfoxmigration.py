@@ -163,6 +163,10 @@ class DatabaseFlipperFoxMigrationAdmin(admin.DjangoServicesAdmin):
                                                                  description)
                 task_history.user = request.user
                 task_history.save()
+                database = database_flipperfox_migration.database
+                task_history.add_database_lock(
+                    database.name, database.environment
+                )
 
                 is_rollback = request.GET.get('rollback')
                 scheduled_for.replace(
@@ -429,6 +429,9 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
                     form.cleaned_data['name'])
                 task_history.user = request.user
                 task_history.save()
+                task_history.add_database_lock(
+                    form.cleaned_data['name'], form.cleaned_data['environment']
+                )
 
                 create_database.delay(
                     name=form.cleaned_data['name'],
@@ -756,6 +759,7 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
         task_history.arguments = "Retrying resize database {}".format(database)
         task_history.user = request.user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         resize_database.delay(
             database=database, user=request.user, task=task_history,
@@ -851,6 +855,9 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
                     database.name)
                 task_history.user = request.user
                 task_history.save()
+                task_history.add_database_lock(
+                    database.name, database.environment
+                )
 
                 Database.recover_snapshot(database=database,
                                           snapshot=target_snapshot,
@@ -955,6 +962,7 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
         task_history.arguments = "Upgrading MongoDB 2.4 to 3.0"
         task_history.user = request.user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         upgrade_mongodb_24_to_30.delay(database=database, user=request.user, task_history=task_history)
         url = reverse('admin:notification_taskhistory_changelist')
@@ -991,6 +999,7 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
         task_history.arguments = "Retrying upgrade database {}".format(database)
         task_history.user = request.user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         upgrade_database.delay(
             database=database,
@@ -1017,6 +1026,7 @@ class DatabaseAdmin(admin.DjangoServicesAdmin):
         task_history.arguments = "Upgrading database {}".format(database)
         task_history.user = request.user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         upgrade_database.delay(
             database=database,
@@ -374,6 +374,7 @@ class Database(BaseModel):
         task_history.arguments = "Database name: {}".format(database.name)
         task_history.user = user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         clone_database.delay(
             origin_database=database, clone_name=clone_name, plan=plan,
@@ -391,6 +392,7 @@ class Database(BaseModel):
         task_history.arguments = "Database name: {}".format(database.name)
         task_history.user = user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         resize_database.delay(
             database=database, cloudstackpack=cloudstackpack,
@@ -470,17 +472,7 @@ class Database(BaseModel):
     def is_beeing_used_elsewhere(self, task_id=None):
         from notification.models import TaskHistory
 
-        name = self.name + ','
-        tasks_contains = TaskHistory.objects.filter(
-            arguments__contains=name,
-            task_status__in=['RUNNING', 'PENDING', 'WAITING']
-        )
-        tasks_ends_with_name = TaskHistory.objects.filter(
-            arguments__endswith=self.name,
-            task_status__in=['RUNNING', 'PENDING', 'WAITING']
-        )
-
-        tasks = list(tasks_ends_with_name) + list(tasks_contains)
+        tasks = list(TaskHistory.tasks_holding(self.name, self.environment))
         if len(tasks) == 1 and task_id:
             if tasks[0].task_id == task_id:
                 return False
@@ -551,6 +543,7 @@ class Database(BaseModel):
         task_history.arguments = "Database name: {}".format(database.name)
         task_history.user = user
         task_history.save()
+        task_history.add_database_lock(database.name, database.environment)
 
         disk_offering = DiskOffering.objects.get(id=new_disk_offering)
 
@@ -672,6 +665,7 @@ class Database(BaseModel):
         task_history.arguments = "Database name: {}".format(self.name)
         task_history.user = user
         task_history.save()
+        task_history.add_database_lock(self.name, self.environment)
 
         destroy_database.delay(
             database=self, task_history=task_history, user=user
@@ -43,7 +43,7 @@ class MaintenanceAdmin(admin.DjangoServicesAdmin):
                     "friendly_status")
     fields = ("description", "scheduled_for", "started_at", "finished_at",
               "main_script", "rollback_script", "hostsid", "maximum_workers",
-              "status", "celery_task_id", "affected_hosts", "created_by",
+              "batch_size", "maximum_failures", "status", "celery_task_id", "affected_hosts", "created_by",
               "revoked_by")
     form = MaintenanceForm
     actions = None
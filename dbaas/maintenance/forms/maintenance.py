@@ -16,4 +16,5 @@ class MaintenanceForm(forms.ModelForm):
     class Meta:
         model = models.Maintenance
         fields = ("description", "scheduled_for", "main_script", "rollback_script",
-                  "maximum_workers", "status", "celery_task_id",)
+                  "maximum_workers", "batch_size", "maximum_failures", "status",
+                  "celery_task_id",)
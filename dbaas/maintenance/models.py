@@ -47,6 +47,16 @@ class Maintenance(BaseModel):
                                        null=True, blank=True)
     maximum_workers = models.PositiveSmallIntegerField(verbose_name=_("Maximum workers"),
                                                        null=False, default=1)
+    batch_size = models.PositiveIntegerField(
+        verbose_name=_("Rolling batch size"), default=0,
+        help_text=_("Hosts of each batch, a batch starts when the previous "
+                    "one finishes. 0 runs all hosts in one batch")
+    )
+    maximum_failures = models.PositiveIntegerField(
+        verbose_name=_("Maximum failures"), default=0,
+        help_text=_("Hosts that may fail before the maintenance stops. "
+                    "0 never stops")
+    )
     celery_task_id = models.CharField(verbose_name=_("Celery task Id"),
                                       null=True, blank=True, max_length=50,)
     status = models.IntegerField(choices=MAINTENANCE_STATUS, default=WAITING)
@@ -78,14 +88,10 @@ class Maintenance(BaseModel):
         try:
 
             hostsid_list = self.hostsid.split(',')
-            hosts = Host.objects.filter(pk__in=hostsid_list)
-            for host in hosts:
-                hm = HostMaintenance()
-                hm.host = host
-                hm.maintenance = self
-                hm.hostname = host.hostname
-                hm.save()
-                total_hosts += 1
+            hosts = Host.objects.filter(
+                pk__in=hostsid_list
+            ).values_list('id', 'hostname')
+            total_hosts = HostMaintenance.create_for(self, hosts)
 
         except Exception, e:
             error = e.args[1]
@@ -98,14 +104,10 @@ class Maintenance(BaseModel):
             self.status = self.WAITING
 
         finally:
-            # post_save signal has to be disconnected in order to avoid
-            # recursive signal call
-            post_save.disconnect(maintenance_post_save, sender=Maintenance)
-
-            self.save()
-
-            # connecting signal again
-            post_save.connect(maintenance_post_save, sender=Maintenance)
+            # Updated without save, post_save would call it again
+            Maintenance.objects.filter(pk=self.pk).update(
+                status=self.status, affected_hosts=self.affected_hosts
+            )
 
         return save_host_ok
 
@@ -115,10 +117,11 @@ class Maintenance(BaseModel):
 
             self.status = self.REVOKED
             self.revoked_by = request.user.username
-            self.save()
+            Maintenance.objects.filter(pk=self.pk).update(
+                status=self.status, revoked_by=self.revoked_by
+            )
 
-            HostMaintenance.objects.filter(maintenance=self,
-                                           ).update(status=HostMaintenance.REVOKED)
+            HostMaintenance.update_status(self, HostMaintenance.REVOKED)
             return True
 
         return False
@@ -165,6 +168,7 @@ class HostMaintenance(BaseModel):
     REVOKED = 7
     UNAVAILABLEHOST = 8
     UNAVAILABLECSHOSTATTR = 9
+    SKIPPED = 10
 
     MAINTENANCE_STATUS = (
         (ERROR, 'Error'),
@@ -177,6 +181,7 @@ class HostMaintenance(BaseModel):
         (REVOKED, 'Revoked'),
         (UNAVAILABLEHOST, 'Unavailable host'),
         (UNAVAILABLECSHOSTATTR, 'Unavailable cloudstack host attr'),
+        (SKIPPED, 'Skipped'),
     )
 
     started_at = models.DateTimeField(verbose_name=_("Started at"), null=True)
@@ -203,6 +208,26 @@ class HostMaintenance(BaseModel):
     def __unicode__(self):
         return "%s %s" % (self.host, self.maintenance)
 
+    @classmethod
+    def create_for(cls, maintenance, hosts):
+        """ Creates, with one insert, one WAITING row per (id, hostname) """
+        host_maintenances = [
+            cls(host_id=host_id, hostname=hostname, maintenance=maintenance)
+            for host_id, hostname in hosts
+        ]
+        cls.objects.bulk_create(host_maintenances)
+        return len(host_maintenances)
+
+    @classmethod
+    def update_status(cls, maintenance, status, current_status=None,
+                      **fields):
+        """ Moves every row of maintenance, or only the ones in
+        current_status, to status with one update """
+        host_maintenances = cls.objects.filter(maintenance=maintenance)
+        if current_status is not None:
+            host_maintenances = host_maintenances.filter(status=current_status)
+        return host_maintenances.update(status=status, **fields)
+
 
 class MaintenanceParameters(BaseModel):
     parameter_name = models.CharField(verbose_name=_(" Parameter name"),
@@ -402,7 +427,7 @@ def maintenance_pre_delete(sender, **kwargs):
     """
     maintenance = kwargs.get("instance")
     LOG.debug("maintenance pre-delete triggered")
-    HostMaintenance.objects.filter().delete()
+    HostMaintenance.objects.filter(maintenance=maintenance).delete()
     control.revoke(task_id=maintenance.celery_task_id)
 
 
@@ -428,4 +453,6 @@ def maintenance_post_save(sender, **kwargs):
                                                                  countdown=5)
 
             maintenance.celery_task_id = task.task_id
-            maintenance.save()
+            Maintenance.objects.filter(pk=maintenance.pk).update(
+                celery_task_id=maintenance.celery_task_id
+            )
@@ -1,6 +1,7 @@
 import sys
 import inspect
 import logging
+import threading
 LOG = logging.getLogger(__name__)
 
 
@@ -35,367 +36,319 @@ def _get_function(func_name):
     return func_list
 
 
-def get_hostmane(host_id):
-    """Return HOST_NAME"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.hostname
+class ParametersContext(object):
+
+    """
+    Rows used by the registered functions for a batch of hosts. Each kind
+    of row is loaded for every host of the batch with one query, the first
+    time a function needs it
+    """
+
+    def __init__(self, host_ids):
+        self.host_ids = list(set(host_ids))
+        self.cache = {}
+        self.lock = threading.RLock()
+
+    def _load(self, kind, load):
+        with self.lock:
+            if kind not in self.cache:
+                self.cache[kind] = load()
+            return self.cache[kind]
+
+    def _infra_ids(self):
+        return set(
+            instances[0].databaseinfra_id
+            for instances in self._instances().values()
+        )
+
+    def _hosts(self):
+        from physical.models import Host
+        return self._load(
+            'hosts', lambda: Host.objects.in_bulk(self.host_ids)
+        )
+
+    def _instances(self):
+        def load():
+            from physical.models import Instance
+            instances = {}
+            for instance in Instance.objects.filter(
+                hostname__in=self.host_ids
+            ).select_related(
+                'databaseinfra__engine__engine_type',
+                'databaseinfra__plan', 'databaseinfra__environment'
+            ):
+                instances.setdefault(instance.hostname_id, []).append(instance)
+            return instances
+        return self._load('instances', load)
+
+    def _host_attrs(self):
+        def load():
+            from dbaas_cloudstack.models import HostAttr
+            host_attrs = {}
+            for host_attr in HostAttr.objects.filter(host__in=self.host_ids):
+                host_attrs.setdefault(host_attr.host_id, host_attr)
+            return host_attrs
+        return self._load('host_attrs', load)
+
+    def _databases(self):
+        def load():
+            from logical.models import Database
+            databases = {}
+            for database in Database.objects.filter(
+                databaseinfra__in=self._infra_ids()
+            ):
+                databases.setdefault(database.databaseinfra_id, database)
+            return databases
+        return self._load('databases', load)
+
+    def _offerings(self):
+        def load():
+            from dbaas_cloudstack.models import DatabaseInfraOffering
+            offerings = {}
+            for infra_offering in DatabaseInfraOffering.objects.filter(
+                databaseinfra__in=self._infra_ids()
+            ).select_related('offering'):
+                offerings.setdefault(
+                    infra_offering.databaseinfra_id, []
+                ).append(infra_offering.offering)
+            return offerings
+        return self._load('offerings', load)
+
+    def _log_configurations(self):
+        def load():
+            from backup.models import LogConfiguration
+            infras = [
+                instances[0].databaseinfra
+                for instances in self._instances().values()
+            ]
+            log_configurations = {}
+            for log_configuration in LogConfiguration.objects.filter(
+                environment__in=set(infra.environment_id for infra in infras),
+                engine_type__in=set(
+                    infra.engine.engine_type_id for infra in infras
+                )
+            ):
+                log_configurations.setdefault((
+                    log_configuration.environment_id,
+                    log_configuration.engine_type_id
+                ), log_configuration)
+            return log_configurations
+        return self._load('log_configurations', load)
+
+    def host(self, host_id):
+        return self._hosts().get(host_id)
+
+    def host_attr(self, host_id):
+        return self._host_attrs().get(host_id)
+
+    def instances(self, host_id):
+        return self._instances().get(host_id, [])
+
+    def infra(self, host_id):
+        """ Infra of the first instance of the host """
+        instances = self.instances(host_id)
+        if not instances:
+            raise ValueError("Host has no instances")
+        return instances[0].databaseinfra
+
+    def database(self, host_id):
+        database = self._databases().get(self.infra(host_id).id)
+        if database is None:
+            raise ValueError("Infra has no databases")
+        return database
+
+    def offering(self, host_id):
+        offerings = self._offerings().get(self.infra(host_id).id, [])
+        if len(offerings) != 1:
+            raise ValueError(
+                "Infra has {} offerings, expected 1".format(len(offerings))
+            )
+        return offerings[0]
+
+    def log_configuration(self, host_id):
+        infra = self.infra(host_id)
+        return self._log_configurations().get(
+            (infra.environment_id, infra.engine.engine_type_id)
+        )
+
+
+def _get_context(host_id, context):
+    if context is None:
+        context = ParametersContext([host_id])
+    return context
+
+
+def _get_infra_field(func_name, host_id, context, get_value):
+    try:
+        return get_value(_get_context(host_id, context).infra(host_id))
     except Exception as e:
-        LOG.warn("Error on get_hostmane. Host id: {} - error: {}".format(host_id, e))
+        LOG.warn("Error on {}. Host id: {} - error: {}".format(func_name, host_id, e))
         return None
 
 
-def get_hostaddress(host_id):
-    """Return HOST_ADDRESS"""
-    from physical.models import Host
+def _get_log_configuration(func_name, host_id, context):
+    context = _get_context(host_id, context)
     try:
-        host = Host.objects.get(id=host_id)
-        return host.address
+        context.infra(host_id)
     except Exception as e:
-        LOG.warn("Error on get_hostaddress. Host id: {} - error: {}".format(host_id, e))
+        LOG.warn("Error on {}. Host id: {} - error: {}".format(func_name, host_id, e))
         return None
 
-
-def get_infra_name(host_id):
-    """Return DATABASE_INFRA_NAME"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.name
-    except Exception as e:
-        LOG.warn("Error on get_infra_name. Host id: {} - error: {}".format(host_id, e))
-        return None
+    return context.log_configuration(host_id)
 
 
-def get_database_name(host_id):
-    """Return DATABASE_NAME"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        database = host.instances.all()[0].databaseinfra.databases.all()[0]
-        return database.name
-    except Exception as e:
-        LOG.warn("Error on get_database_name. Host id: {} - error: {}".format(host_id, e))
+def _get_host_attr(host_id, context):
+    context = _get_context(host_id, context)
+    if context.host(host_id) is None:
+        LOG.warn("Host id does not exists: {}".format(host_id))
         return None
 
+    host_attr = context.host_attr(host_id)
+    if host_attr is None:
+        LOG.warn("Host id does not own a cs_host_attr: {}".format(host_id))
+    return host_attr
 
-def get_infra_user(host_id):
-    """Return DATABASE_INFRA_USER"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.user
-    except Exception as e:
-        LOG.warn("Error on get_infra_user. Host id: {} - error: {}".format(host_id, e))
+
+def get_hostmane(host_id, context=None):
+    """Return HOST_NAME"""
+    host = _get_context(host_id, context).host(host_id)
+    if host is None:
+        LOG.warn("Error on get_hostmane. Host id: {} - error: does not exists".format(host_id))
         return None
+    return host.hostname
 
 
-def get_infra_password(host_id):
-    """Return DATABASE_INFRA_PASSWORD"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.password
-    except Exception as e:
-        LOG.warn("Error on get_infra_password. Host id: {} - error: {}".format(host_id, e))
+def get_hostaddress(host_id, context=None):
+    """Return HOST_ADDRESS"""
+    host = _get_context(host_id, context).host(host_id)
+    if host is None:
+        LOG.warn("Error on get_hostaddress. Host id: {} - error: does not exists".format(host_id))
         return None
+    return host.address
 
 
-def get_host_user(host_id):
-    """Return HOST_USER"""
-    from physical.models import Host
-    host = Host.objects.filter(id=host_id).select_related('cs_host_attributes')
+def get_infra_name(host_id, context=None):
+    """Return DATABASE_INFRA_NAME"""
+    return _get_infra_field('get_infra_name', host_id, context,
+                            lambda infra: infra.name)
 
-    try:
-        host = host[0]
-    except IndexError as e:
-        LOG.warn("Host id does not exists: {}. {}".format(host_id, e))
-        return None
 
+def get_database_name(host_id, context=None):
+    """Return DATABASE_NAME"""
     try:
-        host_attr = host.cs_host_attributes.all()[0]
-    except IndexError as e:
-        LOG.warn(
-            "Host id does not own a cs_host_attr: {}. {}".format(host_id, e))
+        return _get_context(host_id, context).database(host_id).name
+    except Exception as e:
+        LOG.warn("Error on get_database_name. Host id: {} - error: {}".format(host_id, e))
         return None
 
-    return host_attr.vm_user
 
+def get_infra_user(host_id, context=None):
+    """Return DATABASE_INFRA_USER"""
+    return _get_infra_field('get_infra_user', host_id, context,
+                            lambda infra: infra.user)
 
-def get_host_password(host_id):
-    """Return HOST_PASSWORD"""
-    from physical.models import Host
-    host = Host.objects.filter(id=host_id).select_related('cs_host_attributes')
 
-    try:
-        host = host[0]
-    except IndexError as e:
-        LOG.warn("Host id does not exists: {}. {}".format(host_id, e))
-        return None
+def get_infra_password(host_id, context=None):
+    """Return DATABASE_INFRA_PASSWORD"""
+    return _get_infra_field('get_infra_password', host_id, context,
+                            lambda infra: infra.password)
+
+
+def get_host_user(host_id, context=None):
+    """Return HOST_USER"""
+    host_attr = _get_host_attr(host_id, context)
+    return host_attr and host_attr.vm_user
 
-    try:
-        host_attr = host.cs_host_attributes.all()[0]
-    except IndexError as e:
-        LOG.warn(
-            "Host id does not own a cs_host_attr: {}. {}".format(host_id, e))
-        return None
 
-    return host_attr.vm_password
+def get_host_password(host_id, context=None):
+    """Return HOST_PASSWORD"""
+    host_attr = _get_host_attr(host_id, context)
+    return host_attr and host_attr.vm_password
 
 
-def get_engine_type_name(host_id):
+def get_engine_type_name(host_id, context=None):
     """Return ENGINE_TYPE"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.engine.name
-    except Exception as e:
-        LOG.warn("Error on get_engine_type_name. Host id: {} - error: {}".format(host_id, e))
-        return None
+    return _get_infra_field('get_engine_type_name', host_id, context,
+                            lambda infra: infra.engine.name)
 
 
-def get_max_database_size(host_id):
+def get_max_database_size(host_id, context=None):
     """Return MAX_DATABASE_SIZE"""
-    from physical.models import Host
-    try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.plan.max_db_size
-    except Exception as e:
-        LOG.warn("Error on get_max_database_size. Host id: {} - error: {}".format(host_id, e))
-        return None
+    return _get_infra_field('get_max_database_size', host_id, context,
+                            lambda infra: infra.plan.max_db_size)
 
 
-def get_offering_size(host_id):
+def get_offering_size(host_id, context=None):
     """Return OFFERING_SIZE"""
-    from physical.models import Host
     try:
-        host = Host.objects.get(id=host_id)
-        return host.instances.all()[0].databaseinfra.cs_dbinfra_offering.get().offering.memory_size_mb
+        return _get_context(host_id, context).offering(host_id).memory_size_mb
     except Exception as e:
         LOG.warn("Error on get_offering_size. Host id: {} - error: {}".format(host_id, e))
         return None
 
 
-def get_there_is_backup_log_config(host_id):
+def get_there_is_backup_log_config(host_id, context=None):
     """Return THERE_IS_BACKUP_LOG_CONFIG"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_there_is_backup_log_config. Host id: {} - error: {}".format(host_id, e))
+    context = _get_context(host_id, context)
+    if not _get_log_configuration('get_there_is_backup_log_config', host_id, context):
         return None
 
-    try:
-        LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                     engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
-
-    for intance in host.instances.all():
+    for intance in context.instances(host_id):
         if intance.instance_type in (intance.MYSQL, intance.MONGODB, intance.REDIS):
             return True
 
     return False
 
 
-def get_log_configuration_mount_point_path(host_id):
+def get_log_configuration_mount_point_path(host_id, context=None):
     """Return LOG_CONFIGURATION_MOUNT_POINT_PATH"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_mount_point_path. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
+    log_configuration = _get_log_configuration('get_log_configuration_mount_point_path', host_id, context)
+    return log_configuration and log_configuration.mount_point_path
 
-    return log_configuration.mount_point_path
 
-
-def get_log_configuration_backup_log_export_path(host_id):
+def get_log_configuration_backup_log_export_path(host_id, context=None):
     """Return LOG_CONFIGURATION_BACKUP_LOG_EXPORT_PATH"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
+    log_configuration = _get_log_configuration('get_log_configuration_backup_log_export_path', host_id, context)
+    return log_configuration and log_configuration.filer_path
 
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_backup_log_export_path. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
-
-    return log_configuration.filer_path
 
-
-def get_log_configuration_database_log_path(host_id):
+def get_log_configuration_database_log_path(host_id, context=None):
     """Return LOG_CONFIGURATION_DATABASE_LOG_PATH"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_database_log_path. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
+    log_configuration = _get_log_configuration('get_log_configuration_database_log_path', host_id, context)
+    return log_configuration and log_configuration.log_path
 
-    return log_configuration.log_path
 
-
-def get_log_configuration_retention_backup_log_days(host_id):
+def get_log_configuration_retention_backup_log_days(host_id, context=None):
     """Return LOG_CONFIGURATION_RETENTION_BACKUP_LOG_DAYS"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_retention_backup_log_days. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
+    log_configuration = _get_log_configuration('get_log_configuration_retention_backup_log_days', host_id, context)
+    return log_configuration and log_configuration.retention_days
 
-    return log_configuration.retention_days
 
-
-def get_log_configuration_backup_log_script(host_id):
+def get_log_configuration_backup_log_script(host_id, context=None):
     """Return LOG_CONFIGURATION_BACKUP_LOG_SCRIPT"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_backup_log_script. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
+    log_configuration = _get_log_configuration('get_log_configuration_backup_log_script', host_id, context)
+    return log_configuration and log_configuration.backup_log_script
 
-    return log_configuration.backup_log_script
 
-
-def get_log_configuration_config_backup_log_script(host_id):
+def get_log_configuration_config_backup_log_script(host_id, context=None):
     """Return LOG_CONFIGURATION_CONFIG_BACKUP_LOG_SCRIPT"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
+    log_configuration = _get_log_configuration('get_log_configuration_config_backup_log_script', host_id, context)
+    return log_configuration and log_configuration.config_backup_log_script
 
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_config_backup_log_script. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
-
-    return log_configuration.config_backup_log_script
 
-
-def get_log_configuration_clean_backup_log_script(host_id):
+def get_log_configuration_clean_backup_log_script(host_id, context=None):
     """Return LOG_CONFIGURATION_CLEAN_BACKUP_LOG_SCRIPT"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_clean_backup_log_script. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
+    log_configuration = _get_log_configuration('get_log_configuration_clean_backup_log_script', host_id, context)
+    return log_configuration and log_configuration.clean_backup_log_script
 
-    return log_configuration.clean_backup_log_script
 
-
-def get_log_configuration_cron_minute(host_id):
+def get_log_configuration_cron_minute(host_id, context=None):
     """Return LOG_CONFIGURATION_CRON_MINUTE"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
+    log_configuration = _get_log_configuration('get_log_configuration_cron_minute', host_id, context)
+    return log_configuration and log_configuration.cron_minute
 
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_cron_minute. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
-
-    return log_configuration.cron_minute
 
-
-def get_log_configuration_cron_hour(host_id):
+def get_log_configuration_cron_hour(host_id, context=None):
     """Return LOG_CONFIGURATION_CRON_HOUR"""
-    from django.core.exceptions import ObjectDoesNotExist
-    from physical.models import Host
-    from backup.models import LogConfiguration
-
-    try:
-        host = Host.objects.get(id=host_id)
-        databaseinfra = host.instances.all()[0].databaseinfra
-    except Exception as e:
-        LOG.warn("Error on get_log_configuration_cron_hour. Host id: {} - error: {}".format(host_id, e))
-        return None
-
-    try:
-        log_configuration = LogConfiguration.objects.get(environment=databaseinfra.environment,
-                                                         engine_type=databaseinfra.engine.engine_type)
-    except ObjectDoesNotExist:
-        return None
-
-    return log_configuration.cron_hour
+    log_configuration = _get_log_configuration('get_log_configuration_cron_hour', host_id, context)
+    return log_configuration and log_configuration.cron_hour
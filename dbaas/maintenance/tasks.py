@@ -1,3 +1,4 @@
+import threading
 from util import exec_remote_command
 from datetime import datetime
 from dbaas.celery import app
@@ -7,12 +8,103 @@ from notification.models import TaskHistory
 from util import get_worker_name
 from util import build_context_script
 from util import get_dict_lines
-from django.core.exceptions import ObjectDoesNotExist
-from registered_functions.functools import _get_function
+from util import full_stack
+from util.parallel import run_in_parallel
+from registered_functions.functools import _get_function, ParametersContext
 
 LOG = logging.getLogger(__name__)
 
 
+def run_host_maintenance(hm, maintenance, task_history, parameters=None,
+                         context=None):
+    """ Runs the scripts of maintenance on the host of hm, saving its status
+
+    parameters are the MaintenanceParameters of maintenance and context the
+    ParametersContext of the hosts, both are loaded when not given
+    """
+    main_output = {}
+    hm.status = hm.RUNNING
+    hm.started_at = datetime.now()
+    hm.save()
+
+    if hm.host is None:
+        hm.status = hm.UNAVAILABLEHOST
+        hm.finished_at = datetime.now()
+        hm.save()
+        return hm
+
+    host = hm.host
+    update_task = "\nRunning Maintenance on {}".format(host)
+
+    if parameters is None:
+        parameters = models.MaintenanceParameters.objects.filter(
+            maintenance=maintenance
+        )
+    if context is None:
+        context = ParametersContext([host.id])
+
+    cloudstack_host_attributes = context.host_attr(host.id)
+    if cloudstack_host_attributes is None:
+        LOG.warn("Host {} does not have cloudstack attrs".format(hm.host))
+        hm.status = hm.UNAVAILABLECSHOSTATTR
+        hm.finished_at = datetime.now()
+        hm.save()
+        return hm
+
+    param_dict = {}
+    for param in parameters:
+        param_function = _get_function(param.function_name)
+        param_dict[param.parameter_name] = param_function(host.id, context)
+
+    main_script = build_context_script(param_dict, maintenance.main_script)
+    exit_status = exec_remote_command(server=host.address,
+                                      username=cloudstack_host_attributes.vm_user,
+                                      password=cloudstack_host_attributes.vm_password,
+                                      command=main_script, output=main_output)
+
+    if exit_status == 0:
+        hm.status = hm.SUCCESS
+    else:
+
+        if maintenance.rollback_script:
+            rollback_output = {}
+            hm.status = hm.ROLLBACK
+            hm.save()
+
+            rollback_script = build_context_script(
+                param_dict, maintenance.rollback_script)
+            exit_status = exec_remote_command(server=host.address,
+                                              username=cloudstack_host_attributes.vm_user,
+                                              password=cloudstack_host_attributes.vm_password,
+                                              command=rollback_script, output=rollback_output)
+
+            if exit_status == 0:
+                hm.status = hm.ROLLBACK_SUCCESS
+            else:
+                hm.status = hm.ROLLBACK_ERROR
+
+            hm.rollback_log = get_dict_lines(rollback_output)
+
+        else:
+            hm.status = hm.ERROR
+
+    update_task += "...status: {}".format(hm.status)
+
+    task_history.update_details(persist=True,
+                                details=update_task)
+
+    hm.main_log = get_dict_lines(main_output)
+    hm.finished_at = datetime.now()
+    hm.save()
+    return hm
+
+
+def get_batches(items, batch_size):
+    """ Splits items in lists of batch_size, 0 means one list with all """
+    batch_size = batch_size or len(items) or 1
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+
 @app.task(bind=True)
 def execute_scheduled_maintenance(self, maintenance_id):
     LOG.debug("Maintenance id: {}".format(maintenance_id))
@@ -32,81 +124,78 @@ def execute_scheduled_maintenance(self, maintenance_id):
     task_history.update_details(persist=True,
                                 details="Executing Maintenance: {}".format(maintenance))
 
-    for hm in models.HostMaintenance.objects.filter(maintenance=maintenance):
-        main_output = {}
-        hm.status = hm.RUNNING
-        hm.started_at = datetime.now()
-        hm.save()
-
-        if hm.host is None:
-            hm.status = hm.UNAVAILABLEHOST
-            hm.finished_at = datetime.now()
-            hm.save()
-            continue
-
-        host = hm.host
-        update_task = "\nRunning Maintenance on {}".format(host)
+    # Hosts removed after the maintenance was scheduled
+    models.HostMaintenance.objects.filter(
+        maintenance=maintenance, host__isnull=True
+    ).update(status=models.HostMaintenance.UNAVAILABLEHOST,
+             finished_at=datetime.now())
+    host_maintenances = list(models.HostMaintenance.objects.filter(
+        maintenance=maintenance, host__isnull=False
+    ).select_related('host'))
+    parameters = list(
+        models.MaintenanceParameters.objects.filter(maintenance=maintenance)
+    )
+    batches = get_batches(host_maintenances, maintenance.batch_size)
+    workers = maintenance.maximum_workers or 1
+
+    # Hosts that finish at the same time update it
+    progress = {'failures': 0, 'stopped': False}
+    progress_lock = threading.Lock()
+
+    def run(hm, context):
+        with progress_lock:
+            if progress['stopped']:
+                return hm
 
         try:
-            cloudstack_host_attributes = host.cs_host_attributes.get()
-        except ObjectDoesNotExist as e:
-            LOG.warn(
-                "Host {} does not have cloudstack attrs...{}".format(hm.host, e))
-            hm.status = hm.UNAVAILABLECSHOSTATTR
+            run_host_maintenance(
+                hm, maintenance, task_history, parameters, context
+            )
+        except Exception:
+            LOG.error("Maintenance on {} failed".format(hm.hostname))
+            hm.status = hm.ERROR
+            hm.main_log = full_stack()
             hm.finished_at = datetime.now()
             hm.save()
-            continue
-
-        param_dict = {}
-        for param in models.MaintenanceParameters.objects.filter(maintenance=maintenance):
-            param_function = _get_function(param.function_name)
-            param_dict[param.parameter_name] = param_function(host.id)
-
-        main_script = build_context_script(param_dict, maintenance.main_script)
-        exit_status = exec_remote_command(server=host.address,
-                                          username=cloudstack_host_attributes.vm_user,
-                                          password=cloudstack_host_attributes.vm_password,
-                                          command=main_script, output=main_output)
-
-        if exit_status == 0:
-            hm.status = hm.SUCCESS
-        else:
 
-            if maintenance.rollback_script:
-                rollback_output = {}
-                hm.status = hm.ROLLBACK
-                hm.save()
-
-                rollback_script = build_context_script(
-                    param_dict, maintenance.rollback_script)
-                exit_status = exec_remote_command(server=host.address,
-                                                  username=cloudstack_host_attributes.vm_user,
-                                                  password=cloudstack_host_attributes.vm_password,
-                                                  command=rollback_script, output=rollback_output)
-
-                if exit_status == 0:
-                    hm.status = hm.ROLLBACK_SUCCESS
-                else:
-                    hm.status = hm.ROLLBACK_ERROR
-
-                hm.rollback_log = get_dict_lines(rollback_output)
-
-            else:
-                hm.status = hm.ERROR
-
-        update_task += "...status: {}".format(hm.status)
-
-        task_history.update_details(persist=True,
-                                    details=update_task)
-
-        hm.main_log = get_dict_lines(main_output)
-        hm.finished_at = datetime.now()
-        hm.save()
+        if hm.status != hm.SUCCESS:
+            with progress_lock:
+                progress['failures'] += 1
+                if maintenance.maximum_failures and \
+                        progress['failures'] >= maintenance.maximum_failures:
+                    progress['stopped'] = True
+        return hm
+
+    for count, batch in enumerate(batches, start=1):
+        if progress['stopped']:
+            break
+
+        task_history.update_details(
+            persist=True, details="\nBatch {} of {}: {} hosts, {} at the "
+            "same time".format(count, len(batches), len(batch), workers)
+        )
+        # Parameters of every host of the batch are loaded together
+        context = ParametersContext([hm.host_id for hm in batch])
+        run_in_parallel(lambda hm: run(hm, context), batch, workers)
+
+    if progress['stopped']:
+        models.HostMaintenance.update_status(
+            maintenance, models.HostMaintenance.SKIPPED,
+            current_status=models.HostMaintenance.WAITING
+        )
 
     models.Maintenance.objects.filter(id=maintenance_id,
                                       ).update(status=maintenance.FINISHED, finished_at=datetime.now())
 
-    task_history.update_status_for(TaskHistory.STATUS_SUCCESS,
-                                   details='Maintenance executed succesfully')
+    if progress['stopped']:
+        task_history.update_status_for(
+            TaskHistory.STATUS_ERROR,
+            details='Maintenance stopped after {} failed hosts'.format(
+                progress['failures']
+            )
+        )
+    else:
+        task_history.update_status_for(TaskHistory.STATUS_SUCCESS,
+                                       details='Maintenance executed succesfully')
 
     LOG.info("Maintenance: {} has FINISHED".format(maintenance,))
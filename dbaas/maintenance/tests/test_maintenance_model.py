@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from datetime import datetime, timedelta
+import mock
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from physical.tests import factory as physical_factory
+from .. import models
+from ..models import Maintenance, HostMaintenance
+
+
+class MaintenanceTestCase(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            models.execute_scheduled_maintenance, 'apply_async'
+        )
+        apply_async = patcher.start()
+        apply_async.return_value.task_id = 'task_id'
+        self.addCleanup(patcher.stop)
+
+    def create_maintenance(self, hosts):
+        with CaptureQueriesContext(connection) as queries:
+            maintenance = Maintenance.objects.create(
+                description='maintenance', main_script='ls',
+                scheduled_for=datetime.now() + timedelta(days=1),
+                hostsid=','.join(str(host.id) for host in hosts)
+            )
+        return maintenance, len(queries)
+
+    def test_host_maintenances_created_in_bulk(self):
+        few_hosts = [physical_factory.HostFactory() for _ in range(2)]
+        many_hosts = [physical_factory.HostFactory() for _ in range(10)]
+
+        few, few_queries = self.create_maintenance(few_hosts)
+        many, many_queries = self.create_maintenance(many_hosts)
+
+        self.assertEqual(few_queries, many_queries)
+        many = Maintenance.objects.get(id=many.id)
+        self.assertEqual(many.affected_hosts, 10)
+        self.assertEqual(many.status, Maintenance.WAITING)
+        self.assertEqual(many.celery_task_id, 'task_id')
+        self.assertEqual(
+            sorted(HostMaintenance.objects.filter(
+                maintenance=many, status=HostMaintenance.WAITING
+            ).values_list('hostname', flat=True)),
+            sorted(host.hostname for host in many_hosts)
+        )
+
+    @mock.patch.object(models.control, 'revoke')
+    @mock.patch.object(Maintenance, 'is_waiting_to_run', new=True)
+    def test_revoke(self, revoke):
+        hosts = [physical_factory.HostFactory() for _ in range(3)]
+        maintenance, _ = self.create_maintenance(hosts)
+        request = mock.Mock()
+        request.user.username = 'admin'
+
+        with self.assertNumQueries(2):
+            self.assertTrue(maintenance.revoke_maintenance(request))
+
+        revoke.assert_called_once_with('task_id')
+        maintenance = Maintenance.objects.get(id=maintenance.id)
+        self.assertEqual(maintenance.status, Maintenance.REVOKED)
+        self.assertEqual(maintenance.revoked_by, 'admin')
+        self.assertEqual(
+            set(HostMaintenance.objects.filter(
+                maintenance=maintenance
+            ).values_list('status', flat=True)),
+            set([HostMaintenance.REVOKED])
+        )
+
+    @mock.patch.object(models.control, 'revoke')
+    def test_delete_keeps_other_maintenances(self, revoke):
+        host = physical_factory.HostFactory()
+        maintenance, _ = self.create_maintenance([host])
+        other, _ = self.create_maintenance([host])
+
+        maintenance.delete()
+
+        self.assertEqual(
+            HostMaintenance.objects.filter(maintenance=other).count(), 1
+        )
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from datetime import datetime, timedelta
+import mock
+from django.test import TestCase
+from dbaas_cloudstack.models import HostAttr
+from physical.tests import factory as physical_factory
+from .. import tasks
+from ..models import Maintenance, HostMaintenance
+
+
+class ExecuteScheduledMaintenanceTestCase(TestCase):
+
+    def setUp(self):
+        self.hosts = []
+        for _ in range(4):
+            host = physical_factory.HostFactory()
+            HostAttr.objects.create(host=host, vm_user='user', vm_password='pass')
+            self.hosts.append(host)
+
+        self.task = mock.Mock()
+        patcher = mock.patch.object(
+            tasks.TaskHistory, 'register', return_value=self.task
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            tasks, 'get_worker_name', return_value='worker'
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_maintenance(self, **kwargs):
+        with mock.patch.object(
+            tasks.execute_scheduled_maintenance, 'apply_async'
+        ) as apply_async:
+            apply_async.return_value.task_id = 'task_id'
+            return Maintenance.objects.create(
+                description='maintenance', main_script='ls',
+                scheduled_for=datetime.now() + timedelta(days=1),
+                hostsid=','.join(str(host.id) for host in self.hosts),
+                **kwargs
+            )
+
+    def execute(self, maintenance):
+        task = tasks.execute_scheduled_maintenance
+        task.push_request(
+            id='task_id', task=task.name, args=[maintenance.id], kwargs={}
+        )
+        try:
+            task.run(maintenance.id)
+        finally:
+            task.pop_request()
+
+    def statuses(self, maintenance):
+        return [
+            hm.status for hm in HostMaintenance.objects.filter(
+                maintenance=maintenance
+            ).order_by('id')
+        ]
+
+    def test_get_batches(self):
+        self.assertEqual(
+            tasks.get_batches([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]]
+        )
+        self.assertEqual(tasks.get_batches([1, 2, 3], 0), [[1, 2, 3]])
+        self.assertEqual(tasks.get_batches([], 0), [])
+
+    @mock.patch.object(tasks, 'exec_remote_command', return_value=0)
+    def test_all_hosts_in_batches(self, exec_remote_command):
+        maintenance = self.create_maintenance(batch_size=3)
+
+        self.execute(maintenance)
+
+        self.assertEqual(self.statuses(maintenance), [HostMaintenance.SUCCESS] * 4)
+        self.assertEqual(exec_remote_command.call_count, 4)
+        details = [
+            call[1]['details'] for call in self.task.update_details.call_args_list
+        ]
+        self.assertIn('\nBatch 2 of 2: 1 hosts, 1 at the same time', details)
+        self.assertEqual(
+            self.task.update_status_for.call_args[0][0],
+            tasks.TaskHistory.STATUS_SUCCESS
+        )
+
+    @mock.patch.object(tasks, 'exec_remote_command', return_value=1)
+    def test_stop_after_maximum_failures(self, exec_remote_command):
+        maintenance = self.create_maintenance(batch_size=1, maximum_failures=2)
+
+        self.execute(maintenance)
+
+        self.assertEqual(self.statuses(maintenance), [
+            HostMaintenance.ERROR, HostMaintenance.ERROR,
+            HostMaintenance.SKIPPED, HostMaintenance.SKIPPED
+        ])
+        self.assertEqual(exec_remote_command.call_count, 2)
+        self.assertEqual(
+            self.task.update_status_for.call_args[0][0],
+            tasks.TaskHistory.STATUS_ERROR
+        )
+        self.assertEqual(
+            Maintenance.objects.get(id=maintenance.id).status,
+            Maintenance.FINISHED
+        )
+
+    @mock.patch.object(tasks, 'exec_remote_command')
+    def test_unexpected_error_on_one_host(self, exec_remote_command):
+        exec_remote_command.side_effect = [0, EnvironmentError, 0, 0]
+        maintenance = self.create_maintenance()
+
+        self.execute(maintenance)
+
+        self.assertEqual(self.statuses(maintenance), [
+            HostMaintenance.SUCCESS, HostMaintenance.ERROR,
+            HostMaintenance.SUCCESS, HostMaintenance.SUCCESS
+        ])
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from django.test import TestCase
+from backup.models import LogConfiguration
+from dbaas_cloudstack.models import HostAttr
+from physical.tests import factory as physical_factory
+from ..registered_functions import functools
+
+
+class ParametersContextTestCase(TestCase):
+
+    def setUp(self):
+        self.hosts = []
+        for port in (27017, 27018):
+            instance = physical_factory.InstanceFactory(port=port)
+            HostAttr.objects.create(
+                host=instance.hostname, vm_user='user', vm_password='pass'
+            )
+            infra = instance.databaseinfra
+            LogConfiguration.objects.create(
+                environment=infra.environment,
+                engine_type=infra.engine.engine_type,
+                filer_path='/filer', mount_point_path='/mnt', log_path='/log',
+                backup_log_script='backup.sh', config_backup_log_script='c.sh',
+                clean_backup_log_script='clean.sh', cron_minute='0',
+                cron_hour='1'
+            )
+            self.hosts.append(instance.hostname)
+
+        self.functions = [
+            getattr(functools, name)
+            for name, _ in functools._get_registered_functions()
+        ]
+
+    def test_same_values_as_without_context(self):
+        context = functools.ParametersContext([host.id for host in self.hosts])
+
+        for host in self.hosts:
+            for function in self.functions:
+                self.assertEqual(
+                    function(host.id, context), function(host.id),
+                    function.__name__
+                )
+
+        host = self.hosts[0]
+        self.assertEqual(functools.get_hostmane(host.id), host.hostname)
+        self.assertEqual(functools.get_host_password(host.id), 'pass')
+        self.assertEqual(functools.get_log_configuration_cron_hour(host.id), '1')
+
+    def test_queries_once_per_batch(self):
+        context = functools.ParametersContext([host.id for host in self.hosts])
+
+        # hosts, instances, host attrs, databases, offerings, log configs
+        with self.assertNumQueries(6):
+            for host in self.hosts:
+                for function in self.functions:
+                    function(host.id, context)
+
+    def test_unknown_host(self):
+        context = functools.ParametersContext([0])
+
+        for function in self.functions:
+            self.assertIsNone(function(0, context), function.__name__)
@@ -3,5 +3,9 @@ from __future__ import absolute_import, unicode_literals
 from django.contrib import admin
 from .. import models
 from .task_history import TaskHistoryAdmin
+from .step_execution import StepExecutionAdmin
+from .workflow_checkpoint import WorkflowCheckpointAdmin
 
 admin.site.register(models.TaskHistory, TaskHistoryAdmin)
+admin.site.register(models.StepExecution, StepExecutionAdmin)
+admin.site.register(models.WorkflowCheckpoint, WorkflowCheckpointAdmin)
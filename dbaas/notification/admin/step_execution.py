@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from django.contrib import admin
+
+from ..models import StepExecution
+
+
+class StepExecutionAdmin(admin.ModelAdmin):
+    actions = None
+    list_display = ("step", "topology", "engine", "environment", "is_rollback",
+                    "outcome", "duration", "started_at", "task")
+    list_filter = ("outcome", "is_rollback", "topology", "engine",
+                   "environment")
+    search_fields = ("step",)
+    date_hierarchy = "started_at"
+    list_select_related = True
+    raw_id_fields = ("task",)
+    readonly_fields = ("task", "step", "is_rollback", "topology", "engine",
+                       "environment", "started_at", "ended_at", "duration",
+                       "outcome")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super(StepExecutionAdmin, self).changelist_view(
+            request, extra_context=extra_context
+        )
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is None:
+            return response
+
+        # Same filters chosen for the list
+        queryset = changelist.queryset
+        response.context_data['report_days'] = StepExecution.REPORT_DAYS
+        response.context_data['report_by_step'] = StepExecution.report(
+            'step', queryset=queryset
+        )
+        response.context_data['report_by_topology'] = StepExecution.report(
+            'topology', queryset=queryset
+        )
+        return response
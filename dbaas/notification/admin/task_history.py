@@ -23,7 +23,7 @@ class TaskHistoryAdmin(admin.ModelAdmin):
     list_filter_advanced = list_filter_basic + ["task_name", "user", ]
     readonly_fields = ('created_at', 'ended_at', 'task_name', 'task_id', 'task_status', 'user', 'context', 'arguments',
                        'friendly_details_read', "db_id")
-    exclude = ('details',)
+    exclude = ('legacy_details',)
 
     def friendly_task_name(self, task_history):
         if task_history.task_name:
@@ -34,10 +34,7 @@ class TaskHistoryAdmin(admin.ModelAdmin):
     friendly_task_name.short_description = "Task Name"
 
     def friendly_details(self, task_history):
-        if task_history.details:
-            return task_history.details.split("\n")[-1]
-        else:
-            return "N/A"
+        return task_history.last_detail or "N/A"
 
     friendly_details.short_description = "Current Step"
 
@@ -72,6 +69,17 @@ class TaskHistoryAdmin(admin.ModelAdmin):
         same_team_users = Team.users_at_same_team(request.user)
         return qs.filter(user__in=[user.username for user in same_team_users])
 
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        task_history = self.get_object(request, object_id)
+        if task_history and not task_history.is_finished:
+            extra_context = extra_context or {}
+            last_log = task_history.logs.order_by('-sequence').first()
+            extra_context['progress_cursor'] = last_log.sequence if last_log else 0
+
+        return super(TaskHistoryAdmin, self).change_view(
+            request, object_id, form_url, extra_context=extra_context
+        )
+
     def changelist_view(self, request, extra_context=None):
         if request.user.has_perm(self.perm_add_database_infra):
             self.list_display = self.list_display_advanced
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from django.conf.urls import patterns, url
+from django.contrib import admin, messages
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect
+from django.utils.html import format_html
+
+from ..models import TaskHistory, WorkflowCheckpoint
+
+
+class WorkflowCheckpointAdmin(admin.ModelAdmin):
+    actions = None
+    list_display = ("name", "workflow", "friendly_status", "failed_steps",
+                    "checkpoint_action", "link_task", "created_at",
+                    "updated_at")
+    list_filter = ("workflow", "status")
+    search_fields = ("name", "task__id", "task__task_id")
+    exclude = ("task", "state")
+    readonly_fields = ("name", "workflow", "status", "done_steps",
+                       "failed_steps", "link_task")
+
+    def friendly_status(self, checkpoint):
+        html_status = {
+            WorkflowCheckpoint.RUNNING: '<span class="label label-success">Running</span>',
+            WorkflowCheckpoint.ERROR: '<span class="label label-important">Error</span>',
+            WorkflowCheckpoint.SUCCESS: '<span class="label label-info">Success</span>',
+            WorkflowCheckpoint.ROLLED_BACK: '<span class="label label-warning">Rolled back</span>',
+        }
+        return format_html(html_status.get(checkpoint.status, ''))
+    friendly_status.short_description = "Status"
+
+    def link_task(self, checkpoint):
+        if not checkpoint.task:
+            return 'N/A'
+        url = reverse(
+            'admin:notification_taskhistory_change', args=[checkpoint.task.id]
+        )
+        return format_html(
+            "<a href={}>{}</a>".format(url, checkpoint.task.id)
+        )
+    link_task.short_description = "Task"
+
+    def checkpoint_action(self, checkpoint):
+        if not checkpoint.is_status_error:
+            return 'N/A'
+
+        html = "<a title='Resume' class='btn btn-info' href='{}'>Resume</a> " \
+            "<a title='Rollback' class='btn btn-danger' href='{}'>Rollback</a>"
+        return format_html(html.format(
+            reverse('admin:workflow_checkpoint_resume', args=[checkpoint.id]),
+            reverse('admin:workflow_checkpoint_rollback', args=[checkpoint.id])
+        ))
+    checkpoint_action.short_description = "Action"
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def _start(self, request, checkpoint_id, task_name, arguments, task):
+        checkpoint = WorkflowCheckpoint.objects.get(id=checkpoint_id)
+        if not checkpoint.is_status_error:
+            self.message_user(
+                request, "Cannot do it, {} status is '{}'!".format(
+                    checkpoint, checkpoint.get_status_display()
+                ), level=messages.ERROR
+            )
+            url = reverse('admin:notification_workflowcheckpoint_changelist')
+            return HttpResponseRedirect(url)
+
+        task_history = TaskHistory()
+        task_history.task_name = task_name
+        task_history.task_status = task_history.STATUS_WAITING
+        task_history.arguments = arguments.format(checkpoint)
+        task_history.user = request.user
+        task_history.save()
+
+        task.delay(
+            checkpoint=checkpoint, task_history=task_history,
+            user=request.user
+        )
+
+        url = reverse('admin:notification_taskhistory_changelist')
+        return HttpResponseRedirect(url)
+
+    def resume(self, request, checkpoint_id):
+        from ..tasks import resume_workflow
+        return self._start(
+            request, checkpoint_id, "resume_workflow", "Resuming {}",
+            resume_workflow
+        )
+
+    def rollback(self, request, checkpoint_id):
+        from ..tasks import rollback_workflow
+        return self._start(
+            request, checkpoint_id, "rollback_workflow", "Rolling back {}",
+            rollback_workflow
+        )
+
+    def get_urls(self):
+        urls = super(WorkflowCheckpointAdmin, self).get_urls()
+        my_urls = patterns(
+            '',
+            url(r'^/?(?P<checkpoint_id>\d+)/resume/$',
+                self.admin_site.admin_view(self.resume),
+                name="workflow_checkpoint_resume"),
+
+            url(r'^/?(?P<checkpoint_id>\d+)/rollback/$',
+                self.admin_site.admin_view(self.rollback),
+                name="workflow_checkpoint_rollback"),
+        )
+        return my_urls + urls
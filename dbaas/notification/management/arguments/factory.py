@@ -11,6 +11,14 @@ class ArgumentsTo(object):
     def database_name(self):
         return self.args['database'].name
 
+    @property
+    def environment(self):
+        return self.args['database'].environment
+
+    def databases(self):
+        """ (name, environment) of the databases that the task works on """
+        return [(self.database_name, self.environment)]
+
     def get_database_arg(self):
         return "Database: {}".format(self.database_name)
 
@@ -45,6 +53,10 @@ class ArgumentsToCreateDatabase(ArgumentsTo):
     def database_name(self):
         return self.args['name']
 
+    @property
+    def environment(self):
+        return self.args['environment']
+
 
 class ArgumentsToResizeDatabase(ArgumentsTo):
     KEY = 'notification.tasks.resize_database'
@@ -113,6 +125,16 @@ class ArgumentsToCloneDatabase(ArgumentsTo):
     def database_name(self):
         return self.args['origin_database'].name
 
+    @property
+    def environment(self):
+        return self.args['origin_database'].environment
+
+    def databases(self):
+        return [
+            (self.database_name, self.environment),
+            (self.args['clone_name'], self.args['environment']),
+        ]
+
 
 class ArgumentsToAnalyzeDatabases(ArgumentsTo):
     KEY = 'dbaas_services.analyzing.tasks.analyze.analyze_databases'
@@ -122,6 +144,9 @@ class ArgumentsToAnalyzeDatabases(ArgumentsTo):
             "Description: Analyzing all databases",
         ]
 
+    def databases(self):
+        return []
+
 
 class ArgumentsToUpgradeMongo24To30(ArgumentsTo):
     KEY = 'notification.tasks.upgrade_mongodb_24_to_30'
@@ -145,6 +170,10 @@ class ArgumentsToUnbindAddress(ArgumentsTo):
     def database_name(self):
         return self.args['database_bind'].database.name
 
+    @property
+    def environment(self):
+        return self.args['database_bind'].database.environment
+
 
 class ArgumentsToBindAddress(ArgumentsTo):
     KEY = 'dbaas_aclapi.tasks.bind_address_on_database'
@@ -158,3 +187,7 @@ class ArgumentsToBindAddress(ArgumentsTo):
     @property
     def database_name(self):
         return self.args['database_bind'].database.name
+
+    @property
+    def environment(self):
+        return self.args['database_bind'].database.environment
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from datetime import datetime, timedelta
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from notification.models import StepExecution
+
+
+class Command(BaseCommand):
+    help = "Duration percentiles (p50/p95) of workflow steps, slowest first"
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            "-g",
+            "--group_by",
+            dest="group_by",
+            default="step",
+            help="Group executions by 'step' or 'topology'",
+        ),
+        make_option(
+            "-d",
+            "--days",
+            dest="days",
+            default=StepExecution.REPORT_DAYS,
+            type="int",
+            help="Only executions started in the last days",
+        ),
+        make_option(
+            "-l",
+            "--limit",
+            dest="limit",
+            default=20,
+            type="int",
+            help="Number of lines",
+        ),
+    )
+
+    def handle(self, *args, **kwargs):
+        group_by = kwargs['group_by']
+        if group_by not in StepExecution.REPORT_GROUPS:
+            raise CommandError("Please group by {}".format(
+                " or ".join(StepExecution.REPORT_GROUPS)
+            ))
+
+        since = datetime.now() - timedelta(days=kwargs['days'])
+        report = StepExecution.report(group_by=group_by, since=since)
+
+        self.stdout.write("{:>10} {:>10} {:>10} {:>7} {:>7}  {}".format(
+            "p50 (s)", "p95 (s)", "max (s)", "runs", "errors", group_by
+        ))
+        for line in report[:kwargs['limit']]:
+            self.stdout.write(
+                "{p50:>10.1f} {p95:>10.1f} {max:>10.1f} "
+                "{executions:>7} {errors:>7}  {name}".format(**line)
+            )
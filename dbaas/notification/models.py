@@ -1,17 +1,37 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
+import atexit
 import logging
+import math
+import threading
 import time
-from datetime import datetime
-from django.db import models
+from datetime import datetime, timedelta
+from celery.signals import worker_process_shutdown
+from django.db import connection, models, transaction, IntegrityError
 from django.utils.translation import ugettext_lazy as _
 from django.utils import simplejson
 from logical.models import Database
 
+from system.models import Configuration
 from util.models import BaseModel
 
 LOG = logging.getLogger(__name__)
 
+# Lines kept in memory before being written
+DEFAULT_LOG_BUFFER_SIZE = 20
+# Seconds that a line may wait in memory
+DEFAULT_LOG_FLUSH_INTERVAL = 5
+# Seconds between reads while waiting for new lines
+LOG_POLL_INTERVAL = 1
+# Seconds between checks for lines waiting longer than the flush interval
+LOG_FLUSHER_INTERVAL = 1
+
+LOG_BUFFER_LOCK = threading.RLock()
+# Tasks by id(), model instances with the same pk are equal
+TASKS_WITH_PENDING_LOGS = {}
+# Thread writing lines of tasks that stopped logging, while there are any
+LOG_FLUSHER = None
+
 
 class TaskHistory(BaseModel):
 
@@ -27,6 +47,8 @@ class TaskHistory(BaseModel):
 
     _STATUS = [STATUS_PENDING, STATUS_RUNNING, STATUS_SUCCESS,
                STATUS_ERROR, STATUS_WARNING, STATUS_WAITING]
+    _ACTIVE_STATUS = [STATUS_PENDING, STATUS_RUNNING, STATUS_WAITING]
+    _FINISHED_STATUS = [STATUS_SUCCESS, STATUS_ERROR, STATUS_WARNING]
 
     task_id = models.CharField(
         _('Task ID'), max_length=200, null=True, blank=True, editable=False)
@@ -39,51 +61,191 @@ class TaskHistory(BaseModel):
         _('Task Status'), max_length=100, default=STATUS_PENDING, db_index=True
     )
     context = models.TextField(null=True, blank=True)
-    details = models.TextField(
-        verbose_name=_("Details"), null=True, blank=True)
+    # Details written before TaskHistoryLog, new lines go to logs
+    legacy_details = models.TextField(
+        verbose_name=_("Details"), null=True, blank=True, db_column='details')
     arguments = models.TextField(
         verbose_name=_("Arguments"), null=True, blank=True)
     db_id = models.ForeignKey(
         Database, related_name="database", null=True, blank=True, on_delete=models.SET_NULL)
 
+    _details = None
+    _last_sequence = None
+    _pending_logs = None
+    _pending_since = None
+    # Kept in the process that buffered the lines
+    _BUFFER_STATE = (
+        '_details', '_last_sequence', '_pending_logs', '_pending_since'
+    )
+
     def __unicode__(self):
         return u"%s" % self.task_id
 
+    def __getstate__(self):
+        """
+        A copy sent to another process (e.g. as an argument of .delay())
+        does not carry the buffered lines, it reads its next sequence
+        """
+        state = self.__dict__.copy()
+        for name in self._BUFFER_STATE:
+            state.pop(name, None)
+        return state
+
+    def __reduce__(self):
+        # Model.__reduce__ pickles __dict__ as it is
+        function, args, _ = super(TaskHistory, self).__reduce__()
+        return function, args, self.__getstate__()
+
     def load_context_data(self):
         if self.context == '':
             self.context = '{}'
         self.context_data = simplejson.loads(self.context)
         return self.context_data
 
-    def update_details(self, details, persist=False):
+    @property
+    def details(self):
         """
-        Method to update the details of a task history.
-        TODO: should we put a timestamp in details? should we append the details?
+        All the lines of the task as a single text, it is built from the
+        logs on the first access
         """
+        if self._details is None:
+            self.flush_logs()
+            lines = [self.legacy_details] if self.legacy_details else []
+            if self.pk:
+                lines.extend(log.formatted for log in self.logs.all())
+            self._details = "\n".join(lines) or None
+        return self._details
+
+    @details.setter
+    def details(self, value):
+        self.legacy_details = value
+        self._details = None
+
+    def append_log(self, message, level=0, step=None, flush=False):
+        """
+        Buffers one line of the task output. Lines are written together when
+        'task_history_log_buffer_size' lines are waiting, when the oldest one
+        waits for 'task_history_log_flush_interval' seconds (checked by a
+        background thread too), on flush=True, on status changes and when
+        the process exits
+        """
+        if not self.pk:
+            self.save()
 
-        if self.details:
-            self.details = "\n%s%s" % (self.details, details)
-        else:
-            self.details = details
+        with LOG_BUFFER_LOCK:
+            if self._last_sequence is None:
+                self._last_sequence = self.__last_stored_sequence()
+            self._last_sequence += 1
+
+            log = TaskHistoryLog(
+                task=self, sequence=self._last_sequence, created_at=datetime.now(),
+                level=level or 0, step=step, message=message
+            )
+            if not self._pending_logs:
+                self._pending_logs = []
+                self._pending_since = time.time()
+                TASKS_WITH_PENDING_LOGS[id(self)] = self
+                start_log_flusher()
+            self._pending_logs.append(log)
+            self._details = None
+
+            buffer_size = Configuration.get_by_name_as_int(
+                'task_history_log_buffer_size', default=DEFAULT_LOG_BUFFER_SIZE)
+            if flush or len(self._pending_logs) >= buffer_size or \
+                    time.time() - self._pending_since >= get_log_flush_interval():
+                self.flush_logs()
+
+        return log
+
+    def __last_stored_sequence(self):
+        return self.logs.aggregate(last=models.Max('sequence'))['last'] or 0
+
+    def flush_logs(self):
+        """ Writes the buffered lines with one INSERT """
+        with LOG_BUFFER_LOCK:
+            logs = self._pending_logs
+            if not logs:
+                return
+
+            for _ in range(2):
+                try:
+                    with transaction.atomic():
+                        TaskHistoryLog.objects.bulk_create(logs)
+                    break
+                except IntegrityError:
+                    # Another process wrote on the same task
+                    sequence = self.__last_stored_sequence()
+                    for sequence, log in enumerate(logs, start=sequence + 1):
+                        log.sequence = sequence
+                    self._last_sequence = sequence
+            else:
+                raise RuntimeError("Could not write logs of task {}".format(self))
+
+            self._pending_logs = None
+            TASKS_WITH_PENDING_LOGS.pop(id(self), None)
+
+    def logs_after(self, sequence=0, limit=None):
+        self.flush_logs()
+        logs = self.logs.filter(sequence__gt=sequence)
+        if limit:
+            logs = logs[:limit]
+        return logs
+
+    def wait_logs(self, sequence=0, timeout=0, limit=None):
+        """
+        Lines after sequence, waits up to timeout seconds for new lines
+        while the task is not finished
+        """
+        deadline = time.time() + timeout
+        while True:
+            logs = list(self.logs_after(sequence, limit))
+            if logs or self.is_finished or time.time() >= deadline:
+                return logs
+
+            time.sleep(LOG_POLL_INTERVAL)
+            self.task_status = TaskHistory.objects.filter(
+                pk=self.pk
+            ).values_list('task_status', flat=True)[0]
+
+    def progress(self, sequence=0, timeout=0, limit=None):
+        """ Lines added after sequence (the cursor) and the task status """
+        logs = self.wait_logs(sequence, timeout, limit)
+        progress = {
+            'task_status': self.task_status,
+            'finished': self.is_finished and not (limit and len(logs) == limit),
+            'cursor': logs[-1].sequence if logs else sequence,
+            'lines': [log.as_dict() for log in logs],
+        }
+        if not sequence and self.legacy_details:
+            progress['legacy_details'] = self.legacy_details
+        return progress
 
-        if persist:
-            self.save()
+    @property
+    def last_detail(self):
+        self.flush_logs()
+        last_log = self.logs.order_by('-sequence').first()
+        if last_log:
+            return last_log.formatted
+        if self.legacy_details:
+            return self.legacy_details.split("\n")[-1]
 
-    def add_detail(self, message, level=None):
-        extra = ''
-        if level > 0:
-            extra = '{}> '.format('-' * level)
+    def update_details(self, details, persist=False):
+        """
+        Method to update the details of a task history.
+        With persist the line is written right away, else it is buffered
+        """
+        self.append_log(details, flush=persist)
 
-        self.details = "{}\n".format(self.details) if self.details else ""
-        self.details = '{}{}{}'.format(self.details, extra, message)
-        self.save()
+    def add_detail(self, message, level=None):
+        self.append_log(message, level=level)
 
     def add_step(self, step, total, description):
         current_time = str(time.strftime("%m/%d/%Y %H:%M:%S"))
         message = '{} - Step {} of {} - {}'.format(
             current_time, step, total, description
         )
-        self.add_detail(message, level=2)
+        # The step being run is shown right away
+        self.append_log(message, level=2, step=step, flush=True)
         LOG.info(message)
 
     def update_status_for(self, status, details=None):
@@ -91,12 +253,45 @@ class TaskHistory(BaseModel):
             raise RuntimeError("Invalid task status")
 
         self.task_status = status
-        self.details = (self.details or " ") + "\n" + str(details)
-        if status in [TaskHistory.STATUS_SUCCESS, TaskHistory.STATUS_ERROR, TaskHistory.STATUS_WARNING]:
+        if details is not None:
+            self.append_log(str(details))
+        self.flush_logs()
+        if status in TaskHistory._FINISHED_STATUS:
             self.update_ended_at()
+            self.release_databases()
         else:
             self.save()
 
+    def add_database_lock(self, database_name, environment=None):
+        """ Records that this task holds database while it is active """
+        if not self.pk:
+            self.save()
+        return TaskDatabaseLock.objects.get_or_create(
+            task=self, database_name=database_name,
+            environment=unicode(environment) if environment else None
+        )[0]
+
+    def lock_databases(self, databases):
+        """ Replaces the held databases by databases [(name, environment)] """
+        self.release_databases()
+        for database_name, environment in databases:
+            self.add_database_lock(database_name, environment)
+
+    def release_databases(self):
+        if self.pk:
+            self.database_locks.all().delete()
+
+    @classmethod
+    def tasks_holding(cls, database_name, environment=None, status=None):
+        """ Active tasks (or tasks in status) holding database """
+        locks = TaskDatabaseLock.objects.filter(database_name=database_name)
+        if environment:
+            locks = locks.filter(environment=unicode(environment))
+        return cls.objects.filter(
+            id__in=locks.values('task_id'),
+            task_status__in=status or cls._ACTIVE_STATUS
+        )
+
     def update_dbid(self, db):
         self.db_id = db
         self.save()
@@ -107,7 +302,8 @@ class TaskHistory(BaseModel):
 
     @classmethod
     def register(cls, request=None, user=None, task_history=None, worker_name=None):
-        from .util import factory_arguments_for_task
+        from .util import factory_arguments_for_task, \
+            factory_databases_for_task
 
         LOG.info(
             "task id: {} | task name: {} | ".format(request.id, request.task)
@@ -137,6 +333,10 @@ class TaskHistory(BaseModel):
 
         task_history.save()
 
+        databases = factory_databases_for_task(request.task, request.kwargs)
+        if databases:
+            task_history.lock_databases(databases)
+
         return task_history
 
     @classmethod
@@ -150,3 +350,342 @@ class TaskHistory(BaseModel):
     @property
     def is_running(self):
         return self.task_status == self.STATUS_RUNNING
+
+    @property
+    def is_finished(self):
+        return self.task_status in self._FINISHED_STATUS
+
+
+def get_log_flush_interval():
+    return Configuration.get_by_name_as_int(
+        'task_history_log_flush_interval', default=DEFAULT_LOG_FLUSH_INTERVAL
+    )
+
+
+def flush_pending_logs(older_than=None, **kwargs):
+    """ Writes the lines buffered (for older_than seconds) of all tasks """
+    with LOG_BUFFER_LOCK:
+        tasks = TASKS_WITH_PENDING_LOGS.values()
+        if older_than:
+            tasks = [
+                task for task in tasks
+                if time.time() - task._pending_since >= older_than
+            ]
+    for task in tasks:
+        try:
+            task.flush_logs()
+        except Exception as e:
+            LOG.error("Could not write logs of task {}: {}".format(task, e))
+
+
+def start_log_flusher():
+    """ Starts the flusher thread if it is not running, holding the lock """
+    global LOG_FLUSHER
+    # A thread of the parent process is not alive after a fork
+    if LOG_FLUSHER is None or not LOG_FLUSHER.is_alive():
+        LOG_FLUSHER = threading.Thread(
+            target=run_log_flusher, name='task-history-log-flusher'
+        )
+        LOG_FLUSHER.daemon = True
+        LOG_FLUSHER.start()
+
+
+def run_log_flusher():
+    """
+    Writes the lines of tasks that stopped logging before the flush
+    interval, the thread ends when there are no lines waiting
+    """
+    global LOG_FLUSHER
+    try:
+        while True:
+            time.sleep(LOG_FLUSHER_INTERVAL)
+            with LOG_BUFFER_LOCK:
+                if not TASKS_WITH_PENDING_LOGS:
+                    LOG_FLUSHER = None
+                    return
+            try:
+                flush_pending_logs(older_than=get_log_flush_interval())
+            except Exception as e:
+                LOG.error("Could not write pending logs: {}".format(e))
+    finally:
+        with LOG_BUFFER_LOCK:
+            if LOG_FLUSHER is threading.current_thread():
+                LOG_FLUSHER = None
+        connection.close()
+
+
+atexit.register(flush_pending_logs)
+worker_process_shutdown.connect(flush_pending_logs)
+
+
+class TaskHistoryLog(models.Model):
+
+    """ One line of TaskHistory output """
+
+    task = models.ForeignKey(TaskHistory, related_name="logs")
+    sequence = models.PositiveIntegerField()
+    # Set when the line is buffered, not when it is written
+    created_at = models.DateTimeField(
+        verbose_name=_("created_at"), default=datetime.now)
+    level = models.PositiveSmallIntegerField(default=0)
+    step = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField()
+
+    class Meta:
+        unique_together = (('task', 'sequence'),)
+        ordering = ('sequence',)
+
+    def __unicode__(self):
+        return self.formatted
+
+    def as_dict(self):
+        return {
+            'sequence': self.sequence,
+            'created_at': self.created_at.isoformat(),
+            'level': self.level,
+            'step': self.step,
+            'message': self.message,
+        }
+
+    @property
+    def formatted(self):
+        extra = ''
+        if self.level > 0:
+            extra = '{}> '.format('-' * self.level)
+        return '{}{}'.format(extra, self.message)
+
+
+class TaskDatabaseLock(models.Model):
+
+    """ Database held by a TaskHistory while it is active """
+
+    task = models.ForeignKey(TaskHistory, related_name="database_locks")
+    database_name = models.CharField(max_length=100)
+    environment = models.CharField(max_length=100, null=True, blank=True)
+
+    class Meta:
+        index_together = (('database_name', 'environment'),)
+
+    def __unicode__(self):
+        return "{} ({})".format(self.database_name, self.environment)
+
+
+def percentile(values, percent):
+    """ Nearest-rank percentile of a sorted list """
+    if not values:
+        return None
+    rank = int(math.ceil(len(values) * percent / 100.0))
+    return values[max(rank, 1) - 1]
+
+
+class StepExecution(models.Model):
+
+    """ Time spent running one workflow step """
+
+    SUCCESS = 'SUCCESS'
+    ERROR = 'ERROR'
+    OUTCOME_CHOICES = (
+        (SUCCESS, 'Success'),
+        (ERROR, 'Error'),
+    )
+
+    REPORT_GROUPS = {
+        'step': 'step',
+        'topology': 'topology__name',
+    }
+    # Days of executions considered by the report unless told otherwise
+    REPORT_DAYS = 30
+
+    task = models.ForeignKey(
+        TaskHistory, related_name="step_executions", null=True, blank=True,
+        on_delete=models.SET_NULL
+    )
+    step = models.CharField(_('Step'), max_length=255, db_index=True)
+    is_rollback = models.BooleanField(default=False)
+    topology = models.ForeignKey(
+        'physical.ReplicationTopology', related_name="step_executions",
+        null=True, blank=True, on_delete=models.SET_NULL
+    )
+    engine = models.CharField(max_length=100, null=True, blank=True)
+    environment = models.CharField(max_length=100, null=True, blank=True)
+    started_at = models.DateTimeField(_('Started at'), db_index=True)
+    ended_at = models.DateTimeField(_('Ended at'))
+    duration = models.FloatField(_('Duration (seconds)'))
+    outcome = models.CharField(
+        max_length=20, choices=OUTCOME_CHOICES, default=SUCCESS
+    )
+
+    class Meta:
+        ordering = ('-started_at',)
+
+    def __unicode__(self):
+        return "{} ({:.1f}s)".format(self.step, self.duration)
+
+    @classmethod
+    def register(cls, step, started_at, ended_at, outcome, task=None,
+                 plan=None, environment=None, is_rollback=False):
+        """ Never raises, timing must not break the workflow """
+        try:
+            execution = cls(
+                step=step, started_at=started_at, ended_at=ended_at,
+                duration=(ended_at - started_at).total_seconds(),
+                outcome=outcome, is_rollback=is_rollback,
+                environment=str(environment) if environment else None,
+            )
+            if isinstance(task, TaskHistory) and task.pk:
+                execution.task = task
+            if plan:
+                execution.topology_id = plan.replication_topology_id
+                execution.engine = str(plan.engine)
+            execution.save()
+            return execution
+        except Exception as e:
+            LOG.warn("Could not register execution of {}: {}".format(step, e))
+
+    @classmethod
+    def report(cls, group_by='step', since=None, queryset=None):
+        """
+        Duration percentiles of the steps executed since 'since', the last
+        REPORT_DAYS days by default (rollbacks are not considered), grouped
+        by step class or by topology, slowest first
+        """
+        field = cls.REPORT_GROUPS[group_by]
+        if queryset is None:
+            queryset = cls.objects.all()
+        if since is None:
+            since = datetime.now() - timedelta(days=cls.REPORT_DAYS)
+        queryset = queryset.filter(is_rollback=False, started_at__gte=since)
+
+        groups = {}
+        for name, duration, outcome in queryset.values_list(
+            field, 'duration', 'outcome'
+        ).order_by():
+            group = groups.setdefault(name, {'durations': [], 'errors': 0})
+            group['durations'].append(duration)
+            if outcome == cls.ERROR:
+                group['errors'] += 1
+
+        report = []
+        for name, group in groups.items():
+            durations = sorted(group['durations'])
+            report.append({
+                'name': name or 'N/A',
+                'executions': len(durations),
+                'errors': group['errors'],
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'max': durations[-1],
+            })
+        return sorted(report, key=lambda line: line['p95'], reverse=True)
+
+
+class WorkflowCheckpoint(BaseModel):
+
+    """
+    State of a deploy or clone workflow saved after each step, so a failed
+    run can be resumed from the step that failed or rolled back later
+    """
+
+    DEPLOY = 'deploy'
+    CLONE = 'clone'
+    WORKFLOW_CHOICES = (
+        (DEPLOY, 'Deploy'),
+        (CLONE, 'Clone'),
+    )
+
+    RUNNING = 1
+    ERROR = 2
+    SUCCESS = 3
+    ROLLED_BACK = 4
+    STATUS_CHOICES = (
+        (RUNNING, 'Running'),
+        (ERROR, 'Error'),
+        (SUCCESS, 'Success'),
+        (ROLLED_BACK, 'Rolled back'),
+    )
+
+    task = models.ForeignKey(
+        TaskHistory, related_name="workflow_checkpoints", null=True,
+        blank=True, on_delete=models.SET_NULL
+    )
+    workflow = models.CharField(
+        _('Workflow'), max_length=20, choices=WORKFLOW_CHOICES
+    )
+    name = models.CharField(_('Database name'), max_length=100, db_index=True)
+    state = models.TextField(default='{}')
+    done_steps = models.TextField(default='[]')
+    failed_steps = models.TextField(default='[]')
+    status = models.IntegerField(
+        _('Status'), choices=STATUS_CHOICES, default=RUNNING
+    )
+
+    _lock = None
+
+    class Meta:
+        ordering = ('-updated_at',)
+
+    def __unicode__(self):
+        return "{} {}".format(self.get_workflow_display(), self.name)
+
+    @property
+    def lock(self):
+        # Steps of a graph workflow finish at the same time
+        if self._lock is None:
+            self._lock = threading.Lock()
+        return self._lock
+
+    @classmethod
+    def start(cls, workflow, workflow_dict, task=None):
+        checkpoint = cls(workflow=workflow, name=workflow_dict['name'])
+        if isinstance(task, TaskHistory) and task.pk:
+            checkpoint.task = task
+        checkpoint.save()
+        return checkpoint
+
+    def get_done_steps(self):
+        return simplejson.loads(self.done_steps)
+
+    def get_failed_steps(self):
+        return simplejson.loads(self.failed_steps)
+
+    def load_state(self):
+        from workflow.checkpoint import load_state
+        return load_state(simplejson.loads(self.state))
+
+    def step_done(self, step, workflow_dict):
+        """ Never raises, a step not saved is run again when resuming """
+        from workflow.checkpoint import dump_state
+        with self.lock:
+            try:
+                done_steps = self.get_done_steps()
+                if step not in done_steps:
+                    done_steps.append(step)
+                self.state = simplejson.dumps(dump_state(workflow_dict))
+                self.done_steps = simplejson.dumps(done_steps)
+                self.save(update_fields=['state', 'done_steps', 'updated_at'])
+            except Exception as e:
+                LOG.warn("Could not save checkpoint of {}: {}".format(step, e))
+
+    def resume(self, task=None):
+        self.status = self.RUNNING
+        self.failed_steps = '[]'
+        if isinstance(task, TaskHistory) and task.pk:
+            self.task = task
+        self.save()
+
+    def set_error(self, failed_steps):
+        self.status = self.ERROR
+        self.failed_steps = simplejson.dumps(list(failed_steps))
+        self.save()
+
+    def set_success(self):
+        self.status = self.SUCCESS
+        self.save()
+
+    def set_rolled_back(self):
+        self.status = self.ROLLED_BACK
+        self.save()
+
+    @property
+    def is_status_error(self):
+        return self.status == self.ERROR
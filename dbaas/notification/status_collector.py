@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+from logical.models import Database
+from physical.models import DatabaseInfra, Instance
+from system.models import Configuration
+from util.parallel import run_in_parallel
+
+LOG = logging.getLogger(__name__)
+
+STATUS_COLLECTOR_DEFAULT_WORKERS = 10
+STATUS_COLLECTOR_DEFAULT_TIMEOUT = 60
+
+
+def get_collector_workers():
+    return Configuration.get_by_name_as_int(
+        'status_collector_workers', default=STATUS_COLLECTOR_DEFAULT_WORKERS
+    )
+
+
+def get_collector_timeout():
+    return Configuration.get_by_name_as_int(
+        'status_collector_timeout', default=STATUS_COLLECTOR_DEFAULT_TIMEOUT
+    )
+
+
+def probe_databases_status(databaseinfra):
+    """ Returns {database id: status} for each database in databaseinfra """
+    status = {}
+    instances_status = None
+    for database in databaseinfra.databases.all():
+        database_status = database.database_status
+        if not database_status or not database_status.is_alive:
+            status[database.id] = Database.DEAD
+            continue
+
+        if instances_status is None:
+            instances_status = databaseinfra.check_instances_status()
+
+        if instances_status == databaseinfra.ALERT:
+            status[database.id] = Database.ALERT
+        else:
+            status[database.id] = Database.ALIVE
+
+    return status
+
+
+def probe_instances_status(databaseinfra):
+    """ Returns {instance id: status} for each instance in databaseinfra """
+    status = {}
+    for instance in databaseinfra.instances.all():
+        if instance.check_status():
+            status[instance.id] = Instance.ALIVE
+        else:
+            status[instance.id] = Instance.DEAD
+    return status
+
+
+def probe_infra(databaseinfra):
+    """
+    Contacts databaseinfra once and derives from that single result the
+    status of its instances, the status and the used size of its databases
+    """
+    instances_status = probe_instances_status(databaseinfra)
+    alive_instances = instances_status.values().count(Instance.ALIVE)
+    infra_status = DatabaseInfra.status_for_instances(
+        alive_instances, len(instances_status) - alive_instances
+    )
+
+    databases_status = {}
+    databases_used_size = {}
+    databases = databaseinfra.databases.all()
+    if databases:
+        info = databaseinfra.get_info(force_refresh=True)
+
+    for database in databases:
+        database_status = info.get_database_status(database.name)
+        if database_status:
+            databases_used_size[database.id] = float(
+                database_status.used_size_in_bytes
+            )
+        else:
+            databases_used_size[database.id] = 0.0
+
+        if not database_status or not database_status.is_alive:
+            databases_status[database.id] = Database.DEAD
+        elif infra_status == DatabaseInfra.ALERT:
+            databases_status[database.id] = Database.ALERT
+        else:
+            databases_status[database.id] = Database.ALIVE
+
+    return {
+        'instances_status': instances_status,
+        'databases_status': databases_status,
+        'databases_used_size': databases_used_size,
+    }
+
+
+def collect(probe, infras, workers=None, timeout=None):
+    """
+    Runs probe for each databaseinfra using a bounded pool of workers.
+    Each infra has 'timeout' seconds to answer, infras that could not be
+    probed are returned apart so the caller can decide their status.
+    Infras not started because too many probes hung are returned apart
+    too, nothing is known about them so their status should be kept.
+    Returns ({object id: status}, [infras that failed], [not started])
+    """
+    if workers is None:
+        workers = get_collector_workers()
+    if timeout is None:
+        timeout = get_collector_timeout()
+
+    status = {}
+    failed = []
+    not_started = []
+    for result in run_in_parallel(probe, infras, workers, timeout):
+        if result.succeeded:
+            status.update(result.result)
+            continue
+
+        if result.not_started:
+            LOG.warning("Status for {} not collected: {}".format(
+                result.item, result.error
+            ))
+            not_started.append(result.item)
+            continue
+
+        LOG.warning("Could not collect status for {}: {}".format(
+            result.item, result.error
+        ))
+        failed.append(result.item)
+
+    return status, failed, not_started
+
+
+def collect_databases_status(infras, workers=None, timeout=None):
+    status, failed, _ = collect(
+        probe_databases_status, infras, workers, timeout
+    )
+    for infra in failed:
+        for database in infra.databases.all():
+            status[database.id] = Database.DEAD
+    return status
+
+
+def collect_instances_status(infras, workers=None, timeout=None):
+    status, failed, _ = collect(
+        probe_instances_status, infras, workers, timeout
+    )
+    for infra in failed:
+        for instance in infra.instances.all():
+            status[instance.id] = Instance.DEAD
+    return status
+
+
+def collect_infras_status(infras, workers=None, timeout=None):
+    """
+    Probes each infra once, see probe_infra. The used size of databases in
+    infras that could not be probed is not returned, so it is kept as is.
+    Nothing is returned for infras that were not started, see collect
+    """
+    collected = {
+        'instances_status': {},
+        'databases_status': {},
+        'databases_used_size': {},
+    }
+
+    def probe(databaseinfra):
+        return {databaseinfra.id: probe_infra(databaseinfra)}
+
+    status, failed, _ = collect(probe, infras, workers, timeout)
+    for infra_status in status.values():
+        for key, values in infra_status.items():
+            collected[key].update(values)
+
+    for infra in failed:
+        for instance in infra.instances.all():
+            collected['instances_status'][instance.id] = Instance.DEAD
+        for database in infra.databases.all():
+            collected['databases_status'][database.id] = Database.DEAD
+
+    return collected
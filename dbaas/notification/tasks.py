@@ -12,15 +12,22 @@ from physical.models import Plan, DatabaseInfra, Instance
 from util import email_notifications, get_worker_name, full_stack
 from util.decorators import only_one
 from util.providers import make_infra, clone_infra, destroy_infra, \
-    get_database_upgrade_setting, get_resize_settings
+    resume_infra, rollback_infra, get_database_upgrade_setting, \
+    get_resize_settings
 from simple_audit.models import AuditRequest
 from system.models import Configuration
-from .models import TaskHistory
+from .models import TaskHistory, StepExecution
+from .status_collector import collect_databases_status, \
+    collect_instances_status, collect_infras_status
+from workflow.checkpoint import CheckpointStateError
 from workflow.workflow import steps_for_instances
 from maintenance.models import DatabaseUpgrade, DatabaseResize
 
 LOG = get_task_logger(__name__)
 
+# Days step executions are kept for the step timing report
+DEFAULT_STEP_EXECUTION_RETENTION_DAYS = 90
+
 
 def get_history_for_task_id(task_id):
     try:
@@ -201,6 +208,91 @@ def clone_database(self, origin_database, clone_name, plan, environment, task_hi
         AuditRequest.cleanup_request()
 
 
+@app.task(bind=True)
+def resume_workflow(self, checkpoint, task_history=None, user=None):
+    AuditRequest.new_request("resume_workflow", user, "localhost")
+    try:
+        worker_name = get_worker_name()
+        task_history = TaskHistory.register(
+            request=self.request, task_history=task_history, user=user,
+            worker_name=worker_name
+        )
+        task_history.update_details(
+            persist=True, details="Resuming {}...".format(checkpoint)
+        )
+
+        result = resume_infra(checkpoint=checkpoint, task=task_history)
+
+        if not result.get('created'):
+            error = "\n".join(
+                ": ".join(err) for err in result['exceptions']['error_codes']
+            )
+            traceback = "\nException Traceback\n".join(
+                result['exceptions']['traceback']
+            )
+            task_history.update_status_for(
+                TaskHistory.STATUS_ERROR,
+                details="{}\n{}".format(error, traceback)
+            )
+            return
+
+        task_history.update_dbid(db=result['database'])
+        task_history.update_status_for(
+            TaskHistory.STATUS_SUCCESS, details='Database created successfully'
+        )
+    except CheckpointStateError as e:
+        task_history.update_status_for(
+            TaskHistory.STATUS_ERROR,
+            details="Could not resume {}: {}".format(checkpoint, e)
+        )
+    except Exception as e:
+        traceback = full_stack()
+        LOG.error("Ops... something went wrong: %s" % e)
+        LOG.error(traceback)
+
+        task_history.update_status_for(
+            TaskHistory.STATUS_ERROR, details=traceback)
+    finally:
+        AuditRequest.cleanup_request()
+
+
+@app.task(bind=True)
+def rollback_workflow(self, checkpoint, task_history=None, user=None):
+    AuditRequest.new_request("rollback_workflow", user, "localhost")
+    try:
+        worker_name = get_worker_name()
+        task_history = TaskHistory.register(
+            request=self.request, task_history=task_history, user=user,
+            worker_name=worker_name
+        )
+        task_history.update_details(
+            persist=True, details="Rolling back {}...".format(checkpoint)
+        )
+
+        if rollback_infra(checkpoint=checkpoint, task=task_history):
+            task_history.update_status_for(
+                TaskHistory.STATUS_SUCCESS, details='Rollback done'
+            )
+        else:
+            task_history.update_status_for(
+                TaskHistory.STATUS_ERROR, details='Could not do rollback'
+            )
+    except CheckpointStateError as e:
+        task_history.update_status_for(
+            TaskHistory.STATUS_ERROR,
+            details="Could not roll back {}: {}".format(checkpoint, e)
+        )
+    except Exception as e:
+        traceback = full_stack()
+        LOG.error("Ops... something went wrong: %s" % e)
+        LOG.error(traceback)
+
+        task_history.update_status_for(
+            TaskHistory.STATUS_ERROR, details=traceback)
+    finally:
+        AuditRequest.cleanup_request()
+
+
 @app.task
 @only_one(key="db_infra_notification_key", timeout=20)
 def databaseinfra_notification(self, user=None):
@@ -347,20 +439,14 @@ def update_database_status(self):
         worker_name = get_worker_name()
         task_history = TaskHistory.register(
             request=self.request, user=None, worker_name=worker_name)
-        databases = Database.objects.all()
-        msgs = []
-        for database in databases:
-            if database.database_status and database.database_status.is_alive:
-                database.status = Database.ALIVE
-
-                instances_status = database.databaseinfra.check_instances_status()
-                if instances_status == database.databaseinfra.ALERT:
-                    database.status = Database.ALERT
+        infras = DatabaseInfra.objects.filter(
+            databases__isnull=False
+        ).distinct()
+        databases_status = collect_databases_status(infras)
+        changed = Database.update_field_in_bulk('status', databases_status)
 
-            else:
-                database.status = Database.DEAD
-
-            database.save(update_fields=['status'])
+        msgs = []
+        for database in Database.objects.filter(id__in=changed):
             msg = "\nUpdating status for database: {}, status: {}".format(
                 database, database.status)
             msgs.append(msg)
@@ -383,15 +469,20 @@ def update_database_used_size(self):
         task_history = TaskHistory.register(
             request=self.request, user=None, worker_name=worker_name)
         databases = Database.objects.all()
-        msgs = []
+        used_size = {}
         for database in databases:
             if database.database_status:
-                database.used_size_in_bytes = float(
+                used_size[database.id] = float(
                     database.database_status.used_size_in_bytes)
             else:
-                database.used_size_in_bytes = 0.0
+                used_size[database.id] = 0.0
 
-            database.save(update_fields=['used_size_in_bytes'])
+        changed = Database.update_field_in_bulk(
+            'used_size_in_bytes', used_size
+        )
+
+        msgs = []
+        for database in Database.objects.filter(id__in=changed):
             msg = "\nUpdating used size in bytes for database: {}, used size: {}".format(
                 database, database.used_size_in_bytes)
             msgs.append(msg)
@@ -415,22 +506,65 @@ def update_instances_status(self):
 
     try:
         infras = DatabaseInfra.objects.all()
+        instances_status = collect_instances_status(infras)
+        changed = Instance.update_field_in_bulk('status', instances_status)
+
         msgs = []
-        for databaseinfra in infras:
-            LOG.info("Retrieving all instances for {}".format(databaseinfra))
+        for instance in Instance.objects.filter(id__in=changed):
+            msg = "\nUpdating instance status, instance: {}, status: {}".format(
+                instance, instance.status)
+            msgs.append(msg)
+            LOG.info(msg)
+
+        task_history.update_status_for(TaskHistory.STATUS_SUCCESS, details="\n".join(
+            value for value in msgs))
+    except Exception as e:
+        task_history.update_status_for(TaskHistory.STATUS_ERROR, details=e)
+
+    return
 
-            for instance in Instance.objects.filter(databaseinfra=databaseinfra):
-                if instance.check_status():
-                    instance.status = Instance.ALIVE
-                else:
-                    instance.status = Instance.DEAD
 
-                instance.save(update_fields=['status'])
+@app.task(bind=True)
+@only_one(key="update_infras_status", timeout=180)
+def update_infras_status(self):
+    """
+    Contacts each databaseinfra once per cycle to update instances status,
+    databases status and databases used size. It does the same work of
+    update_instances_status, update_database_status and
+    update_database_used_size, so those should not be scheduled together
+    """
+    LOG.info("Retrieving all databaseinfras")
+    worker_name = get_worker_name()
+    task_history = TaskHistory.register(
+        request=self.request, user=None, worker_name=worker_name)
+
+    try:
+        collected = collect_infras_status(DatabaseInfra.objects.all())
+        instances_status = collected['instances_status']
+        databases_status = collected['databases_status']
+        databases_used_size = collected['databases_used_size']
 
-                msg = "\nUpdating instance status, instance: {}, status: {}".format(
-                    instance, instance.status)
-                msgs.append(msg)
-                LOG.info(msg)
+        changed = Instance.update_field_in_bulk('status', instances_status)
+
+        msgs = []
+        for instance in Instance.objects.filter(id__in=changed):
+            msg = "\nUpdating instance status, instance: {}, status: {}".format(
+                instance, instance.status)
+            msgs.append(msg)
+            LOG.info(msg)
+
+        changed = set(
+            Database.update_field_in_bulk('status', databases_status)
+        )
+        changed.update(Database.update_field_in_bulk(
+            'used_size_in_bytes', databases_used_size
+        ))
+
+        for database in Database.objects.filter(id__in=changed):
+            msg = "\nUpdating status for database: {}, status: {}, used size: {}".format(
+                database, database.status, database.used_size_in_bytes)
+            msgs.append(msg)
+            LOG.info(msg)
 
         task_history.update_status_for(TaskHistory.STATUS_SUCCESS, details="\n".join(
             value for value in msgs))
@@ -440,6 +574,19 @@ def update_instances_status(self):
     return
 
 
+def purge_step_executions():
+    """ Deletes step executions older than step_execution_retention_days """
+    retention_days = Configuration.get_by_name_as_int(
+        'step_execution_retention_days',
+        default=DEFAULT_STEP_EXECUTION_RETENTION_DAYS
+    )
+    StepExecution.objects.filter(
+        started_at__lt=datetime.datetime.now() - datetime.timedelta(
+            days=retention_days
+        )
+    ).delete()
+
+
 @app.task(bind=True)
 @only_one(key="purge_task_history", timeout=600)
 def purge_task_history(self):
@@ -448,6 +595,10 @@ def purge_task_history(self):
         task_history = TaskHistory.register(
             request=self.request, user=None, worker_name=worker_name)
 
+        # Not tied to the tasks purged, they keep no reference to the task
+        # once it is deleted
+        purge_step_executions()
+
         now = datetime.datetime.now()
         retention_days = Configuration.get_by_name_as_int(
             'task_history_retention_days')
@@ -462,6 +613,7 @@ def purge_task_history(self):
                 'notification.tasks.update_disk_used_size',
                 'notification.tasks.update_database_status',
                 'notification.tasks.update_instances_status',
+                'notification.tasks.update_infras_status',
                 'sync_celery_tasks',
                 'system.tasks.set_celery_healthcheck_last_update'
             ],
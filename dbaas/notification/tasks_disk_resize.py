@@ -185,6 +185,7 @@ def disk_auto_resize(database, current_size, usage_percentage):
     task.task_status = task.STATUS_WAITING
     task.arguments = "Database name: {}".format(database.name)
     task.save()
+    task.add_database_lock(database.name, database.environment)
 
     user = AccountUser.objects.get(username='admin')
     database_disk_resize.delay(
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import threading
+import time
+from mock import patch
+from django.test import TestCase
+from drivers import DatabaseInfraStatus, DatabaseStatus
+from logical.models import Database
+from logical.tests.factory import DatabaseFactory
+from physical.models import Instance
+from physical.tests.factory import InstanceFactory
+from util import parallel
+from util.parallel import run_in_parallel
+from .. import status_collector
+from ..status_collector import collect_databases_status, \
+    collect_instances_status, collect_infras_status
+
+
+class ParallelTestCase(TestCase):
+
+    def test_keep_items_order(self):
+        results = run_in_parallel(lambda x: x * 2, range(10), workers=4)
+        self.assertEqual([result.result for result in results], range(0, 20, 2))
+
+    def test_slow_item_does_not_hold_the_others(self):
+        def probe(seconds):
+            time.sleep(seconds)
+            return seconds
+
+        started_at = time.time()
+        results = run_in_parallel(probe, [5, 0, 0, 0], workers=2, timeout=1)
+        self.assertLess(time.time() - started_at, 3)
+
+        self.assertTrue(results[0].timed_out)
+        for result in results[1:]:
+            self.assertTrue(result.succeeded)
+            self.assertEqual(result.result, 0)
+
+    def test_no_new_calls_while_too_many_are_abandoned(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def probe(value):
+            if value:
+                release.wait(5)
+            return value
+
+        results = run_in_parallel(
+            probe, [1, 0], workers=1, timeout=0.1, max_abandoned=1
+        )
+        self.assertTrue(results[0].timed_out)
+        self.assertTrue(results[1].not_started)
+        self.assertIn('not started', str(results[1].error))
+
+        # The limit is for each run, the abandoned call of the previous one
+        # is still running
+        results = run_in_parallel(
+            probe, [0], workers=1, timeout=1, max_abandoned=1
+        )
+        self.assertTrue(results[0].succeeded)
+
+    def test_error_is_kept_by_item(self):
+        def probe(value):
+            if value:
+                raise ValueError(value)
+            return value
+
+        results = run_in_parallel(probe, [0, 1], workers=1)
+        self.assertTrue(results[0].succeeded)
+        self.assertFalse(results[1].succeeded)
+        self.assertIsInstance(results[1].error, ValueError)
+
+
+class StatusCollectorTestCase(TestCase):
+
+    def setUp(self):
+        self.instance = InstanceFactory()
+        self.databaseinfra = self.instance.databaseinfra
+        self.database = DatabaseFactory(databaseinfra=self.databaseinfra)
+
+    def test_collect_instances_status(self):
+        status = collect_instances_status(
+            [self.databaseinfra], workers=1, timeout=0
+        )
+        self.assertEqual(status, {self.instance.id: Instance.ALIVE})
+
+    @patch('physical.models.Instance.check_status', side_effect=Exception)
+    def test_instances_dead_when_infra_probe_fails(self, check_status):
+        status = collect_instances_status(
+            [self.databaseinfra], workers=1, timeout=0
+        )
+        self.assertEqual(status, {self.instance.id: Instance.DEAD})
+
+    @patch('logical.models.Database.database_status')
+    def test_collect_databases_status(self, database_status):
+        database_status.is_alive = True
+        status = collect_databases_status(
+            [self.databaseinfra], workers=1, timeout=0
+        )
+        self.assertEqual(status, {self.database.id: Database.ALIVE})
+
+    @patch('logical.models.Database.database_status')
+    def test_database_dead(self, database_status):
+        database_status.is_alive = False
+        status = collect_databases_status(
+            [self.databaseinfra], workers=1, timeout=0
+        )
+        self.assertEqual(status, {self.database.id: Database.DEAD})
+
+    def _info(self, is_alive):
+        info = DatabaseInfraStatus(databaseinfra_model=self.databaseinfra)
+        database_status = DatabaseStatus(self.database)
+        database_status.is_alive = is_alive
+        database_status.used_size_in_bytes = 1024
+        info.databases_status[self.database.name] = database_status
+        return info
+
+    def test_collect_infras_status_with_one_info(self):
+        with patch('drivers.fake.FakeDriver.info') as info:
+            info.return_value = self._info(is_alive=True)
+            collected = collect_infras_status(
+                [self.databaseinfra], workers=1, timeout=0
+            )
+            self.assertEqual(info.call_count, 1)
+
+        self.assertEqual(
+            collected['instances_status'], {self.instance.id: Instance.ALIVE}
+        )
+        self.assertEqual(
+            collected['databases_status'], {self.database.id: Database.ALIVE}
+        )
+        self.assertEqual(
+            collected['databases_used_size'], {self.database.id: 1024.0}
+        )
+
+    def test_collect_infras_status_alert(self):
+        InstanceFactory(databaseinfra=self.databaseinfra, port=27018)
+        with patch('drivers.fake.FakeDriver.info') as info, \
+                patch('drivers.fake.FakeDriver.check_status') as check_status:
+            info.return_value = self._info(is_alive=True)
+            check_status.side_effect = [True, False]
+            collected = collect_infras_status(
+                [self.databaseinfra], workers=1, timeout=0
+            )
+
+        self.assertEqual(
+            sorted(collected['instances_status'].values()),
+            [Instance.DEAD, Instance.ALIVE]
+        )
+        self.assertEqual(
+            collected['databases_status'], {self.database.id: Database.ALERT}
+        )
+
+    def test_infras_not_started_keep_their_status(self):
+        hung_infra = self.databaseinfra
+        other = InstanceFactory(port=27019)
+        Instance.objects.filter(
+            id__in=[self.instance.id, other.id]
+        ).update(status=Instance.ALIVE)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        probe_infra = status_collector.probe_infra
+
+        def probe(databaseinfra):
+            if databaseinfra == hung_infra:
+                release.wait(5)
+            return probe_infra(databaseinfra)
+
+        with patch.object(status_collector, 'probe_infra', new=probe), \
+                patch.object(parallel, 'MAX_ABANDONED_CALLS', new=1):
+            collected = collect_infras_status(
+                [hung_infra, other.databaseinfra], workers=1, timeout=0.1
+            )
+
+        self.assertEqual(
+            collected['instances_status'], {self.instance.id: Instance.DEAD}
+        )
+        self.assertEqual(
+            collected['databases_status'], {self.database.id: Database.DEAD}
+        )
+        Instance.update_field_in_bulk('status', collected['instances_status'])
+        self.assertEqual(
+            Instance.objects.get(id=other.id).status, Instance.ALIVE
+        )
+        self.assertEqual(
+            Instance.objects.get(id=self.instance.id).status, Instance.DEAD
+        )
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+from datetime import datetime, timedelta
+from StringIO import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from physical.models import ReplicationTopology
+from physical.tests import factory as physical_factory
+from workflow.workflow import start_workflow, step_timing
+from ..models import StepExecution, TaskHistory, percentile
+
+
+class StepExecutionTestCase(TestCase):
+
+    def setUp(self):
+        self.topology = ReplicationTopology.objects.create(
+            name='MySQL Single', class_path='drivers.replication_topologies.mysql.MySQLSingle'
+        )
+        self.plan = physical_factory.PlanFactory(
+            replication_topology=self.topology
+        )
+        self.environment = self.plan.environments.first()
+        self.started_at = datetime.now() - timedelta(days=1)
+
+    def register(self, step, seconds, outcome=StepExecution.SUCCESS, plan=None):
+        return StepExecution.register(
+            step=step, started_at=self.started_at,
+            ended_at=self.started_at + timedelta(seconds=seconds),
+            outcome=outcome, plan=plan or self.plan,
+            environment=self.environment
+        )
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_register(self):
+        execution = self.register('workflow.steps.Step', 12.5)
+
+        self.assertEqual(execution.duration, 12.5)
+        self.assertEqual(execution.topology, self.topology)
+        self.assertEqual(execution.engine, str(self.plan.engine))
+        self.assertEqual(execution.environment, self.environment.name)
+        self.assertIsNone(execution.task)
+
+    def test_report_by_step_slowest_first(self):
+        for seconds in range(1, 21):
+            self.register('workflow.steps.Slow', seconds * 10)
+            self.register('workflow.steps.Fast', seconds)
+        self.register('workflow.steps.Fast', 1, outcome=StepExecution.ERROR)
+
+        report = StepExecution.report('step')
+
+        self.assertEqual(
+            [line['name'] for line in report],
+            ['workflow.steps.Slow', 'workflow.steps.Fast']
+        )
+        self.assertEqual(report[0]['p50'], 100)
+        self.assertEqual(report[0]['p95'], 190)
+        self.assertEqual(report[0]['max'], 200)
+        self.assertEqual(report[1]['executions'], 21)
+        self.assertEqual(report[1]['errors'], 1)
+
+    def test_report_by_topology(self):
+        other_plan = physical_factory.PlanFactory()
+        self.register('workflow.steps.Step', 10)
+        self.register('workflow.steps.Step', 30, plan=other_plan)
+
+        report = StepExecution.report('topology')
+
+        self.assertEqual(
+            [(line['name'], line['p50']) for line in report],
+            [('N/A', 30), ('MySQL Single', 10)]
+        )
+
+    def test_report_ignores_old_executions(self):
+        self.register('workflow.steps.Step', 10)
+        report = StepExecution.report(
+            'step', since=self.started_at + timedelta(days=1)
+        )
+        self.assertEqual(report, [])
+
+    def test_report_default_window(self):
+        self.started_at = datetime.now() - timedelta(
+            days=StepExecution.REPORT_DAYS + 1
+        )
+        self.register('workflow.steps.Step', 10)
+        self.assertEqual(StepExecution.report('step'), [])
+
+    def test_purge_old_executions(self):
+        from ..tasks import purge_step_executions, \
+            DEFAULT_STEP_EXECUTION_RETENTION_DAYS
+
+        recent = self.register('workflow.steps.Step', 10)
+        self.started_at = datetime.now() - timedelta(
+            days=DEFAULT_STEP_EXECUTION_RETENTION_DAYS + 1
+        )
+        self.register('workflow.steps.Step', 10)
+
+        purge_step_executions()
+        self.assertEqual(list(StepExecution.objects.all()), [recent])
+
+    def test_step_timing_registers_error(self):
+        with self.assertRaises(ValueError):
+            with step_timing('workflow.steps.Step', plan=self.plan):
+                raise ValueError
+
+        execution = StepExecution.objects.get()
+        self.assertEqual(execution.outcome, StepExecution.ERROR)
+        self.assertEqual(execution.topology, self.topology)
+
+    def test_workflow_registers_steps(self):
+        task = TaskHistory.objects.create(task_name='test')
+        self.addCleanup(task.flush_logs)
+        workflow_dict = {
+            'plan': self.plan, 'environment': self.environment,
+            'steps': ('workflow.steps.tests.factory.TestStep1',
+                      'workflow.steps.tests.factory.TestStep3')
+        }
+        self.assertFalse(start_workflow(workflow_dict, task=task))
+
+        executions = task.step_executions.order_by('id')
+        self.assertEqual(
+            [(e.step.split('.')[-1], e.outcome, e.is_rollback)
+             for e in executions],
+            [('TestStep1', StepExecution.SUCCESS, False),
+             ('TestStep3', StepExecution.ERROR, False),
+             ('TestStep3', StepExecution.SUCCESS, True),
+             ('TestStep1', StepExecution.SUCCESS, True)]
+        )
+
+    def test_report_command(self):
+        self.started_at = datetime.now()
+        self.register('workflow.steps.Step', 10)
+        output = StringIO()
+
+        call_command('step_timing_report', group_by='topology', stdout=output)
+
+        self.assertIn('MySQL Single', output.getvalue())
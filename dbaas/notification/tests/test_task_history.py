@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
+import pickle
+import time
 from django.test import TestCase
-from notification.models import TaskHistory
+from mock import patch
+from notification import models
+from notification.models import TaskHistory, TaskHistoryLog, \
+    DEFAULT_LOG_BUFFER_SIZE, DEFAULT_LOG_FLUSH_INTERVAL, flush_pending_logs
 from notification.tests.factory import TaskHistoryFactory
+from notification.util import factory_databases_for_task
+from logical.tests.factory import DatabaseFactory
 
 
 class TaskHistoryTestCase(TestCase):
@@ -38,6 +45,39 @@ class TaskHistoryTestCase(TestCase):
         self.task.add_step(step=step, total=total, description=description)
         self.assertIn(message, self.task.details)
 
+    def test_each_detail_is_a_log_line(self):
+        self.task.add_detail(message='Testing')
+        self.task.add_step(step=1, total=2, description='testing')
+        self.task.update_status_for(TaskHistory.STATUS_SUCCESS, 'Done')
+
+        logs = list(TaskHistory.objects.get(pk=self.task.pk).logs.all())
+        self.assertEqual([log.sequence for log in logs], [1, 2, 3])
+        self.assertEqual(logs[1].level, 2)
+        self.assertEqual(logs[1].step, 1)
+        self.assertEqual(logs[2].message, 'Done')
+
+    def test_details_keep_legacy_text(self):
+        self.task.details = 'Legacy'
+        self.task.save()
+
+        self.task.add_detail(message='Testing')
+        self.task.flush_logs()
+        task = TaskHistory.objects.get(pk=self.task.pk)
+        self.assertEqual(task.details, 'Legacy\nTesting')
+        self.assertEqual(task.last_detail, 'Testing')
+
+    def test_can_page_logs(self):
+        for i in range(5):
+            self.task.add_detail(message='Line {}'.format(i))
+        self.task.flush_logs()
+
+        task = TaskHistory.objects.get(pk=self.task.pk)
+        page = list(task.logs_after(sequence=2, limit=2))
+        self.assertEqual([log.message for log in page], ['Line 2', 'Line 3'])
+
+        task.add_detail(message='Line 5')
+        self.assertEqual(task.logs_after(sequence=5).get().message, 'Line 5')
+
     def test_can_get_running_tasks(self):
         self.task.task_status = TaskHistory.STATUS_RUNNING
         self.task.save()
@@ -69,3 +109,176 @@ class TaskHistoryTestCase(TestCase):
     def test_is_not_running(self):
         self.task.task_status = TaskHistory.STATUS_SUCCESS
         self.assertFalse(self.task.is_running)
+
+
+class TaskHistoryLogBufferTestCase(TestCase):
+
+    def setUp(self):
+        self.task = TaskHistoryFactory()
+
+    def stored_logs(self):
+        return TaskHistoryLog.objects.filter(task=self.task).count()
+
+    def test_details_are_buffered(self):
+        self.task.add_detail(message='Testing')
+        self.task.update_details('Again')
+        self.assertEqual(self.stored_logs(), 0)
+
+        self.task.update_details('Persisted', persist=True)
+        self.assertEqual(self.stored_logs(), 3)
+
+    def test_flush_when_buffer_is_full(self):
+        for i in range(DEFAULT_LOG_BUFFER_SIZE):
+            self.task.add_detail(message='Line {}'.format(i))
+        self.assertEqual(self.stored_logs(), DEFAULT_LOG_BUFFER_SIZE)
+
+    def test_flush_on_step_and_status(self):
+        self.task.add_detail(message='Testing')
+        self.task.add_step(step=1, total=1, description='testing')
+        self.assertEqual(self.stored_logs(), 2)
+
+        self.task.add_detail(message='DONE')
+        self.task.update_status_for(TaskHistory.STATUS_SUCCESS)
+        self.assertEqual(self.stored_logs(), 3)
+
+    def test_flush_pending_logs(self):
+        other_task = TaskHistoryFactory()
+        self.task.add_detail(message='Testing')
+        other_task.add_detail(message='Testing')
+
+        flush_pending_logs()
+        self.assertEqual(self.stored_logs(), 1)
+        self.assertEqual(other_task.logs.count(), 1)
+
+    def test_flush_lines_older_than_interval(self):
+        other_task = TaskHistoryFactory()
+        with patch.object(time, 'time', return_value=1000):
+            self.task.add_detail(message='Old')
+        other_task.add_detail(message='New')
+
+        flush_pending_logs(older_than=DEFAULT_LOG_FLUSH_INTERVAL)
+        self.assertEqual(self.stored_logs(), 1)
+        self.assertEqual(other_task.logs.count(), 0)
+        other_task.flush_logs()
+
+    @patch.object(models, 'start_log_flusher')
+    def test_flusher_started_for_the_first_line(self, start_log_flusher):
+        self.task.add_detail(message='Testing')
+        self.task.add_detail(message='Again')
+        self.assertEqual(start_log_flusher.call_count, 1)
+        self.task.flush_logs()
+
+    @patch.object(models, 'LOG_FLUSHER_INTERVAL', new=0)
+    @patch.dict(models.TASKS_WITH_PENDING_LOGS, clear=True)
+    @patch.object(models, 'flush_pending_logs')
+    def test_flusher_ends_without_lines(self, flush_pending_logs):
+        models.run_log_flusher()
+        self.assertFalse(flush_pending_logs.called)
+        self.assertIsNone(models.LOG_FLUSHER)
+
+    def test_buffer_is_not_pickled(self):
+        self.task.add_detail(message='Testing')
+
+        task = pickle.loads(pickle.dumps(self.task))
+        self.assertEqual(task.pk, self.task.pk)
+        self.assertIsNone(task._pending_logs)
+        self.assertIsNone(task._last_sequence)
+        self.assertEqual(len(self.task._pending_logs), 1)
+
+        task.add_detail(message='Remote', level=0)
+        task.flush_logs()
+        self.task.flush_logs()
+        self.assertEqual(
+            list(self.task.logs.values_list('message', flat=True)),
+            ['Remote', 'Testing']
+        )
+
+
+class TaskHistoryProgressTestCase(TestCase):
+
+    def setUp(self):
+        self.task = TaskHistoryFactory(task_status=TaskHistory.STATUS_RUNNING)
+        for i in range(3):
+            self.task.add_detail(message='Line {}'.format(i))
+
+    def test_lines_after_cursor(self):
+        progress = self.task.progress(sequence=1)
+        self.assertEqual(progress['cursor'], 3)
+        self.assertEqual(
+            [line['message'] for line in progress['lines']],
+            ['Line 1', 'Line 2']
+        )
+        self.assertFalse(progress['finished'])
+
+    def test_wait_for_new_lines(self):
+        def written_by_worker(seconds):
+            TaskHistory.objects.get(pk=self.task.pk).update_details(
+                'Line 3', persist=True
+            )
+
+        with patch('time.sleep', side_effect=written_by_worker) as sleep:
+            progress = self.task.progress(sequence=3, timeout=10)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(progress['cursor'], 4)
+        self.assertEqual(progress['lines'][0]['message'], 'Line 3')
+
+    def test_do_not_wait_finished_task(self):
+        self.task.update_status_for(TaskHistory.STATUS_SUCCESS)
+        with patch('time.sleep') as sleep:
+            progress = self.task.progress(sequence=3, timeout=10)
+        self.assertFalse(sleep.called)
+        self.assertEqual(progress['lines'], [])
+        self.assertTrue(progress['finished'])
+
+
+class TaskDatabaseLockTestCase(TestCase):
+
+    def setUp(self):
+        self.task = TaskHistoryFactory(task_status=TaskHistory.STATUS_RUNNING)
+        self.database = DatabaseFactory()
+
+    def test_active_task_holds_database(self):
+        self.task.add_database_lock(
+            self.database.name, self.database.environment
+        )
+        self.assertEqual(
+            list(TaskHistory.tasks_holding(
+                self.database.name, self.database.environment
+            )), [self.task]
+        )
+        self.assertTrue(self.database.is_beeing_used_elsewhere())
+        self.assertFalse(
+            self.database.is_beeing_used_elsewhere(task_id=self.task.task_id)
+        )
+
+    def test_database_released_when_task_finishes(self):
+        self.task.add_database_lock(
+            self.database.name, self.database.environment
+        )
+        self.task.update_status_for(TaskHistory.STATUS_SUCCESS, 'Done')
+        self.assertFalse(self.database.is_beeing_used_elsewhere())
+        self.assertFalse(self.task.database_locks.exists())
+
+    def test_other_environment_is_not_held(self):
+        self.task.add_database_lock(self.database.name, 'other_env')
+        self.assertFalse(self.database.is_beeing_used_elsewhere())
+
+    def test_databases_for_clone(self):
+        databases = factory_databases_for_task(
+            'notification.tasks.clone_database', {
+                'origin_database': self.database, 'clone_name': 'clone',
+                'environment': self.database.environment,
+            }
+        )
+        self.assertEqual(databases, [
+            (self.database.name, self.database.environment),
+            ('clone', self.database.environment),
+        ])
+
+    def test_databases_for_unknown_task(self):
+        databases = factory_databases_for_task(
+            'any.task', {'database': self.database, 'user': 'admin'}
+        )
+        self.assertEqual(
+            databases, [(self.database.name, self.database.environment)]
+        )
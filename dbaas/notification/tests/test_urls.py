@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 from json import loads
+import mock
+from django.http import Http404
 from django.test import TestCase
 from django.core.urlresolvers import reverse
 from notification.models import TaskHistory
-from notification.views import running_tasks_api, waiting_tasks_api
+from notification.views import running_tasks_api, waiting_tasks_api, \
+    task_progress_stream
+from django.contrib.auth.models import User
+from django.test.client import RequestFactory
+from account.models import Team
+from notification import views
 from notification.tests.factory import TaskHistoryFactory
 
 
@@ -53,3 +60,66 @@ class UrlTest(TestCase):
         self.assertIn(str(task_waiting.id), tasks)
         self.assertEqual(tasks[str(task_waiting.id)], task_waiting.task_name)
         self.assertNotIn(str(task_pending.id), tasks)
+
+    def test_stream_task_progress(self):
+        task = TaskHistoryFactory()
+        task.add_detail('Line 0')
+        task.add_detail('Line 1')
+        task.update_status_for(TaskHistory.STATUS_SUCCESS)
+
+        request = RequestFactory().get('/', HTTP_LAST_EVENT_ID='1')
+        request.user = User(is_superuser=True)
+        response = task_progress_stream(request, task_id=task.id)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        content = ''.join(response.streaming_content)
+        self.assertNotIn('Line 0', content)
+        self.assertIn('id: 2\n', content)
+        self.assertIn('Line 1', content)
+        self.assertIn('event: finished', content)
+
+    @mock.patch.object(Team, 'users_at_same_team')
+    def test_stream_only_tasks_of_the_user_teams(self, users_at_same_team):
+        users_at_same_team.return_value = [
+            User(username='user'), User(username='teammate')
+        ]
+        task = TaskHistoryFactory(user='teammate')
+        other_task = TaskHistoryFactory(user='other')
+
+        request = RequestFactory().get('/')
+        request.user = mock.Mock(**{'has_perm.return_value': False})
+        response = task_progress_stream(request, task_id=task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertRaises(
+            Http404, task_progress_stream, request, task_id=other_task.id
+        )
+
+    def test_stream_legacy_details_once(self):
+        task = mock.Mock()
+        task.progress.return_value = {
+            'task_status': TaskHistory.STATUS_RUNNING, 'finished': False,
+            'cursor': 0, 'lines': [], 'legacy_details': 'Old details',
+        }
+
+        events = views.task_progress_events(task, 0)
+        content = ''.join(next(events) for _ in range(5))
+
+        self.assertEqual(content.count('event: legacy'), 1)
+        self.assertEqual(content.count(': keep alive'), 3)
+
+    @mock.patch.object(views, 'STREAM_DURATION', new=0)
+    def test_stream_ends_after_duration(self):
+        task = mock.Mock()
+        task.progress.return_value = {
+            'task_status': TaskHistory.STATUS_RUNNING, 'finished': False,
+            'cursor': 3, 'lines': [],
+        }
+
+        content = ''.join(views.task_progress_events(task, 3))
+
+        self.assertEqual(content, 'retry: {}\n\n: keep alive\n\n'.format(
+            views.STREAM_RETRY
+        ))
+        task.progress.assert_called_once_with(
+            sequence=3, timeout=views.STREAM_WAIT, limit=views.STREAM_LIMIT
+        )
@@ -7,4 +7,6 @@ urlpatterns = patterns(
     views,
     url(r"^tasks_running/$", views.running_tasks_api, name="notification:tasks_running"),
     url(r"^tasks_waiting/$", views.waiting_tasks_api, name="notification:tasks_waiting"),
+    url(r"^task/(?P<task_id>\d+)/progress/$", views.task_progress_stream,
+        name="notification_task_progress"),
 )
@@ -12,13 +12,19 @@ from physical.models import Instance
 LOG = get_task_logger(__name__)
 
 
-def factory_arguments_for_task(task, args_dict):
+def get_arguments_class_for_task(task):
     from .management.arguments import factory
 
     for arguments_class in dir(factory):
         args_class = getattr(factory, arguments_class)
         if callable(args_class) and args_class.KEY == task:
-            return args_class(args_dict).build()
+            return args_class
+
+
+def factory_arguments_for_task(task, args_dict):
+    args_class = get_arguments_class_for_task(task)
+    if args_class:
+        return args_class(args_dict).build()
 
     return ["{}: {}".format(
         key.capitalize().replace("_", " "),
@@ -26,6 +32,26 @@ def factory_arguments_for_task(task, args_dict):
     ) for key, value in args_dict.items()]
 
 
+def factory_databases_for_task(task, args_dict):
+    """ Returns [(database name, environment)] held by task """
+    from logical.models import Database
+
+    args_class = get_arguments_class_for_task(task)
+    if args_class:
+        try:
+            return args_class(args_dict).databases()
+        except (KeyError, AttributeError) as e:
+            LOG.warning("Could not get databases of task {}: {}".format(
+                task, e
+            ))
+            return []
+
+    return [
+        (value.name, value.environment) for value in args_dict.values()
+        if isinstance(value, Database)
+    ]
+
+
 def get_clone_args(origin_database, dest_database):
 
     # origin
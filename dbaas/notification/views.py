@@ -1,7 +1,20 @@
 # -*- coding: utf-8 -*-
+import time
 from json import dumps
-from django.http import HttpResponse
+from django.contrib import admin
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from models import TaskHistory
+from notification.admin import TaskHistoryAdmin
+
+# Seconds waiting for lines before sending a keep alive
+STREAM_WAIT = 5
+STREAM_LIMIT = 500
+# Seconds a stream is kept open, each one holds a web worker so they are
+# short and browsers reconnect from the last event after STREAM_RETRY ms
+STREAM_DURATION = 5
+STREAM_RETRY = 1000
 
 
 def running_tasks_api(self):
@@ -18,3 +31,58 @@ def waiting_tasks_api(self):
         task.id: task.task_name for task in tasks
     })
     return HttpResponse(response_json, content_type="application/json")
+
+
+def task_progress_events(task, sequence):
+    deadline = time.time() + STREAM_DURATION
+    legacy_sent = False
+    yield "retry: {}\n\n".format(STREAM_RETRY)
+    while True:
+        progress = task.progress(
+            sequence=sequence, timeout=STREAM_WAIT, limit=STREAM_LIMIT
+        )
+        if progress.get('legacy_details') and not legacy_sent:
+            legacy_sent = True
+            yield "event: legacy\ndata: {}\n\n".format(
+                dumps(progress['legacy_details'])
+            )
+
+        for line in progress['lines']:
+            yield "id: {}\ndata: {}\n\n".format(
+                line['sequence'], dumps(line)
+            )
+        sequence = progress['cursor']
+
+        if progress['finished']:
+            yield "event: finished\ndata: {}\n\n".format(
+                dumps(progress['task_status'])
+            )
+            return
+        if not progress['lines']:
+            yield ": keep alive\n\n"
+        if time.time() >= deadline:
+            return
+
+
+@login_required
+def task_progress_stream(request, task_id):
+    """
+    Server-sent events with the lines of task, resuming on Last-Event-ID.
+    Only tasks listed for the user in the admin can be streamed
+    """
+    tasks = TaskHistoryAdmin(TaskHistory, admin.site).queryset(request)
+    task = get_object_or_404(tasks, pk=task_id)
+    sequence = request.META.get(
+        'HTTP_LAST_EVENT_ID', request.GET.get('cursor', 0)
+    )
+    try:
+        sequence = int(sequence)
+    except ValueError:
+        sequence = 0
+
+    response = StreamingHttpResponse(
+        task_progress_events(task, sequence),
+        content_type="text/event-stream"
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
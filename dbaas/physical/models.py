@@ -5,7 +5,6 @@ import simple_audit
 from django.db.models.signals import pre_save, post_save, pre_delete
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
-from django.core.cache import cache
 from django.db import models, transaction
 from django.utils.translation import ugettext_lazy as _
 from django_extensions.db.fields.encrypted import EncryptedCharField
@@ -450,13 +449,16 @@ class DatabaseInfra(BaseModel):
     def check_instances_status(self):
         alive_instances = self.instances.filter(status=Instance.ALIVE).count()
         dead_instances = self.instances.filter(status=Instance.DEAD).count()
+        return self.status_for_instances(alive_instances, dead_instances)
 
+    @classmethod
+    def status_for_instances(cls, alive_instances, dead_instances):
         if dead_instances == 0:
-            status = self.ALIVE
+            status = cls.ALIVE
         elif alive_instances == 0:
-            status = self.DEAD
+            status = cls.DEAD
         else:
-            status = self.ALERT
+            status = cls.ALERT
 
         return status
 
@@ -467,28 +469,22 @@ class DatabaseInfra(BaseModel):
     def get_info(self, force_refresh=False):
         if not self.pk:
             return None
-        key = "datainfra:info:%d" % self.pk
-        info = None
-
-        if not force_refresh:
-            # try use cache
-            info = cache.get(key)
-
-        if info is None:
-            try:
-                info = self.get_driver().info()
-                cache.set(key, info)
-            except:
-                # To make cache possible if the database hangs the connection
-                # with no reply
-                info = DatabaseInfraStatus(databaseinfra_model=self.__class__)
-                info.databases_status[self.databases.all()[0].name] = DatabaseInfraStatus(
-                    databaseinfra_model=self.__class__)
-                info.databases_status[
-                    self.databases.all()[0].name].is_alive = False
-
-                cache.set(key, info)
-        return info
+
+        from .status_cache import get_info
+        return get_info(self, force_refresh)
+
+    def load_info(self):
+        try:
+            return self.get_driver().info()
+        except:
+            # To make cache possible if the database hangs the connection
+            # with no reply
+            info = DatabaseInfraStatus(databaseinfra_model=self.__class__)
+            info.databases_status[self.databases.all()[0].name] = DatabaseInfraStatus(
+                databaseinfra_model=self.__class__)
+            info.databases_status[
+                self.databases.all()[0].name].is_alive = False
+            return info
 
     @property
     def disk_used_size_in_kb(self):
@@ -686,6 +682,18 @@ def instance_pre_delete(sender, **kwargs):
     LOG.debug("instance pre-delete triggered")
 
 
+@receiver(post_save, sender=Instance)
+@receiver(pre_delete, sender=Instance)
+def instance_invalidate_connections(sender, **kwargs):
+    """
+    connections kept by this process are renewed when instances change
+    """
+    from drivers import connection_pool
+
+    instance = kwargs.get('instance')
+    connection_pool.invalidate(instance.databaseinfra_id)
+
+
 @receiver(post_save, sender=DatabaseInfra)
 def databaseinfra_post_save(sender, **kwargs):
     """
@@ -696,6 +704,9 @@ def databaseinfra_post_save(sender, **kwargs):
     LOG.debug("databaseinfra %s endpoint: %s" %
               (databaseinfra, databaseinfra.endpoint))
 
+    from drivers import connection_pool
+    connection_pool.invalidate(databaseinfra.pk)
+
 
 @receiver(pre_save, sender=DatabaseInfra)
 def databaseinfra_pre_save(sender, **kwargs):
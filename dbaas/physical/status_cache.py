@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import cPickle as pickle
+import logging
+import threading
+import time
+from django.core.cache import cache
+from django.db import connection
+from redis.exceptions import RedisError
+from system.models import Configuration
+from util.decorators import REDIS_CLIENT
+
+LOG = logging.getLogger(__name__)
+
+INFO_KEY = "datainfra:info:{}"
+REFRESH_LOCK_KEY = "datainfra:info:{}:refreshing"
+# Values drivers reuse while loading the info, dropped on forced refreshes
+DRIVER_CACHE_KEY = "datainfra:info:{}:driver"
+
+# Seconds that an info is used without being refreshed
+DEFAULT_FRESH_TIME = 60
+# Seconds that an old info is still returned while it is being refreshed
+DEFAULT_STALE_TIME = 600
+# Seconds that a reader waits for another process refreshing the info
+DEFAULT_WAIT_TIME = 15
+REFRESH_LOCK_TIMEOUT = 120
+WAIT_INTERVAL = 0.2
+
+
+def get_fresh_time():
+    return Configuration.get_by_name_as_int(
+        'infra_status_cache_fresh_time', default=DEFAULT_FRESH_TIME
+    )
+
+
+def get_stale_time():
+    return Configuration.get_by_name_as_int(
+        'infra_status_cache_stale_time', default=DEFAULT_STALE_TIME
+    )
+
+
+def get_wait_time():
+    return Configuration.get_by_name_as_int(
+        'infra_status_cache_wait_time', default=DEFAULT_WAIT_TIME
+    )
+
+
+def read(databaseinfra_id):
+    entry = REDIS_CLIENT.get(INFO_KEY.format(databaseinfra_id))
+    if entry is None:
+        return None
+    return pickle.loads(entry)
+
+
+def write(databaseinfra_id, info):
+    entry = {'info': info, 'updated_at': time.time()}
+    REDIS_CLIENT.set(
+        INFO_KEY.format(databaseinfra_id),
+        pickle.dumps(entry, pickle.HIGHEST_PROTOCOL),
+        ex=max(get_stale_time(), get_fresh_time())
+    )
+
+
+def get_driver_cache(databaseinfra_id, name):
+    """ Value cached by the driver of databaseinfra, None when expired """
+    try:
+        entry = REDIS_CLIENT.hget(
+            DRIVER_CACHE_KEY.format(databaseinfra_id), name
+        )
+    except RedisError as e:
+        LOG.warning("Shared info cache is not available: {}".format(e))
+        return None
+    if entry is None:
+        return None
+
+    entry = pickle.loads(entry)
+    if entry['expires_at'] < time.time():
+        return None
+    return entry['value']
+
+
+def set_driver_cache(databaseinfra_id, name, value, timeout):
+    key = DRIVER_CACHE_KEY.format(databaseinfra_id)
+    entry = {'value': value, 'expires_at': time.time() + timeout}
+    try:
+        REDIS_CLIENT.hmset(
+            key, {name: pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)}
+        )
+        REDIS_CLIENT.expire(key, timeout)
+    except RedisError as e:
+        LOG.warning("Shared info cache is not available: {}".format(e))
+
+
+def clear_driver_cache(databaseinfra_id):
+    try:
+        REDIS_CLIENT.delete(DRIVER_CACHE_KEY.format(databaseinfra_id))
+    except RedisError as e:
+        LOG.warning("Shared info cache is not available: {}".format(e))
+
+
+def is_fresh(entry):
+    return time.time() - entry['updated_at'] < get_fresh_time()
+
+
+def acquire_refresh(databaseinfra_id):
+    return bool(REDIS_CLIENT.set(
+        REFRESH_LOCK_KEY.format(databaseinfra_id), 1,
+        ex=REFRESH_LOCK_TIMEOUT, nx=True
+    ))
+
+
+def release_refresh(databaseinfra_id):
+    REDIS_CLIENT.delete(REFRESH_LOCK_KEY.format(databaseinfra_id))
+
+
+def refresh(databaseinfra):
+    info = databaseinfra.load_info()
+    try:
+        write(databaseinfra.pk, info)
+    except RedisError as e:
+        LOG.warning("Shared info cache is not available: {}".format(e))
+        cache.set(INFO_KEY.format(databaseinfra.pk), info)
+    return info
+
+
+def refresh_in_background(databaseinfra):
+    """ Only one process refreshes an infra, the others keep the old info """
+    if not acquire_refresh(databaseinfra.pk):
+        return
+
+    def run():
+        from .models import DatabaseInfra
+        try:
+            refresh(DatabaseInfra.objects.get(pk=databaseinfra.pk))
+        except Exception as e:
+            LOG.warning("Could not refresh info for {}: {}".format(
+                databaseinfra, e
+            ))
+        finally:
+            connection.close()
+            release_refresh(databaseinfra.pk)
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+
+
+def wait_refresh(databaseinfra):
+    """
+    Concurrent misses for the same infra collapse into one driver call,
+    the ones that did not get the lock wait for the info to be written
+    """
+    if acquire_refresh(databaseinfra.pk):
+        try:
+            return refresh(databaseinfra)
+        finally:
+            release_refresh(databaseinfra.pk)
+
+    deadline = time.time() + get_wait_time()
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = read(databaseinfra.pk)
+        if entry:
+            return entry['info']
+
+    LOG.warning("Timeout waiting info for {}, loading it".format(
+        databaseinfra
+    ))
+    return refresh(databaseinfra)
+
+
+def get_shared_info(databaseinfra, force_refresh=False):
+    if force_refresh:
+        return refresh(databaseinfra)
+
+    entry = read(databaseinfra.pk)
+    if entry is None:
+        return wait_refresh(databaseinfra)
+
+    if not is_fresh(entry):
+        refresh_in_background(databaseinfra)
+    return entry['info']
+
+
+def get_local_info(databaseinfra, force_refresh=False):
+    key = INFO_KEY.format(databaseinfra.pk)
+    info = None
+    if not force_refresh:
+        info = cache.get(key)
+
+    if info is None:
+        info = databaseinfra.load_info()
+        cache.set(key, info)
+    return info
+
+
+def get_info(databaseinfra, force_refresh=False):
+    """
+    Returns DatabaseInfraStatus shared by web and worker processes. If the
+    shared cache is not available the info is cached by process.
+    A forced refresh also drops the values cached by the driver
+    """
+    if force_refresh:
+        clear_driver_cache(databaseinfra.pk)
+    try:
+        return get_shared_info(databaseinfra, force_refresh)
+    except RedisError as e:
+        LOG.warning("Shared info cache is not available: {}".format(e))
+        return get_local_info(databaseinfra, force_refresh)
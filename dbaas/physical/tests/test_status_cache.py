@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import time
+import mock
+from django.test import TestCase
+from django.core.cache import cache
+from drivers.fake import FakeDriver
+from .. import status_cache
+from . import factory
+
+
+class FakeRedis(object):
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hmset(self, key, mapping):
+        self.data.setdefault(key, {}).update(
+            (field, str(value)) for field, value in mapping.items()
+        )
+        return True
+
+    def hincrby(self, key, field, amount=1):
+        value = int(self.hget(key, field) or 0) + amount
+        self.data.setdefault(key, {})[field] = str(value)
+        return value
+
+
+class StatusCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(status_cache, 'REDIS_CLIENT', self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.databaseinfra = factory.DatabaseInfraFactory()
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_info_is_shared(self, info):
+        info.return_value = 'info'
+        self.assertEqual(self.databaseinfra.get_info(), 'info')
+        self.assertEqual(self.databaseinfra.get_info(), 'info')
+        info.assert_called_once_with()
+        self.assertIn(
+            status_cache.INFO_KEY.format(self.databaseinfra.pk),
+            self.redis.data
+        )
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_stale_info_is_returned_while_refreshing(self, info):
+        status_cache.write(self.databaseinfra.pk, 'old info')
+        info.return_value = 'new info'
+
+        with mock.patch.object(status_cache, 'is_fresh', return_value=False), \
+                mock.patch.object(status_cache, 'refresh_in_background') as refresh:
+            self.assertEqual(self.databaseinfra.get_info(), 'old info')
+            refresh.assert_called_once_with(self.databaseinfra)
+
+        self.assertFalse(info.called)
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_only_one_refresh_for_the_same_infra(self, info):
+        status_cache.acquire_refresh(self.databaseinfra.pk)
+        self.assertFalse(status_cache.acquire_refresh(self.databaseinfra.pk))
+
+        status_cache.write(self.databaseinfra.pk, 'old info')
+        with mock.patch.object(status_cache, 'is_fresh', return_value=False):
+            self.assertEqual(self.databaseinfra.get_info(), 'old info')
+        self.assertFalse(info.called)
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_miss_waits_for_refresh_in_progress(self, info):
+        status_cache.acquire_refresh(self.databaseinfra.pk)
+
+        def written_by_another_process(seconds):
+            status_cache.write(self.databaseinfra.pk, 'other info')
+
+        with mock.patch('time.sleep', side_effect=written_by_another_process):
+            self.assertEqual(self.databaseinfra.get_info(), 'other info')
+        self.assertFalse(info.called)
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_force_refresh(self, info):
+        status_cache.write(self.databaseinfra.pk, 'old info')
+        info.return_value = 'new info'
+        self.assertEqual(
+            self.databaseinfra.get_info(force_refresh=True), 'new info'
+        )
+        self.assertEqual(
+            status_cache.read(self.databaseinfra.pk)['info'], 'new info'
+        )
+
+    def test_driver_cache(self):
+        status_cache.set_driver_cache(self.databaseinfra.pk, 'sizes', {}, 60)
+        self.assertEqual(
+            status_cache.get_driver_cache(self.databaseinfra.pk, 'sizes'), {}
+        )
+        self.assertIsNone(
+            status_cache.get_driver_cache(self.databaseinfra.pk, 'other')
+        )
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertIsNone(
+                status_cache.get_driver_cache(self.databaseinfra.pk, 'sizes')
+            )
+
+    @mock.patch.object(FakeDriver, 'info')
+    def test_force_refresh_drops_driver_cache(self, info):
+        info.return_value = 'info'
+        status_cache.set_driver_cache(self.databaseinfra.pk, 'sizes', {}, 60)
+        self.databaseinfra.get_info(force_refresh=True)
+        self.assertIsNone(
+            status_cache.get_driver_cache(self.databaseinfra.pk, 'sizes')
+        )
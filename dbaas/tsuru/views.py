@@ -18,7 +18,6 @@ from dbaas_credentials.models import CredentialType
 from django.core.exceptions import MultipleObjectsReturned
 from django.db import transaction
 from django.db import IntegrityError
-from django.db.models import Q
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
 from rest_framework.views import APIView
@@ -67,9 +66,8 @@ class GetServiceStatus(APIView):
             )
 
         LOG.info("Status = {}".format(database_status))
-        task = TaskHistory.objects.filter(
-            Q(arguments__contains=database_name) &
-            Q(arguments__contains=env), task_status="RUNNING"
+        task = TaskHistory.tasks_holding(
+            database_name, env, status=[TaskHistory.STATUS_RUNNING]
         ).order_by("created_at")
 
         LOG.info("Task {}".format(task))
@@ -440,6 +438,7 @@ class ServiceAdd(APIView):
         task_history.task_name = "create_database"
         task_history.arguments = "Database name: {}".format(name)
         task_history.save()
+        task_history.add_database_lock(name, dbaas_environment)
 
         create_database.delay(
             name=name, plan=dbaas_plan, environment=dbaas_environment,
@@ -491,10 +490,9 @@ def log_and_response(msg, http_status, e="Conditional Error."):
 
 
 def check_database_status(database_name, env):
-    task = TaskHistory.objects.filter(
-        arguments__contains="Database: {}, Environment: {}".format(
-            database_name, env
-        ), task_status="RUNNING")
+    task = TaskHistory.tasks_holding(
+        database_name, env, status=[TaskHistory.STATUS_RUNNING]
+    ).filter(task_name='notification.tasks.create_database')
 
     LOG.info("Task {}".format(task))
     if task:
@@ -223,18 +223,15 @@ def get_mongodb_key_file(infra):
 
 def exec_remote_command(server, username, password, command, output={}):
 
+    from .ssh_pool import run_command
+
     try:
         LOG.info(
             "Executing command [%s] on remote server %s" % (command, server))
-        client = paramiko.SSHClient()
-        client.load_system_host_keys()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(server, username=username, password=password)
-
-        stdin, stdout, stderr = client.exec_command(command)
-        log_stdout = stdout.readlines()
-        log_stderr = stderr.readlines()
-        exit_status = stdout.channel.recv_exit_status()
+        # Commands to the same server share one authenticated connection
+        exit_status, log_stdout, log_stderr = run_command(
+            server, username, password, command
+        )
         LOG.info("Comand return code: %s, stdout: %s, stderr %s" %
                  (exit_status, log_stdout, log_stderr))
         output['stdout'] = log_stdout
@@ -243,7 +240,7 @@ def exec_remote_command(server, username, password, command, output={}):
     except (paramiko.ssh_exception.BadHostKeyException,
             paramiko.ssh_exception.AuthenticationException,
             paramiko.ssh_exception.SSHException,
-            socket.error) as e:
+            socket.error, EOFError) as e:
         LOG.warning("We caught an exception: %s ." % (e))
         output['exception'] = str(e)
         return None
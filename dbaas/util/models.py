@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
-from django.db import models
+from django.db import models, connection
 from django.utils.translation import ugettext_lazy as _
 
+BULK_UPDATE_BATCH_SIZE = 500
+
 
 class BaseModel(models.Model):
 
@@ -23,3 +25,46 @@ class BaseModel(models.Model):
         elif hasattr(self, '__unicode__'):
             # return super(BaseModel, self).__unicode__()
             return self.__unicode__()
+
+    @classmethod
+    def update_field_in_bulk(cls, field_name, values,
+                             batch_size=BULK_UPDATE_BATCH_SIZE):
+        """
+        Persists values ({pk: value}) on field_name with one UPDATE per batch.
+        It does not call save(), so no signals are sent and no audit is
+        registered: use it only for values collected by the system.
+        Rows that already have the value are skipped.
+        Returns the list of pks that were changed
+        """
+        pks = values.keys()
+        changed = []
+        for start in range(0, len(pks), batch_size):
+            current = cls.objects.filter(
+                pk__in=pks[start:start + batch_size]
+            ).values_list('pk', field_name)
+            for pk, value in current:
+                if value != values[pk]:
+                    changed.append(pk)
+
+        field = cls._meta.get_field(field_name)
+        quote_name = connection.ops.quote_name
+        sql = "UPDATE {table} SET {column} = CASE {pk} {cases} END " \
+              "WHERE {pk} IN ({pks})"
+        cursor = connection.cursor()
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            params = []
+            for pk in batch:
+                params.append(pk)
+                params.append(field.get_db_prep_save(values[pk], connection))
+            params.extend(batch)
+
+            cursor.execute(sql.format(
+                table=quote_name(cls._meta.db_table),
+                column=quote_name(field.column),
+                pk=quote_name(cls._meta.pk.column),
+                cases=" ".join(["WHEN %s THEN %s"] * len(batch)),
+                pks=", ".join(["%s"] * len(batch)),
+            ), params)
+
+        return changed
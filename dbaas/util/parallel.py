@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import threading
+import Queue
+from datetime import datetime
+from django.db import connection
+from util import full_stack
+
+LOG = logging.getLogger(__name__)
+
+# Calls of a run_in_parallel abandoned after their timeout that may still
+# be running. While there are this many the remaining items of that run are
+# not started, so targets that never answer can not pile up threads
+MAX_ABANDONED_CALLS = 20
+ABANDONED_LOCK = threading.Lock()
+
+
+class ParallelTimeout(Exception):
+
+    """ Raised when an item does not finish before its deadline """
+    pass
+
+
+class ParallelNotStarted(Exception):
+
+    """ Raised when an item is not started, see MAX_ABANDONED_CALLS """
+    pass
+
+
+class ParallelResult(object):
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.traceback = None
+        self.started_at = None
+        self.ended_at = None
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    @property
+    def timed_out(self):
+        return isinstance(self.error, ParallelTimeout)
+
+    @property
+    def not_started(self):
+        return isinstance(self.error, ParallelNotStarted)
+
+    @property
+    def elapsed(self):
+        if not self.started_at or not self.ended_at:
+            return None
+        return (self.ended_at - self.started_at).total_seconds()
+
+
+def _call(function, item, result):
+    try:
+        result.result = function(item)
+    except Exception as e:
+        result.error = e
+        result.traceback = full_stack()
+
+
+def _call_in_thread(function, item, result, state=None, run=None):
+    try:
+        _call(function, item, result)
+    finally:
+        # Every thread opens its own database connection, it must be
+        # released here or it will be leaked until the worker dies
+        connection.close()
+        if state is not None:
+            with ABANDONED_LOCK:
+                state['finished'] = True
+                if state['abandoned']:
+                    run['abandoned'] -= 1
+
+
+def _call_with_timeout(function, item, timeout, run):
+    result = ParallelResult(item)
+    result.started_at = datetime.now()
+
+    if not timeout:
+        _call_in_thread(function, item, result)
+        result.ended_at = datetime.now()
+        return result
+
+    with ABANDONED_LOCK:
+        abandoned = run['abandoned']
+    if abandoned >= run['max_abandoned']:
+        LOG.warning("{} not started, {} calls that timed out are still "
+                    "running".format(item, abandoned))
+        result.error = ParallelNotStarted(
+            "{} not started, {} calls that timed out are still running".format(
+                item, abandoned
+            )
+        )
+        result.ended_at = datetime.now()
+        return result
+
+    # The call runs in its own daemon thread, if the deadline is reached it
+    # is abandoned (it finishes on its own when the driver gives up) and the
+    # worker slot is released for the next item
+    call_result = ParallelResult(item)
+    state = {'finished': False, 'abandoned': False}
+    thread = threading.Thread(
+        target=_call_in_thread,
+        args=(function, item, call_result, state, run)
+    )
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+
+    with ABANDONED_LOCK:
+        if not state['finished']:
+            state['abandoned'] = True
+            run['abandoned'] += 1
+
+    if state['abandoned']:
+        LOG.warning("{} did not finish in {}s".format(item, timeout))
+        result.error = ParallelTimeout(
+            "{} did not finish in {} seconds".format(item, timeout)
+        )
+    else:
+        result.result = call_result.result
+        result.error = call_result.error
+        result.traceback = call_result.traceback
+
+    result.ended_at = datetime.now()
+    return result
+
+
+def run_in_parallel(function, items, workers, timeout=None,
+                    max_abandoned=None):
+    """
+    Calls function(item) for every item with at most 'workers' items
+    running at the same time. Each call has 'timeout' seconds to finish.
+    While 'max_abandoned' (MAX_ABANDONED_CALLS by default) calls that timed out are still running the next
+    items are not started and fail with ParallelNotStarted.
+    Returns a list of ParallelResult in the same order of items.
+    With a single worker and no timeout items run in the current thread.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    if workers <= 1 and not timeout:
+        for index, item in enumerate(items):
+            result = ParallelResult(item)
+            result.started_at = datetime.now()
+            _call(function, item, result)
+            result.ended_at = datetime.now()
+            results[index] = result
+        return results
+
+    if max_abandoned is None:
+        max_abandoned = MAX_ABANDONED_CALLS
+    run = {'abandoned': 0, 'max_abandoned': max_abandoned}
+    pending = Queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+
+    def consume():
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except Queue.Empty:
+                return
+            results[index] = _call_with_timeout(
+                function, item, timeout, run
+            )
+
+    workers = max(1, min(workers, len(items)))
+    threads = []
+    for _ in range(workers):
+        thread = threading.Thread(target=consume)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
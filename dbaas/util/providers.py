@@ -7,8 +7,10 @@ from util import get_replication_topology_instance
 from dbaas_credentials.models import CredentialType
 from physical.models import DatabaseInfra
 from logical.models import Database
+from notification.models import WorkflowCheckpoint
 from workflow.workflow import stop_workflow
 from workflow.workflow import start_workflow, start_workflow_ha
+from workflow.workflow import is_resumable_workflows
 
 LOG = logging.getLogger(__name__)
 
@@ -39,13 +41,20 @@ def make_infra(
         name=slugify(name), plan=plan, environment=environment,
         steps=get_deploy_settings(
             plan.replication_topology.class_path
+        ), dependencies=get_deploy_dependencies(
+            plan.replication_topology.class_path
         ), qt=get_vm_qt(plan=plan, ), dbtype=str(plan.engine_type),
         team=team, project=project, description=description,
         subscribe_to_email_events=subscribe_to_email_events,
         is_protected=is_protected
     )
 
-    start_workflow(workflow_dict=workflow_dict, task=task)
+    checkpoint = None
+    if is_resumable_workflows():
+        checkpoint = WorkflowCheckpoint.start(
+            WorkflowCheckpoint.DEPLOY, workflow_dict, task
+        )
+    start_workflow(workflow_dict=workflow_dict, task=task, checkpoint=checkpoint)
     return workflow_dict
 
 
@@ -81,6 +90,9 @@ def clone_infra(
         steps=get_clone_settings(
             plan.replication_topology.class_path
         ),
+        dependencies=get_clone_dependencies(
+            plan.replication_topology.class_path
+        ),
         qt=get_vm_qt(plan=plan),
         dbtype=str(plan.engine_type),
         team=team,
@@ -90,10 +102,50 @@ def clone_infra(
         subscribe_to_email_events=subscribe_to_email_events,
     )
 
-    start_workflow(workflow_dict=workflow_dict, task=task)
+    checkpoint = None
+    if is_resumable_workflows():
+        checkpoint = WorkflowCheckpoint.start(
+            WorkflowCheckpoint.CLONE, workflow_dict, task
+        )
+    start_workflow(workflow_dict=workflow_dict, task=task, checkpoint=checkpoint)
     return workflow_dict
 
 
+def resume_infra(checkpoint, task=None):
+    """ Runs a failed deploy or clone again skipping the steps done """
+    workflow_dict = checkpoint.load_state()
+    class_path = workflow_dict['plan'].replication_topology.class_path
+
+    if checkpoint.workflow == WorkflowCheckpoint.CLONE:
+        steps = get_clone_settings(class_path)
+        dependencies = get_clone_dependencies(class_path)
+    else:
+        steps = get_deploy_settings(class_path)
+        dependencies = get_deploy_dependencies(class_path)
+
+    workflow_dict.update(
+        steps=steps, dependencies=dependencies,
+        done_steps=checkpoint.get_done_steps()
+    )
+
+    checkpoint.resume(task)
+    start_workflow(workflow_dict=workflow_dict, task=task, checkpoint=checkpoint)
+    return workflow_dict
+
+
+def rollback_infra(checkpoint, task=None):
+    """ Undoes what a failed deploy or clone has done """
+    workflow_dict = checkpoint.load_state()
+    workflow_dict['steps'] = tuple(
+        checkpoint.get_done_steps() + checkpoint.get_failed_steps()
+    )
+
+    if stop_workflow(workflow_dict=workflow_dict, task=task):
+        checkpoint.set_rolled_back()
+        return True
+    return False
+
+
 def destroy_infra(databaseinfra, task=None):
 
     try:
@@ -161,10 +213,18 @@ def get_deploy_settings(class_path):
     return get_replication_topology_instance(class_path).get_deploy_steps()
 
 
+def get_deploy_dependencies(class_path):
+    return get_replication_topology_instance(class_path).get_deploy_dependencies()
+
+
 def get_clone_settings(class_path):
     return get_replication_topology_instance(class_path).get_clone_steps()
 
 
+def get_clone_dependencies(class_path):
+    return get_replication_topology_instance(class_path).get_clone_dependencies()
+
+
 def get_resize_settings(class_path):
     return get_replication_topology_instance(class_path).get_resize_steps()
 
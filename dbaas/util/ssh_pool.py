@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import os
+import socket
+import threading
+import time
+import paramiko
+from system.models import Configuration
+
+LOG = logging.getLogger(__name__)
+
+# Seconds that an idle connection is kept before being closed
+DEFAULT_IDLE_TIMEOUT = 300
+# Seconds between keepalive packets of an opened connection
+DEFAULT_KEEPALIVE = 30
+# Seconds waiting for the server to open a channel for a command
+DEFAULT_SESSION_TIMEOUT = 30
+
+SSH_ERRORS = (paramiko.ssh_exception.SSHException, socket.error, EOFError)
+
+CONNECTIONS = {}
+CONNECTIONS_LOCK = threading.Lock()
+
+
+def get_idle_timeout():
+    return Configuration.get_by_name_as_int(
+        'ssh_pool_idle_timeout', default=DEFAULT_IDLE_TIMEOUT
+    )
+
+
+def get_keepalive():
+    return Configuration.get_by_name_as_int(
+        'ssh_pool_keepalive', default=DEFAULT_KEEPALIVE
+    )
+
+
+def get_session_timeout():
+    return Configuration.get_by_name_as_int(
+        'ssh_pool_session_timeout', default=DEFAULT_SESSION_TIMEOUT
+    )
+
+
+class SSHConnection(object):
+
+    """
+    One authenticated SSH connection, every command runs on a new channel
+    of it so they can run at the same time
+    """
+
+    def __init__(self, server, username, password):
+        self.password = password
+        self.pid = os.getpid()
+        self.sessions = 0
+        self.retired = False
+        self.lock = threading.Lock()
+
+        self.client = paramiko.SSHClient()
+        self.client.load_system_host_keys()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            self.client.connect(server, username=username, password=password)
+        except Exception:
+            self.client.close()
+            raise
+        self.client.get_transport().set_keepalive(get_keepalive())
+        self.last_used = time.time()
+
+    @property
+    def idle_time(self):
+        return time.time() - self.last_used
+
+    def is_usable(self, password):
+        # Connections are not shared with forked processes
+        if self.pid != os.getpid() or password != self.password:
+            return False
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @property
+    def in_use(self):
+        return self.sessions > 0
+
+    def open_session(self):
+        with self.lock:
+            self.sessions += 1
+            self.last_used = time.time()
+        try:
+            # Without a timeout a half open transport is waited for an hour
+            return self.client.get_transport().open_session(
+                timeout=get_session_timeout()
+            )
+        except Exception:
+            self.release()
+            raise
+
+    def release(self):
+        with self.lock:
+            self.sessions -= 1
+            self.last_used = time.time()
+            close = self.retired and not self.sessions
+        if close:
+            self._close()
+
+    def close(self):
+        """ Closes now or, when commands are running, after the last one """
+        with self.lock:
+            self.retired = True
+            close = not self.sessions
+        if close:
+            self._close()
+
+    def _close(self):
+        try:
+            self.client.close()
+        except Exception:
+            LOG.warn('Error closing SSH connection. Ignoring...', exc_info=True)
+
+
+def evict_idle():
+    idle_timeout = get_idle_timeout()
+    with CONNECTIONS_LOCK:
+        evicted = [
+            key for key, connection in CONNECTIONS.items()
+            if not connection.in_use and connection.idle_time > idle_timeout
+        ]
+        connections = [CONNECTIONS.pop(key) for key in evicted]
+    for connection in connections:
+        connection.close()
+
+
+def get_connection(server, username, password):
+    """ Connection to server reused while it works and is used """
+    evict_idle()
+
+    key = (server, username)
+    with CONNECTIONS_LOCK:
+        connection = CONNECTIONS.get(key)
+        if connection and connection.is_usable(password):
+            return connection
+        CONNECTIONS.pop(key, None)
+
+    if connection:
+        connection.close()
+
+    # Connected outside the lock, other servers do not wait for it
+    connection = SSHConnection(server, username, password)
+    with CONNECTIONS_LOCK:
+        other = CONNECTIONS.get(key)
+        if other and other.is_usable(password):
+            # Another thread connected at the same time
+            duplicated, connection = connection, other
+        else:
+            duplicated = None
+            CONNECTIONS[key] = connection
+    if duplicated:
+        duplicated.close()
+    return connection
+
+
+def discard(server, username, connection):
+    with CONNECTIONS_LOCK:
+        if CONNECTIONS.get((server, username)) is connection:
+            del CONNECTIONS[(server, username)]
+    connection.close()
+
+
+def evict_host(server):
+    """
+    Closes the connections of every user to server, e.g. when its VM is
+    stopped or reinstalled. Commands running on them finish first
+    """
+    with CONNECTIONS_LOCK:
+        evicted = [key for key in CONNECTIONS if key[0] == server]
+        connections = [CONNECTIONS.pop(key) for key in evicted]
+    for connection in connections:
+        connection.close()
+
+
+def open_session(server, username, password):
+    """ Returns (connection, channel), release the connection when done """
+    connection = get_connection(server, username, password)
+    try:
+        return connection, connection.open_session()
+    except SSH_ERRORS as e:
+        # The command did not run yet, a connection closed by the server
+        # is opened again
+        LOG.info("SSH connection to {} is broken ({}), reconnecting".format(
+            server, e
+        ))
+        discard(server, username, connection)
+
+    connection = get_connection(server, username, password)
+    try:
+        return connection, connection.open_session()
+    except SSH_ERRORS:
+        discard(server, username, connection)
+        raise
+
+
+def run_command(server, username, password, command):
+    """ Returns (exit status, stdout lines, stderr lines) of command """
+    connection, channel = open_session(server, username, password)
+    try:
+        channel.exec_command(command)
+        stdout = channel.makefile('rb', -1).readlines()
+        stderr = channel.makefile_stderr('rb', -1).readlines()
+        return channel.recv_exit_status(), stdout, stderr
+    except SSH_ERRORS:
+        discard(server, username, connection)
+        raise
+    finally:
+        channel.close()
+        connection.release()
+
+
+def clear():
+    """ Closes every connection kept by this process """
+    with CONNECTIONS_LOCK:
+        connections = CONNECTIONS.values()
+        CONNECTIONS.clear()
+    for connection in connections:
+        connection.close()
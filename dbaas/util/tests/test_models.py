@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+from django.test import TestCase
+from simple_audit.models import Audit
+from logical.models import Database
+from logical.tests.factory import DatabaseFactory
+
+
+class UpdateFieldInBulkTestCase(TestCase):
+
+    def setUp(self):
+        self.alive = DatabaseFactory(status=Database.ALIVE)
+        self.dead = DatabaseFactory(status=Database.DEAD)
+
+    def test_update_only_changed_rows(self):
+        changed = Database.update_field_in_bulk('status', {
+            self.alive.id: Database.ALIVE,
+            self.dead.id: Database.ALIVE,
+        })
+        self.assertEqual(changed, [self.dead.id])
+
+        self.assertEqual(
+            Database.objects.get(id=self.alive.id).status, Database.ALIVE
+        )
+        self.assertEqual(
+            Database.objects.get(id=self.dead.id).status, Database.ALIVE
+        )
+
+    def test_update_different_values_in_batches(self):
+        changed = Database.update_field_in_bulk('used_size_in_bytes', {
+            self.alive.id: 10.0,
+            self.dead.id: 20.0,
+        }, batch_size=1)
+        self.assertEqual(sorted(changed), sorted([self.alive.id, self.dead.id]))
+
+        self.assertEqual(
+            Database.objects.get(id=self.alive.id).used_size_in_bytes, 10.0
+        )
+        self.assertEqual(
+            Database.objects.get(id=self.dead.id).used_size_in_bytes, 20.0
+        )
+
+    def test_do_not_register_audit(self):
+        audits = Audit.objects.count()
+        Database.update_field_in_bulk('status', {
+            self.alive.id: Database.DEAD,
+        })
+        self.assertEqual(Audit.objects.count(), audits)
+
+    def test_nothing_to_update(self):
+        self.assertEqual(Database.update_field_in_bulk('status', {}), [])
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import socket
+import mock
+from django.test import TestCase
+from util import exec_remote_command
+from util import ssh_pool
+
+
+def new_client():
+    client = mock.Mock()
+    transport = client.get_transport.return_value
+    transport.is_active.return_value = True
+    channel = transport.open_session.return_value
+    channel.recv_exit_status.return_value = 0
+    channel.makefile.return_value.readlines.return_value = ['out\n']
+    channel.makefile_stderr.return_value.readlines.return_value = []
+    return client
+
+
+class SSHPoolTestCase(TestCase):
+
+    def setUp(self):
+        ssh_pool.clear()
+        self.addCleanup(ssh_pool.clear)
+        patcher = mock.patch('paramiko.SSHClient', side_effect=new_client)
+        self.ssh_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_commands_share_connection(self):
+        output = {}
+        for command in ('ls', 'df', 'du'):
+            self.assertEqual(exec_remote_command(
+                'server', 'user', 'pass', command, output
+            ), 0)
+
+        self.assertEqual(output['stdout'], ['out\n'])
+        self.assertEqual(self.ssh_client.call_count, 1)
+        client = ssh_pool.CONNECTIONS[('server', 'user')].client
+        transport = client.get_transport()
+        self.assertEqual(transport.open_session.call_count, 3)
+        transport.set_keepalive.assert_called_once_with(
+            ssh_pool.DEFAULT_KEEPALIVE
+        )
+        self.assertFalse(client.close.called)
+        transport.open_session.assert_called_with(
+            timeout=ssh_pool.DEFAULT_SESSION_TIMEOUT
+        )
+
+    def test_connection_per_server_and_user(self):
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        exec_remote_command('server', 'other', 'pass', 'ls')
+        exec_remote_command('other', 'user', 'pass', 'ls')
+        self.assertEqual(self.ssh_client.call_count, 3)
+
+    def test_password_change_reconnects(self):
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        old = ssh_pool.CONNECTIONS[('server', 'user')]
+        exec_remote_command('server', 'user', 'new pass', 'ls')
+
+        self.assertEqual(self.ssh_client.call_count, 2)
+        old.client.close.assert_called_once_with()
+
+    def test_broken_connection_reconnects(self):
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        old = ssh_pool.CONNECTIONS[('server', 'user')]
+        old.client.get_transport().open_session.side_effect = socket.error
+
+        self.assertEqual(exec_remote_command('server', 'user', 'pass', 'ls'), 0)
+        self.assertEqual(self.ssh_client.call_count, 2)
+        old.client.close.assert_called_once_with()
+
+    @mock.patch('time.time')
+    def test_idle_connection_is_evicted(self, time):
+        time.return_value = 1000
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        old = ssh_pool.CONNECTIONS[('server', 'user')]
+
+        time.return_value += ssh_pool.DEFAULT_IDLE_TIMEOUT + 1
+        exec_remote_command('server', 'user', 'pass', 'ls')
+
+        old.client.close.assert_called_once_with()
+        self.assertEqual(self.ssh_client.call_count, 2)
+
+    def test_connection_in_use_is_closed_after_command(self):
+        connection = ssh_pool.get_connection('server', 'user', 'pass')
+        connection.open_session()
+
+        ssh_pool.clear()
+        self.assertFalse(connection.client.close.called)
+        connection.release()
+        connection.client.close.assert_called_once_with()
+
+    def test_failed_reconnection_is_evicted(self):
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        old = ssh_pool.CONNECTIONS[('server', 'user')]
+        old.client.get_transport().open_session.side_effect = socket.error
+
+        def unreachable():
+            client = new_client()
+            client.get_transport().open_session.side_effect = socket.timeout
+            return client
+
+        self.ssh_client.side_effect = unreachable
+        self.assertRaises(
+            socket.timeout, ssh_pool.open_session, 'server', 'user', 'pass'
+        )
+        self.assertNotIn(('server', 'user'), ssh_pool.CONNECTIONS)
+
+    def test_evict_host(self):
+        exec_remote_command('server', 'user', 'pass', 'ls')
+        exec_remote_command('server', 'other', 'pass', 'ls')
+        exec_remote_command('other', 'user', 'pass', 'ls')
+        connections = dict(ssh_pool.CONNECTIONS)
+
+        ssh_pool.evict_host('server')
+
+        self.assertEqual(ssh_pool.CONNECTIONS.keys(), [('other', 'user')])
+        connections[('server', 'user')].client.close.assert_called_once_with()
+        connections[('server', 'other')].client.close.assert_called_once_with()
+        self.assertFalse(connections[('other', 'user')].client.close.called)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from drivers.fake import FakeDriver
+from physical.tests import factory as factory_physical
+from util.wait import wait_until
+from workflow.workflow import switch_master
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class WaitUntilTestCase(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for name in ('time', 'sleep'):
+            patcher = mock.patch(
+                'time.{}'.format(name), getattr(self.clock, name)
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ready_at_first_call(self):
+        condition = mock.Mock(return_value='ready')
+        self.assertEqual(wait_until(condition, timeout=60), 'ready')
+        self.assertEqual(condition.call_count, 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_backoff_until_max_interval(self):
+        condition = mock.Mock(side_effect=[False] * 6 + [True])
+        self.assertTrue(wait_until(
+            condition, timeout=600, first_interval=1, max_interval=8,
+            jitter=0
+        ))
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 8, 8, 8])
+
+    def test_jitter(self):
+        condition = mock.Mock(side_effect=[False, True])
+        wait_until(condition, timeout=60, first_interval=10, jitter=0.2)
+        self.assertTrue(8 <= self.clock.sleeps[0] <= 12)
+
+    def test_deadline(self):
+        condition = mock.Mock(return_value=False)
+        self.assertFalse(wait_until(
+            condition, timeout=10, first_interval=4, jitter=0
+        ))
+        self.assertEqual(self.clock.sleeps, [4, 6])
+        self.assertEqual(self.clock.now, 1010)
+        self.assertEqual(condition.call_count, 3)
+
+    def test_errors_are_raised(self):
+        condition = mock.Mock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            wait_until(condition, timeout=10)
+
+    def test_ignore_errors(self):
+        condition = mock.Mock(side_effect=[ValueError, ValueError, True])
+        self.assertTrue(
+            wait_until(condition, timeout=60, ignore_errors=True)
+        )
+        self.assertEqual(condition.call_count, 3)
+
+
+class CheckReplicationAndSwitchTestCase(TestCase):
+
+    def setUp(self):
+        self.driver = FakeDriver(
+            databaseinfra=factory_physical.DatabaseInfraFactory()
+        )
+        self.instance = mock.Mock()
+        patcher = mock.patch('time.sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(FakeDriver, 'switch_master', create=True)
+    @mock.patch.object(FakeDriver, 'check_instance_is_master', create=True)
+    @mock.patch.object(FakeDriver, 'is_replication_ok', create=True)
+    def test_switch_when_replication_is_ready(self, replication_ok,
+                                              is_master, switch):
+        replication_ok.side_effect = [False, False, True]
+        is_master.side_effect = [True, False]
+
+        self.driver.check_replication_and_switch(self.instance)
+        switch.assert_called_once_with()
+        self.assertEqual(replication_ok.call_count, 3)
+
+    @mock.patch('time.time')
+    @mock.patch.object(FakeDriver, 'switch_master', create=True)
+    @mock.patch.object(FakeDriver, 'is_replication_ok', create=True)
+    def test_replication_delay(self, replication_ok, switch, time):
+        replication_ok.return_value = False
+        time.side_effect = [1000, 1000, 2000]
+
+        with self.assertRaises(Exception):
+            self.driver.check_replication_and_switch(self.instance)
+        self.assertFalse(switch.called)
+
+    @mock.patch.object(FakeDriver, 'check_replication_and_switch')
+    @mock.patch.object(FakeDriver, 'get_master_instance')
+    @mock.patch.object(FakeDriver, 'is_replication_ok', create=True)
+    def test_wait_for_new_master(self, replication_ok, get_master, switch):
+        new_master = mock.Mock()
+        replication_ok.return_value = True
+        get_master.side_effect = [None, self.instance, new_master, None]
+
+        switch_master(self.driver, self.instance)
+        switch.assert_called_once_with(self.instance)
+        self.assertEqual(get_master.call_count, 3)
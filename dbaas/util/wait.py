@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import random
+import time
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_FIRST_INTERVAL = 1
+DEFAULT_MAX_INTERVAL = 30
+DEFAULT_BACKOFF = 2
+DEFAULT_JITTER = 0.2
+
+
+def wait_until(condition, timeout, first_interval=DEFAULT_FIRST_INTERVAL,
+               max_interval=DEFAULT_MAX_INTERVAL, backoff=DEFAULT_BACKOFF,
+               jitter=DEFAULT_JITTER, description=None, ignore_errors=False):
+    """
+    Calls condition until it returns a true value, which is returned.
+    Polls fast at first and backs off exponentially (up to max_interval,
+    randomized by jitter) so a resource that is ready soon is not waited
+    for a fixed time. Returns False when timeout seconds pass without
+    the condition being met. With ignore_errors an exception raised by
+    condition means not ready yet. Driver circuit breakers are bypassed,
+    the resource is expected to be unavailable while it is waited for.
+    """
+    from drivers.circuit_breaker import bypass
+
+    description = description or getattr(condition, '__name__', 'condition')
+    deadline = time.time() + timeout
+    interval = first_interval
+    attempt = 0
+
+    while True:
+        attempt += 1
+        try:
+            with bypass():
+                result = condition()
+        except Exception as e:
+            if not ignore_errors:
+                raise
+            LOG.debug('Waiting for {}: {}'.format(description, e))
+            result = False
+
+        if result:
+            LOG.info('{} ready after {} attempt(s)'.format(
+                description, attempt
+            ))
+            return result
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            LOG.warning('{} not ready after {} seconds'.format(
+                description, timeout
+            ))
+            return False
+
+        delay = interval * random.uniform(1 - jitter, 1 + jitter)
+        time.sleep(max(0, min(delay, remaining)))
+        interval = min(interval * backoff, max_interval)
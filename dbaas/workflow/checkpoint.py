@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+from django.db.models import Model, get_model
+
+LOG = logging.getLogger(__name__)
+
+# Keys rebuilt by every run, they are not part of the checkpoint
+TRANSIENT_KEYS = (
+    'steps', 'dependencies', 'exceptions', 'msgs', 'status', 'created',
+    'step_counter', 'total_steps', 'done_steps',
+)
+MODEL_KEY = '__model__'
+
+_SKIP = object()
+
+
+class CheckpointStateError(Exception):
+
+    """ Raised when a row kept by a checkpoint no longer exists """
+    pass
+
+
+def encode(value):
+    """
+    Converts value to something JSON serializable: models become a
+    reference to their row, lists and dicts are converted item by item.
+    Anything else that can not be serialized is skipped
+    """
+    if value is None or isinstance(value, (bool, int, long, float, basestring)):
+        return value
+
+    if isinstance(value, Model):
+        if not value.pk:
+            return _SKIP
+        return {
+            MODEL_KEY: '{}.{}'.format(
+                value._meta.app_label, value._meta.object_name
+            ),
+            'pk': value.pk,
+        }
+
+    if isinstance(value, (list, tuple, set)):
+        # Copied first, other steps of a graph may be appending to it
+        values = (encode(item) for item in list(value))
+        return [item for item in values if item is not _SKIP]
+
+    if isinstance(value, dict):
+        encoded = {}
+        for key, item in dict(value).items():
+            item = encode(item)
+            if item is not _SKIP:
+                encoded[unicode(key)] = item
+        return encoded
+
+    LOG.debug("Not keeping {!r} in checkpoint".format(value))
+    return _SKIP
+
+
+def decode(value):
+    """
+    Reverse of encode, loading the models referenced. Raises
+    CheckpointStateError when one of them was deleted
+    """
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+
+    if isinstance(value, dict):
+        if MODEL_KEY in value:
+            app_label, model_name = value[MODEL_KEY].split('.')
+            model = get_model(app_label, model_name)
+            try:
+                return model.objects.get(pk=value['pk'])
+            except model.DoesNotExist:
+                raise CheckpointStateError(
+                    "{} {} kept by the checkpoint no longer exists".format(
+                        value[MODEL_KEY], value['pk']
+                    )
+                )
+        return dict((str(key), decode(item)) for key, item in value.items())
+
+    return value
+
+
+def dump_state(workflow_dict):
+    """ What a workflow has to know to go on from where it stopped """
+    return encode(dict(
+        (key, value) for key, value in dict(workflow_dict).items()
+        if key not in TRANSIENT_KEYS
+    ))
+
+
+def load_state(state):
+    return decode(state)
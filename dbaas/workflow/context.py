@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import threading
+from dbaas_cloudstack.models import HostAttr, PlanAttr, CloudStackPack
+from dbaas_cloudstack.provider import CloudStackProvider
+from dbaas_credentials.credential import Credential
+from dbaas_credentials.models import CredentialType
+
+
+class WorkflowContext(object):
+
+    """
+    Objects loaded by the steps of one workflow run (credentials, providers,
+    drivers, host attributes, packs), each one is loaded once and shared by
+    every step of the run. A step that changes the rows behind an object
+    must call invalidate so the next steps load it again
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.lock = threading.RLock()
+
+    def memoize(self, key, load):
+        with self.lock:
+            if key in self.cache:
+                return self.cache[key]
+
+        # Loaded outside the lock, instances running at the same time do
+        # not wait for each other (the first one loaded is kept)
+        value = load()
+        with self.lock:
+            return self.cache.setdefault(key, value)
+
+    def invalidate(self, kind=None, pk=None):
+        """ Forgets objects of a kind (e.g. 'driver'), of one pk or all """
+        with self.lock:
+            for key in self.cache.keys():
+                if kind is None or (
+                    key[0] == kind and (pk is None or key[1] == pk)
+                ):
+                    del self.cache[key]
+
+    def credentials(self, environment, credential_type):
+        def load():
+            integration = CredentialType.objects.get(type=credential_type)
+            return Credential.get_credentials(environment, integration)
+        return self.memoize(
+            ('credentials', environment.pk, credential_type), load
+        )
+
+    def cloudstack_provider(self, environment):
+        return self.memoize(
+            ('cloudstack_provider', environment.pk),
+            lambda: CloudStackProvider(credentials=self.credentials(
+                environment, CredentialType.CLOUDSTACK
+            ))
+        )
+
+    def driver(self, infra):
+        return self.memoize(('driver', infra.pk), infra.get_driver)
+
+    def host_attr(self, host):
+        return self.memoize(
+            ('host_attr', host.pk), lambda: HostAttr.objects.get(host=host)
+        )
+
+    def plan_attr(self, plan):
+        return self.memoize(
+            ('plan_attr', plan.pk), lambda: PlanAttr.objects.get(plan=plan)
+        )
+
+    def pack(self, database):
+        return self.memoize(
+            ('pack', database.pk), lambda: CloudStackPack.objects.get(
+                offering__serviceofferingid=database.offering_id,
+                offering__region__environment=database.environment,
+                engine_type__name=database.engine_type
+            )
+        )
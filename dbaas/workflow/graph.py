@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import logging
+import threading
+import Queue
+from django.db import connection
+from util import full_stack
+
+LOG = logging.getLogger(__name__)
+
+
+class StepGraph(object):
+
+    """
+    Steps of a workflow and the steps that each one waits for, given as
+    {step: (step, ...)}. Dependencies must be listed before the step.
+    Steps without declared dependencies wait for every step listed before
+    them, so a workflow without dependencies runs in order
+    """
+
+    def __init__(self, steps, dependencies=None):
+        self.steps = tuple(steps)
+        if len(set(self.steps)) != len(self.steps):
+            raise ValueError("Steps with dependencies must be unique")
+
+        dependencies = dependencies or {}
+        self.dependencies = {}
+        for index, step in enumerate(self.steps):
+            previous = self.steps[:index]
+            if step not in dependencies:
+                self.dependencies[step] = set(previous)
+                continue
+
+            for dependency in dependencies[step]:
+                if dependency not in previous:
+                    raise ValueError("{} must be listed before {}".format(
+                        dependency, step
+                    ))
+            self.dependencies[step] = set(dependencies[step])
+
+    def ready(self, done, started):
+        """ Steps not started yet whose dependencies are done """
+        return [
+            step for step in self.steps
+            if step not in started and self.dependencies[step] <= done
+        ]
+
+
+def run_step_graph(graph, execute, workers):
+    """
+    Calls execute(step) for each step as soon as its dependencies are done,
+    at most 'workers' at the same time (with a single worker steps run in
+    the current thread). After a failure no step is started and the ones
+    running are waited for.
+    Returns the steps done, in the order they finished, and the failed ones
+    as (step, error, traceback)
+    """
+    results = Queue.Queue()
+
+    def call(step):
+        try:
+            execute(step)
+        except Exception as e:
+            results.put((step, e, full_stack()))
+        else:
+            results.put((step, None, None))
+
+    def call_in_thread(step):
+        try:
+            call(step)
+        finally:
+            # Every thread opens its own database connection
+            connection.close()
+
+    done, started = set(), set()
+    completed, failed = [], []
+    running = 0
+    while True:
+        if not failed:
+            for step in graph.ready(done, started):
+                if running >= workers:
+                    break
+                started.add(step)
+                running += 1
+                if workers <= 1:
+                    call(step)
+                    continue
+                thread = threading.Thread(target=call_in_thread, args=(step,))
+                thread.daemon = True
+                thread.start()
+
+        if not running:
+            break
+
+        step, error, traceback = results.get()
+        running -= 1
+        if error is None:
+            done.add(step)
+            completed.append(step)
+        else:
+            LOG.warn("Step {} failed: {}".format(step, error))
+            failed.append((step, error, traceback))
+
+    return completed, failed
@@ -12,6 +12,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from physical.models import Host
 from physical.models import Instance
 from ...util.base import BaseStep
+from ...util.deploy.virtual_machines import deploy_virtual_machines
 from ....exceptions.error_codes import DBAAS_0011
 
 LOG = logging.getLogger(__name__)
@@ -44,6 +45,7 @@ class CreateVirtualMachine(BaseStep):
             workflow_dict['vms_id'] = []
             bundles = list(cs_plan_attrs.bundle.all())
 
+            deployments = []
             for index, vm_name in enumerate(workflow_dict['names']['vms']):
 
                 if len(bundles) == 1:
@@ -72,25 +74,12 @@ class CreateVirtualMachine(BaseStep):
                         'databaseinfra']
                     dbinfra_offering.save()
 
-                LOG.debug(
-                    "Deploying new vm on cs with bundle %s and offering %s" % (bundle, offering))
+                deployments.append((vm_name, bundle, offering))
 
-                vm = cs_provider.deploy_virtual_machine(
-                    offering=offering.serviceofferingid,
-                    bundle=bundle,
-                    project_id=cs_credentials.project,
-                    vmname=vm_name,
-                    affinity_group_id=cs_credentials.get_parameter_by_name(
-                        'affinity_group_id'),
-                )
-
-                if not vm:
-                    raise Exception(
-                        "CloudStack could not create the virtualmachine")
-
-                LOG.debug("New virtualmachine: %s" % vm)
+            vms = deploy_virtual_machines(
+                cs_provider, cs_credentials, deployments, workflow_dict['vms_id'])
 
-                workflow_dict['vms_id'].append(vm['virtualmachine'][0]['id'])
+            for index, vm in enumerate(vms):
 
                 host = Host()
                 host.address = vm['virtualmachine'][0]['nic'][0]['ipaddress']
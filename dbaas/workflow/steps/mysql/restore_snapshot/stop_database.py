@@ -6,11 +6,13 @@ from workflow.exceptions.error_codes import DBAAS_0021
 from workflow.steps.util.restore_snapshot import use_database_initialization_script
 from workflow.steps.mysql.util import start_slave
 from physical.models import Instance
-from time import sleep
+from util.wait import wait_until
 
 
 LOG = logging.getLogger(__name__)
 
+START_WAIT = 30
+
 
 class StopDatabase(BaseStep):
 
@@ -50,6 +52,8 @@ class StopDatabase(BaseStep):
         LOG.info("Running undo...")
         try:
             databaseinfra = workflow_dict['databaseinfra']
+            driver = databaseinfra.get_driver()
+            instances = []
 
             for host in workflow_dict['stoped_hosts']:
                 LOG.info('Starting database on host {}'.format(host))
@@ -62,10 +66,16 @@ class StopDatabase(BaseStep):
 
                 instance = host.instances.all()[0]
                 start_slave(instance=instance)
-
-            LOG.info('Wainting 30 seconds to setting write/read instances')
-            sleep(30)
-            driver = databaseinfra.get_driver()
+                instances.append(instance)
+
+            LOG.info('Waiting instances to setting write/read instances')
+            wait_until(
+                lambda: all(
+                    driver.check_status(instance=instance)
+                    for instance in instances
+                ), timeout=START_WAIT, ignore_errors=True,
+                description='Started instances'
+            )
             master_host = workflow_dict['host']
             master_instance = Instance.objects.get(hostname=master_host)
             secondary_host = workflow_dict['not_primary_hosts'][0]
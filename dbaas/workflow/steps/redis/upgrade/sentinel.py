@@ -9,9 +9,9 @@ class Reset(BaseInstanceStep):
     def __unicode__(self):
         return "Resetting Sentinel..."
 
-    def __init__(self, instance):
-        super(Reset, self).__init__(instance)
-        self.driver = self.instance.databaseinfra.get_driver()
+    def __init__(self, instance, context=None):
+        super(Reset, self).__init__(instance, context)
+        self.driver = self.context.driver(self.instance.databaseinfra)
         self.host = self.instance.hostname
         self.sentinel_instance = self.host.non_database_instance()
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
-from ..util.base import BaseStep
+from ..util.base import BaseStep, BaseInstanceStep
 
 LOG = logging.getLogger(__name__)
 
@@ -52,3 +52,79 @@ class TestStep4(BaseStep):
     def undo(self, workflow_dict):
         raise Exception
         return False
+
+
+class InstanceTestStep(BaseInstanceStep):
+
+    # (step, instance) done, in order
+    executed = []
+
+    def __unicode__(self):
+        return type(self).__name__
+
+    def do(self):
+        self.executed.append((type(self).__name__, self.instance))
+
+
+class SequentialStep(InstanceTestStep):
+    pass
+
+
+class DriverStep(InstanceTestStep):
+
+    def __init__(self, instance, context=None):
+        super(DriverStep, self).__init__(instance, context)
+        self.driver = self.context.driver(self.instance.databaseinfra)
+
+
+class ParallelStep1(InstanceTestStep):
+    parallel = True
+
+
+class ParallelStep2(InstanceTestStep):
+    parallel = True
+
+
+class FailingParallelStep(InstanceTestStep):
+    parallel = True
+
+    # Instance the step fails for
+    failing_instance = None
+
+    def do(self):
+        if self.instance == self.failing_instance:
+            raise EnvironmentError('Step failed')
+        super(FailingParallelStep, self).do()
+
+
+class RecordingStep(BaseStep):
+
+    def __unicode__(self):
+        return type(self).__name__
+
+    def do(self, workflow_dict):
+        workflow_dict.setdefault('done', []).append(type(self).__name__)
+        return True
+
+    def undo(self, workflow_dict):
+        workflow_dict.setdefault('undone', []).append(type(self).__name__)
+        return True
+
+
+class GraphStepA(RecordingStep):
+    pass
+
+
+class GraphStepB(RecordingStep):
+    pass
+
+
+class GraphStepC(RecordingStep):
+    pass
+
+
+class FailingGraphStep(RecordingStep):
+
+    def do(self, workflow_dict):
+        super(FailingGraphStep, self).do(workflow_dict)
+        return False
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from workflow.steps.util.deploy.virtual_machines import deploy_virtual_machines
+
+
+def virtual_machine(vm_id):
+    return {'virtualmachine': [
+        {'id': vm_id, 'nic': [{'ipaddress': '10.0.0.{}'.format(vm_id)}]}
+    ]}
+
+
+class DeployVirtualMachinesTestCase(TestCase):
+
+    def setUp(self):
+        self.credentials = mock.Mock(project='project')
+        self.provider = mock.Mock()
+        self.offering = mock.Mock(serviceofferingid='offering')
+        self.deployments = [
+            ('vm{}'.format(index), 'bundle', self.offering)
+            for index in range(3)
+        ]
+
+    def deploy(self, **kwargs):
+        return virtual_machine(int(kwargs['vmname'][-1]))
+
+    def test_vms_in_deployments_order(self):
+        self.provider.deploy_virtual_machine.side_effect = self.deploy
+        vms_id = []
+
+        vms = deploy_virtual_machines(
+            self.provider, self.credentials, self.deployments, vms_id
+        )
+
+        self.assertEqual(
+            [vm['virtualmachine'][0]['id'] for vm in vms], [0, 1, 2]
+        )
+        self.assertEqual(sorted(vms_id), [0, 1, 2])
+        self.assertEqual(self.provider.deploy_virtual_machine.call_count, 3)
+
+    def test_only_created_vms_are_kept_to_be_destroyed(self):
+        def deploy(**kwargs):
+            if kwargs['vmname'] == 'vm1':
+                return None
+            return self.deploy(**kwargs)
+        self.provider.deploy_virtual_machine.side_effect = deploy
+        vms_id = []
+
+        with self.assertRaises(Exception) as context:
+            deploy_virtual_machines(
+                self.provider, self.credentials, self.deployments, vms_id
+            )
+
+        self.assertIn('vm1', str(context.exception))
+        self.assertEqual(sorted(vms_id), [0, 2])
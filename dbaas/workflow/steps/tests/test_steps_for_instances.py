@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from physical.tests import factory as physical_factory
+from workflow.workflow import steps_for_instances, is_instance_parallel
+from . import factory
+
+STEPS = 'workflow.steps.tests.factory.'
+
+
+@mock.patch('workflow.workflow.get_parallel_instances', new=lambda: 1)
+class StepsForInstancesTestCase(TestCase):
+
+    def setUp(self):
+        infra = physical_factory.DatabaseInfraFactory()
+        self.instances = [
+            physical_factory.InstanceFactory(databaseinfra=infra, port=port)
+            for port in (1, 2, 3)
+        ]
+        self.task = mock.Mock()
+        factory.InstanceTestStep.executed = []
+        factory.FailingParallelStep.failing_instance = None
+
+    @property
+    def steps_run(self):
+        return [
+            (call[0][0], call[0][2])
+            for call in self.task.add_step.call_args_list
+        ]
+
+    def test_is_instance_parallel(self):
+        self.assertTrue(is_instance_parallel(
+            (STEPS + 'ParallelStep1', STEPS + 'ParallelStep2')
+        ))
+        self.assertFalse(is_instance_parallel(
+            (STEPS + 'ParallelStep1', STEPS + 'SequentialStep')
+        ))
+        self.assertFalse(is_instance_parallel((STEPS + 'TestStep1',)))
+
+    def test_parallel_group_keeps_step_numbers(self):
+        groups = [
+            {'First': (STEPS + 'SequentialStep',)},
+            {'Second': (STEPS + 'ParallelStep1', STEPS + 'ParallelStep2')},
+        ]
+        step_counter = mock.Mock()
+
+        self.assertTrue(steps_for_instances(
+            groups, self.instances, self.task, step_counter
+        ))
+
+        self.assertEqual(len(self.steps_run), 9)
+        self.assertEqual(
+            self.steps_run[3:5],
+            [(4, '{} - ParallelStep1'.format(self.instances[0])),
+             (5, '{} - ParallelStep2'.format(self.instances[0]))]
+        )
+        self.assertEqual(self.steps_run[-1][0], 9)
+        self.assertEqual(
+            [call[0][0] for call in step_counter.call_args_list], [1, 2, 3, 4]
+        )
+
+    def test_mixed_group_is_sequential(self):
+        groups = [
+            {'Group': (STEPS + 'ParallelStep1', STEPS + 'SequentialStep')},
+        ]
+        self.assertTrue(steps_for_instances(groups, self.instances, self.task))
+        self.assertEqual(
+            factory.InstanceTestStep.executed[:3],
+            [('ParallelStep1', self.instances[0]),
+             ('SequentialStep', self.instances[0]),
+             ('ParallelStep1', self.instances[1])]
+        )
+
+    def test_parallel_failure_is_reported_by_instance(self):
+        factory.FailingParallelStep.failing_instance = self.instances[1]
+        groups = [
+            {'Group': (STEPS + 'FailingParallelStep', STEPS + 'ParallelStep1')},
+            {'Never run': (STEPS + 'SequentialStep',)},
+        ]
+
+        self.assertFalse(steps_for_instances(groups, self.instances, self.task))
+
+        self.assertEqual(
+            factory.InstanceTestStep.executed,
+            [('FailingParallelStep', self.instances[0]),
+             ('ParallelStep1', self.instances[0]),
+             ('FailingParallelStep', self.instances[2]),
+             ('ParallelStep1', self.instances[2])]
+        )
+        self.task.update_details.assert_any_call(
+            '{} - FAILED!'.format(self.instances[1]), persist=True
+        )
+        self.task.add_detail.assert_any_call('Step failed')
+
+    def test_since_step_skips_in_parallel(self):
+        groups = [
+            {'Group': (STEPS + 'ParallelStep1', STEPS + 'ParallelStep2')},
+        ]
+        self.assertTrue(steps_for_instances(
+            groups, self.instances, self.task, since_step=4
+        ))
+        self.assertEqual(len(factory.InstanceTestStep.executed), 3)
+        self.task.update_details.assert_any_call(
+            '{} - SKIPPED!'.format(self.instances[1])
+        )
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from notification.models import WorkflowCheckpoint
+from physical.tests import factory as factory_physical
+from util.providers import make_infra, rollback_infra
+from workflow.checkpoint import dump_state, load_state, CheckpointStateError
+from workflow.workflow import start_workflow, is_resumable_workflows
+
+STEPS = 'workflow.steps.tests.factory.'
+
+
+class CheckpointStateTestCase(TestCase):
+
+    def test_models_are_kept_as_references(self):
+        host = factory_physical.HostFactory()
+        state = dump_state({
+            'name': 'db', 'qt': 2, 'hosts': [host], 'names': {'infra': 'x'},
+            'provider': object(), 'steps': ('a',),
+        })
+
+        self.assertNotIn('provider', state)
+        self.assertNotIn('steps', state)
+        self.assertEqual(load_state(state), {
+            'name': 'db', 'qt': 2, 'hosts': [host], 'names': {'infra': 'x'},
+        })
+
+
+    def test_deleted_model(self):
+        host = factory_physical.HostFactory()
+        state = dump_state({'hosts': [host]})
+        host.delete()
+
+        with self.assertRaises(CheckpointStateError):
+            load_state(state)
+
+
+@mock.patch('util.providers.start_workflow')
+@mock.patch('util.providers.get_vm_qt', new=lambda plan: 1)
+@mock.patch('util.providers.get_deploy_settings', new=lambda path: ())
+@mock.patch('util.providers.get_deploy_dependencies', new=lambda path: {})
+class ResumableWorkflowsTestCase(TestCase):
+
+    def make_infra(self):
+        plan = mock.Mock(provider=1, CLOUDSTACK=1)
+        make_infra(plan, None, 'resumable_db', None, None, 'description')
+
+    def test_not_resumable_by_default(self, start_workflow):
+        self.assertFalse(is_resumable_workflows())
+
+        self.make_infra()
+        self.assertIsNone(start_workflow.call_args[1]['checkpoint'])
+        self.assertFalse(WorkflowCheckpoint.objects.exists())
+
+    @mock.patch('util.providers.is_resumable_workflows', new=lambda: True)
+    def test_checkpoint_when_resumable(self, start_workflow):
+        self.make_infra()
+        self.assertEqual(
+            start_workflow.call_args[1]['checkpoint'],
+            WorkflowCheckpoint.objects.get()
+        )
+
+
+@mock.patch('workflow.workflow.get_graph_workers', new=lambda: 1)
+@mock.patch('workflow.workflow.is_resumable_workflows', new=lambda: True)
+class WorkflowCheckpointTestCase(TestCase):
+
+    def setUp(self):
+        self.workflow_dict = {
+            'name': 'checkpoint_db',
+            'steps': (STEPS + 'GraphStepA', STEPS + 'FailingGraphStep',
+                      STEPS + 'GraphStepB'),
+        }
+        self.checkpoint = WorkflowCheckpoint.start(
+            WorkflowCheckpoint.DEPLOY, self.workflow_dict
+        )
+
+    def reload(self):
+        return WorkflowCheckpoint.objects.get(pk=self.checkpoint.pk)
+
+    def test_failed_workflow_is_kept(self):
+        self.assertFalse(start_workflow(
+            self.workflow_dict, checkpoint=self.checkpoint
+        ))
+
+        self.assertNotIn('undone', self.workflow_dict)
+        checkpoint = self.reload()
+        self.assertTrue(checkpoint.is_status_error)
+        self.assertEqual(checkpoint.get_done_steps(), [STEPS + 'GraphStepA'])
+        self.assertEqual(
+            checkpoint.get_failed_steps(), [STEPS + 'FailingGraphStep']
+        )
+        self.assertEqual(checkpoint.load_state()['done'], ['GraphStepA'])
+
+    def test_resume_skips_steps_done(self):
+        self.workflow_dict['steps'] = (
+            STEPS + 'GraphStepA', STEPS + 'GraphStepC', STEPS + 'GraphStepB'
+        )
+        checkpoint = self.checkpoint
+        checkpoint.step_done(STEPS + 'GraphStepA', {'done': ['GraphStepA']})
+        checkpoint.set_error([STEPS + 'GraphStepC'])
+
+        workflow_dict = checkpoint.load_state()
+        workflow_dict.update(
+            steps=self.workflow_dict['steps'],
+            done_steps=checkpoint.get_done_steps()
+        )
+        checkpoint.resume()
+
+        self.assertTrue(start_workflow(workflow_dict, checkpoint=checkpoint))
+        self.assertEqual(
+            workflow_dict['done'], ['GraphStepA', 'GraphStepC', 'GraphStepB']
+        )
+        self.assertEqual(self.reload().status, WorkflowCheckpoint.SUCCESS)
+
+    def test_graph_workflow_is_kept(self):
+        self.workflow_dict['dependencies'] = {
+            STEPS + 'GraphStepB': (STEPS + 'GraphStepA',),
+        }
+
+        self.assertFalse(start_workflow(
+            self.workflow_dict, checkpoint=self.checkpoint
+        ))
+
+        self.assertNotIn('undone', self.workflow_dict)
+        self.assertEqual(
+            self.reload().get_failed_steps(), [STEPS + 'FailingGraphStep']
+        )
+
+    def test_rollback_when_not_resumable(self):
+        with mock.patch(
+            'workflow.workflow.is_resumable_workflows', new=lambda: False
+        ):
+            self.assertFalse(start_workflow(
+                self.workflow_dict, checkpoint=self.checkpoint
+            ))
+
+        self.assertEqual(
+            self.workflow_dict['undone'], ['FailingGraphStep', 'GraphStepA']
+        )
+        self.assertEqual(self.reload().status, WorkflowCheckpoint.ROLLED_BACK)
+
+    def test_rollback_kept_workflow(self):
+        start_workflow(self.workflow_dict, checkpoint=self.checkpoint)
+
+        checkpoint = self.reload()
+        self.assertTrue(rollback_infra(checkpoint))
+        self.assertEqual(checkpoint.status, WorkflowCheckpoint.ROLLED_BACK)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import mock
+from django.test import TestCase
+from physical.models import DatabaseInfra
+from physical.tests import factory as physical_factory
+from workflow.context import WorkflowContext
+from workflow.workflow import steps_for_instances
+
+STEPS = 'workflow.steps.tests.factory.'
+
+
+class WorkflowContextTestCase(TestCase):
+
+    def setUp(self):
+        self.context = WorkflowContext()
+        self.load = mock.Mock(side_effect=lambda: object())
+
+    def test_loaded_once(self):
+        value = self.context.memoize(('driver', 1), self.load)
+        self.assertIs(self.context.memoize(('driver', 1), self.load), value)
+        self.assertEqual(self.load.call_count, 1)
+
+    def test_invalidate_one_object(self):
+        self.context.memoize(('driver', 1), self.load)
+        self.context.memoize(('driver', 2), self.load)
+        self.context.memoize(('pack', 1), self.load)
+
+        self.context.invalidate('driver', 1)
+        self.assertEqual(
+            sorted(self.context.cache.keys()), [('driver', 2), ('pack', 1)]
+        )
+
+        self.context.invalidate('driver')
+        self.assertEqual(self.context.cache.keys(), [('pack', 1)])
+
+        self.context.invalidate()
+        self.assertEqual(self.context.cache, {})
+
+    def test_object_loaded_again_after_invalidate(self):
+        value = self.context.memoize(('pack', 1), self.load)
+        self.context.invalidate('pack', 1)
+        self.assertIsNot(self.context.memoize(('pack', 1), self.load), value)
+
+
+class StepsShareContextTestCase(TestCase):
+
+    def test_driver_loaded_once_per_run(self):
+        infra = physical_factory.DatabaseInfraFactory()
+        instances = [
+            physical_factory.InstanceFactory(databaseinfra=infra, port=port)
+            for port in (1, 2)
+        ]
+        groups = [{'Driver': (STEPS + 'DriverStep', STEPS + 'DriverStep')}]
+
+        with mock.patch.object(
+            DatabaseInfra, 'get_driver', autospec=True
+        ) as get_driver:
+            self.assertTrue(steps_for_instances(groups, instances, mock.Mock()))
+            self.assertTrue(steps_for_instances(groups, instances, mock.Mock()))
+
+        self.assertEqual(get_driver.call_count, 2)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import threading
+import mock
+from django.test import TestCase
+from workflow.graph import StepGraph, run_step_graph
+from workflow.workflow import start_workflow
+
+STEPS = 'workflow.steps.tests.factory.'
+
+
+class StepGraphTestCase(TestCase):
+
+    def test_undeclared_steps_wait_for_previous_ones(self):
+        graph = StepGraph(('a', 'b', 'c'), {'c': ('a',)})
+
+        self.assertEqual(graph.dependencies['b'], set(['a']))
+        self.assertEqual(graph.ready(set(), set()), ['a'])
+        self.assertEqual(graph.ready(set(['a']), set(['a'])), ['b', 'c'])
+
+    def test_dependency_must_come_before(self):
+        with self.assertRaises(ValueError):
+            StepGraph(('a', 'b'), {'a': ('b',)})
+        with self.assertRaises(ValueError):
+            StepGraph(('a', 'b'), {'b': ('unknown',)})
+
+    def test_independent_steps_run_at_the_same_time(self):
+        graph = StepGraph(('a', 'b', 'c', 'd'), {
+            'b': ('a',), 'c': ('a',), 'd': ('b', 'c')
+        })
+        both_running = threading.Event()
+        running = []
+
+        def execute(step):
+            running.append(step)
+            if step in ('b', 'c'):
+                if len(running) == 3:
+                    both_running.set()
+                both_running.wait(5)
+
+        completed, failed = run_step_graph(graph, execute, workers=2)
+
+        self.assertTrue(both_running.is_set())
+        self.assertEqual(failed, [])
+        self.assertEqual(completed[0], 'a')
+        self.assertEqual(completed[-1], 'd')
+
+    def test_no_step_starts_after_failure(self):
+        graph = StepGraph(('a', 'b', 'c'), {'b': (), 'c': ('a', 'b')})
+
+        def execute(step):
+            if step == 'b':
+                raise EnvironmentError('failed')
+
+        completed, failed = run_step_graph(graph, execute, workers=1)
+
+        self.assertEqual(completed, ['a'])
+        self.assertEqual([step for step, _, _ in failed], ['b'])
+        self.assertIsInstance(failed[0][1], EnvironmentError)
+
+
+@mock.patch('workflow.workflow.get_graph_workers', new=lambda: 1)
+class StartWorkflowGraphTestCase(TestCase):
+
+    def test_start_workflow_with_dependencies(self):
+        workflow_dict = {
+            'steps': (STEPS + 'GraphStepA', STEPS + 'GraphStepB',
+                      STEPS + 'GraphStepC'),
+            'dependencies': {STEPS + 'GraphStepC': (STEPS + 'GraphStepA',)},
+        }
+
+        self.assertTrue(start_workflow(workflow_dict))
+        self.assertTrue(workflow_dict['created'])
+        self.assertEqual(
+            workflow_dict['done'], ['GraphStepA', 'GraphStepB', 'GraphStepC']
+        )
+
+    def test_rollback_undoes_only_steps_run(self):
+        workflow_dict = {
+            'steps': (STEPS + 'GraphStepA', STEPS + 'FailingGraphStep',
+                      STEPS + 'GraphStepB'),
+            'dependencies': {
+                STEPS + 'FailingGraphStep': (STEPS + 'GraphStepA',),
+                STEPS + 'GraphStepB': (STEPS + 'GraphStepA',),
+            },
+        }
+
+        self.assertFalse(start_workflow(workflow_dict))
+
+        self.assertEqual(
+            workflow_dict['done'], ['GraphStepA', 'FailingGraphStep']
+        )
+        self.assertEqual(
+            workflow_dict['undone'], ['FailingGraphStep', 'GraphStepA']
+        )
+        self.assertEqual(
+            workflow_dict['exceptions']['error_codes'],
+            [('DBAAS_0001', 'Workflow error')]
+        )
@@ -5,6 +5,7 @@ from util import check_ssh
 from util import get_credentials_for
 from util import full_stack
 from util import build_context_script
+from util.ssh_pool import evict_host
 from time import sleep
 from dbaas_cloudstack.models import HostAttr
 from dbaas_cloudstack.provider import CloudStackProvider
@@ -109,6 +110,7 @@ def stop_vm(workflow_dict):
             host = instance.hostname
             host_csattr = HostAttr.objects.get(host=host)
             stoped = cs_provider.stop_virtual_machine(vm_id=host_csattr.vm_id)
+            evict_host(host.address)
             if not stoped:
                 raise Exception("Could not stop host {}".format(host))
 
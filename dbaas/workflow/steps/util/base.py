@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 from django.utils.encoding import python_2_unicode_compatible
+from workflow.context import WorkflowContext
 
 
 @python_2_unicode_compatible
 class BaseStep(object):
 
+    # Steps that only touch their own instance, steps_for_instances runs a
+    # group of them on every instance at the same time
+    parallel = False
+
     def __str__(self):
         return "I am a step"
 
@@ -18,5 +23,7 @@ class BaseStep(object):
 
 class BaseInstanceStep(BaseStep):
 
-    def __init__(self, instance):
+    def __init__(self, instance, context=None):
         self.instance = instance
+        # Shared by the steps of a workflow run, see WorkflowContext
+        self.context = context or WorkflowContext()
@@ -1,20 +1,20 @@
 # -*- coding: utf-8 -*-
-from time import sleep
 from django.db import transaction
 from workflow.steps.util.restore_snapshot import use_database_initialization_script
 from workflow.steps.util.base import BaseInstanceStep
+from util.wait import wait_until
 
 CHECK_SECONDS = 10
-CHECK_ATTEMPTS = 12
+CHECK_TIMEOUT = 120
 
 
 class DatabaseStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(DatabaseStep, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(DatabaseStep, self).__init__(instance, context)
 
         self.infra = self.instance.databaseinfra
-        self.driver = self.infra.get_driver()
+        self.driver = self.context.driver(self.infra)
 
     def do(self):
         raise NotImplementedError
@@ -34,17 +34,17 @@ class DatabaseStep(BaseInstanceStep):
         return self._execute_init_script('stop')
 
     def __is_instance_status(self, expected):
-        for _ in range(CHECK_ATTEMPTS):
+        def status():
             try:
-                status = self.driver.check_status(instance=self.instance)
+                return self.driver.check_status(instance=self.instance)
             except:
-                status = False
+                return False
 
-            if status == expected:
-                return True
-            else:
-                sleep(CHECK_SECONDS)
-        return False
+        return bool(wait_until(
+            lambda: status() == expected, timeout=CHECK_TIMEOUT,
+            max_interval=CHECK_SECONDS,
+            description='Status of {}'.format(self.instance)
+        ))
 
     @property
     def is_up(self):
@@ -8,6 +8,7 @@ from util import build_context_script
 from dbaas_cloudstack.provider import CloudStackProvider
 from dbaas_credentials.models import CredentialType
 from util import get_credentials_for
+from util.ssh_pool import evict_host
 
 LOG = logging.getLogger(__name__)
 
@@ -98,6 +99,7 @@ def stop_vm(workflow_dict):
             host = instance.hostname
             host_csattr = HostAttr.objects.get(host=host)
             stoped = cs_provider.stop_virtual_machine(vm_id=host_csattr.vm_id)
+            evict_host(host.address)
             if not stoped:
                 raise Exception, "Could not stop host {}".format(host)
 
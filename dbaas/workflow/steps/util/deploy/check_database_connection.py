@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 import logging
 from util import full_stack
+from util.wait import wait_until
 from ..base import BaseStep
 from ....exceptions.error_codes import DBAAS_0004
 
 LOG = logging.getLogger(__name__)
 
+REPLICATION_WAIT = 60
+
 
 class CheckDatabaseConnection(BaseStep):
 
@@ -21,10 +24,14 @@ class CheckDatabaseConnection(BaseStep):
             driver = workflow_dict['databaseinfra'].get_driver()
 
             if workflow_dict['qt'] > 1:
-                LOG.info("Waiting 60 seconds to init replication...")
-                from time import sleep
-
-                sleep(60)
+                LOG.info("Waiting replication to init...")
+                wait_until(
+                    lambda: all(
+                        driver.is_replication_ok(instance)
+                        for instance in driver.get_database_instances()
+                    ), timeout=REPLICATION_WAIT, ignore_errors=True,
+                    description='Replication'
+                )
 
             if driver.check_status():
                 LOG.info("Database is ok...")
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import logging
+from system.models import Configuration
+from util.parallel import run_in_parallel
+
+LOG = logging.getLogger(__name__)
+
+# CloudStack deploy jobs of one infra running at the same time
+DEFAULT_DEPLOY_WORKERS = 3
+
+
+def deploy_virtual_machines(cs_provider, cs_credentials, deployments, vms_id):
+    """
+    Deploys every (vm name, bundle, offering) at the same time and waits for
+    all of them. The id of each VM created is added to vms_id, so when any
+    deploy fails the step undo destroys only the VMs that exist.
+    Returns the VMs in the order of deployments
+    """
+    affinity_group_id = cs_credentials.get_parameter_by_name(
+        'affinity_group_id')
+
+    def deploy(deployment):
+        vm_name, bundle, offering = deployment
+        LOG.debug(
+            "Deploying new vm on cs with bundle %s and offering %s" % (bundle, offering))
+
+        vm = cs_provider.deploy_virtual_machine(
+            offering=offering.serviceofferingid,
+            bundle=bundle,
+            project_id=cs_credentials.project,
+            vmname=vm_name,
+            affinity_group_id=affinity_group_id,
+        )
+
+        if not vm:
+            raise Exception(
+                "CloudStack could not create the virtualmachine %s" % vm_name)
+
+        LOG.debug("New virtualmachine: %s" % vm)
+        return vm
+
+    workers = Configuration.get_by_name_as_int(
+        'deploy_virtual_machine_workers', default=DEFAULT_DEPLOY_WORKERS)
+    results = run_in_parallel(deploy, deployments, workers)
+
+    errors = []
+    for result in results:
+        if result.succeeded:
+            vms_id.append(result.result['virtualmachine'][0]['id'])
+        else:
+            LOG.error("Could not deploy %s: %s" % (
+                result.item[0], result.traceback))
+            errors.append("%s: %s" % (result.item[0], result.error))
+
+    if errors:
+        raise Exception(
+            "CloudStack could not create the virtualmachines\n%s" % "\n".join(errors))
+
+    return [result.result for result in results]
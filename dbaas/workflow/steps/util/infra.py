@@ -4,8 +4,8 @@ from workflow.steps.util.base import BaseInstanceStep
 
 
 class Update(BaseInstanceStep):
-    def __init__(self, instance):
-        super(Update, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(Update, self).__init__(instance, context)
 
         self.infra = self.instance.databaseinfra
         self.database = self.infra.databases.last()
@@ -29,6 +29,7 @@ class Offering(Update):
             'created_at'
         ).target_offer.offering
         self.infra_offering.save()
+        self.context.invalidate('pack', self.database.pk)
 
     def undo(self):
         pass
@@ -47,6 +48,7 @@ class Memory(Update):
         new_max_memory *= resize_factor
         self.infra.per_database_size_mbytes = int(new_max_memory)
         self.infra.save()
+        self.context.invalidate('driver', self.infra.pk)
 
     def undo(self):
         pass
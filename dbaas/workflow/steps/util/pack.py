@@ -1,17 +1,16 @@
 # -*- coding: utf-8 -*-
 from util import build_context_script, exec_remote_command
-from dbaas_cloudstack.models import HostAttr, CloudStackPack
 from maintenance.models import DatabaseResize
 from workflow.steps.util.base import BaseInstanceStep
 
 
 class PackStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(PackStep, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(PackStep, self).__init__(instance, context)
 
         self.host = self.instance.hostname
-        self.host_cs = HostAttr.objects.get(host=self.host)
+        self.host_cs = self.context.host_attr(self.host)
 
         self.database = self.instance.databaseinfra.databases.first()
 
@@ -41,14 +40,12 @@ class PackStep(BaseInstanceStep):
 
 class Configure(PackStep):
 
-    def __init__(self, instance):
-        super(Configure, self).__init__(instance)
+    parallel = True
 
-        self.pack = CloudStackPack.objects.get(
-            offering__serviceofferingid=self.database.offering_id,
-            offering__region__environment=self.database.environment,
-            engine_type__name=self.database.engine_type
-        )
+    def __init__(self, instance, context=None):
+        super(Configure, self).__init__(instance, context)
+
+        self.pack = self.context.pack(self.database)
 
     def __unicode__(self):
         return "Executing pack script..."
@@ -74,7 +71,7 @@ class Configure(PackStep):
 
 class ResizeConfigure(Configure):
 
-    def __init__(self, instance):
-        super(ResizeConfigure, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(ResizeConfigure, self).__init__(instance, context)
 
         self.pack = DatabaseResize.objects.last().current_to(self.database).target_offer
@@ -11,18 +11,18 @@ LOG = logging.getLogger(__name__)
 
 class Start(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(Start, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(Start, self).__init__(instance, context)
 
         self.infra = self.instance.databaseinfra
-        self.driver = self.infra.get_driver()
+        self.driver = self.context.driver(self.infra)
         self.host = self.instance.hostname
 
     def __unicode__(self):
         return "Starting database agents..."
 
     def do(self):
-        CheckIsUp(self.instance)
+        CheckIsUp(self.instance, self.context)
         self.driver.start_agents(self.host)
 
     def undo(self):
@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 import logging
 from util import full_stack
-from time import sleep
+from util.wait import wait_until
 from workflow.steps.util.base import BaseStep
 from workflow.exceptions.error_codes import DBAAS_0021
 from workflow.steps.util.restore_snapshot import use_database_initialization_script
 
 LOG = logging.getLogger(__name__)
 
+START_WAIT = 60
+
 
 class StartDatabase(BaseStep):
 
@@ -17,6 +19,7 @@ class StartDatabase(BaseStep):
     def do(self, workflow_dict):
         try:
             databaseinfra = workflow_dict['databaseinfra']
+            driver = databaseinfra.get_driver()
             host = workflow_dict['host']
             hosts = [host, ]
 
@@ -31,8 +34,13 @@ class StartDatabase(BaseStep):
                 if return_code != 0:
                     raise Exception(str(output))
 
-                LOG.info('Wait 1 minute before start other instance')
-                sleep(60)
+                LOG.info('Waiting database on {} before start other instance'.format(host))
+                instance = host.instances.all()[0]
+                wait_until(
+                    lambda: driver.check_status(instance=instance),
+                    timeout=START_WAIT, ignore_errors=True,
+                    description='Database on {}'.format(host)
+                )
 
             return True
         except Exception:
@@ -5,8 +5,10 @@ from workflow.steps.util.base import BaseInstanceStep
 
 class DBMonitorStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(DBMonitorStep, self).__init__(instance)
+    parallel = True
+
+    def __init__(self, instance, context=None):
+        super(DBMonitorStep, self).__init__(instance, context)
         self.provider = DBMonitorProvider()
 
     def do(self):
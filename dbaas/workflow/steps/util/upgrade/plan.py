@@ -1,17 +1,16 @@
 # -*- coding: utf-8 -*-
 from util import build_context_script, exec_remote_command
-from dbaas_cloudstack.models import HostAttr, PlanAttr
 from dbaas_nfsaas.models import HostAttr as HostAttrNfsaas
 from workflow.steps.util.base import BaseInstanceStep
 
 
 class PlanStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(PlanStep, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(PlanStep, self).__init__(instance, context)
 
         self.host = self.instance.hostname
-        self.host_cs = HostAttr.objects.get(host=self.host)
+        self.host_cs = self.context.host_attr(self.host)
 
         try:
             self.host_nfs = HostAttrNfsaas.objects.get(host=self.host)
@@ -21,7 +20,7 @@ class PlanStep(BaseInstanceStep):
         self.database = self.instance.databaseinfra.databases.first()
 
         self.new_plan = self.instance.databaseinfra.plan.engine_equivalent_plan
-        self.cs_plan = PlanAttr.objects.get(plan=self.new_plan)
+        self.cs_plan = self.context.plan_attr(self.new_plan)
 
     @property
     def script_variables(self):
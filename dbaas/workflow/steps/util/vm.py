@@ -1,9 +1,7 @@
 # -*- coding: utf-8 -*-
 from time import sleep
 from util import check_ssh
-from dbaas_cloudstack.models import HostAttr, PlanAttr
-from dbaas_cloudstack.provider import CloudStackProvider
-from dbaas_credentials.credential import Credential
+from util.ssh_pool import evict_host
 from dbaas_credentials.models import CredentialType
 from workflow.steps.util.base import BaseInstanceStep
 from maintenance.models import DatabaseResize
@@ -15,21 +13,20 @@ CHANGE_MASTER_SECONDS = 15
 
 class VmStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(VmStep, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(VmStep, self).__init__(instance, context)
 
-        integration = CredentialType.objects.get(
-            type=CredentialType.CLOUDSTACK
-        )
         environment = self.instance.databaseinfra.environment
-        self.credentials = Credential.get_credentials(environment, integration)
+        self.credentials = self.context.credentials(
+            environment, CredentialType.CLOUDSTACK
+        )
 
-        self.provider = CloudStackProvider(credentials=self.credentials)
+        self.provider = self.context.cloudstack_provider(environment)
         self.host = self.instance.hostname
-        self.host_cs = HostAttr.objects.get(host=self.host)
+        self.host_cs = self.context.host_attr(self.host)
 
         self.infra = self.instance.databaseinfra
-        self.driver = self.infra.get_driver()
+        self.driver = self.context.driver(self.infra)
 
     def do(self):
         raise NotImplementedError
@@ -45,6 +42,7 @@ class Stop(VmStep):
 
     def do(self):
         stopped = self.provider.stop_virtual_machine(self.host_cs.vm_id)
+        evict_host(self.host.address)
         if not stopped:
             raise EnvironmentError("Could not stop VM")
 
@@ -62,11 +60,11 @@ class Start(VmStep):
 
 class InstallNewTemplate(VmStep):
 
-    def __init__(self, instance):
-        super(InstallNewTemplate, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(InstallNewTemplate, self).__init__(instance, context)
 
         target_plan = self.instance.databaseinfra.plan.engine_equivalent_plan
-        cs_plan = PlanAttr.objects.get(plan=target_plan)
+        cs_plan = self.context.plan_attr(target_plan)
         self.bundle = cs_plan.bundle.first()
 
     def __unicode__(self):
@@ -76,6 +74,7 @@ class InstallNewTemplate(VmStep):
         reinstall = self.provider.reinstall_new_template(
             self.host_cs.vm_id, self.bundle.templateid
         )
+        evict_host(self.host.address)
         if not reinstall:
             raise EnvironmentError('Could not reinstall VM')
 
@@ -96,6 +95,8 @@ class WaitingBeReady(VmStep):
 
 class UpdateOSDescription(VmStep):
 
+    parallel = True
+
     def __unicode__(self):
         return "Updating instance OS description..."
 
@@ -105,8 +106,8 @@ class UpdateOSDescription(VmStep):
 
 class ChangeOffering(VmStep):
 
-    def __init__(self, instance):
-        super(ChangeOffering, self).__init__(instance)
+    def __init__(self, instance, context=None):
+        super(ChangeOffering, self).__init__(instance, context)
 
         database = self.instance.databaseinfra.databases.last()
         target_offer = DatabaseResize.current_to(database).target_offer
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-from dbaas_credentials.credential import Credential
 from dbaas_credentials.models import CredentialType
 from dbaas_zabbix import factory_for
 from workflow.steps.util.base import BaseInstanceStep
@@ -7,12 +6,15 @@ from workflow.steps.util.base import BaseInstanceStep
 
 class ZabbixStep(BaseInstanceStep):
 
-    def __init__(self, instance):
-        super(ZabbixStep, self).__init__(instance)
+    parallel = True
+
+    def __init__(self, instance, context=None):
+        super(ZabbixStep, self).__init__(instance, context)
 
-        integration = CredentialType.objects.get(type=CredentialType.ZABBIX)
         environment = self.instance.databaseinfra.environment
-        self.credentials = Credential.get_credentials(environment, integration)
+        self.credentials = self.context.credentials(
+            environment, CredentialType.ZABBIX
+        )
         self.instances = self.instance.hostname.instances.all()
 
         self.zabbix_provider = factory_for(
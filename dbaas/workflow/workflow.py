@@ -1,14 +1,109 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
 import time
+from contextlib import contextmanager
+from datetime import datetime
 from util import full_stack
 from django.utils.module_loading import import_by_path
+from drivers.circuit_breaker import bypass as bypass_circuit_breakers
 from exceptions.error_codes import DBAAS_0001
+from notification.models import StepExecution
+from system.models import Configuration
+from util.parallel import run_in_parallel
+from util.wait import wait_until
+from .context import WorkflowContext
+from .graph import StepGraph, run_step_graph
 
 LOG = logging.getLogger(__name__)
 
+# Instances running an instance-parallel group of steps at the same time
+DEFAULT_PARALLEL_INSTANCES = 3
+# Steps of a workflow with dependencies running at the same time
+DEFAULT_GRAPH_WORKERS = 4
+# Seconds waited for replication before and for a new master after a switch
+SWITCH_MASTER_WAIT = 60
+# Failed workflows with a checkpoint keep what was done to be resumed,
+# opt-in since the kept VMs, DNS, VIP and exports stay until someone
+# resumes or rolls them back
+DEFAULT_RESUMABLE_WORKFLOWS = 0
+
+
+def step_context(workflow_dict):
+    """ Plan and environment that the workflow is running for """
+    infra = workflow_dict.get('databaseinfra')
+    plan = workflow_dict.get('plan') or workflow_dict.get('source_plan')
+    if not plan and infra:
+        plan = infra.plan
+    environment = workflow_dict.get('environment')
+    if not environment and infra:
+        environment = infra.environment
+    return plan, environment
+
+
+@contextmanager
+def step_timing(step, task=None, plan=None, environment=None,
+                is_rollback=False):
+    """
+    Registers a StepExecution with how long the block took. Steps bypass
+    the driver circuit breakers, they check databases being started,
+    stopped or restored on purpose
+    """
+    started_at = datetime.now()
+    outcome = StepExecution.SUCCESS
+    try:
+        with bypass_circuit_breakers():
+            yield
+    except Exception:
+        outcome = StepExecution.ERROR
+        raise
+    finally:
+        StepExecution.register(
+            step=step, started_at=started_at, ended_at=datetime.now(),
+            outcome=outcome, task=task, plan=plan, environment=environment,
+            is_rollback=is_rollback
+        )
+
+
+def is_resumable_workflows():
+    return Configuration.get_by_name_as_int(
+        'resumable_workflows', default=DEFAULT_RESUMABLE_WORKFLOWS
+    ) == 1
+
+
+def is_step_done(step, workflow_dict):
+    """ Steps done by a previous run of a resumed workflow """
+    return step in (workflow_dict.get('done_steps') or ())
+
+
+def stop_or_keep_workflow(workflow_dict, task, checkpoint, failed_steps):
+    """
+    Keeps what was done when the workflow can be resumed by its checkpoint,
+    otherwise undoes it
+    """
+    if checkpoint and is_resumable_workflows():
+        checkpoint.set_error(failed_steps)
+        if task:
+            task.update_details(
+                persist=True,
+                details="\nWorkflow stopped, it can be resumed from {} or "
+                        "rolled back".format(", ".join(failed_steps))
+            )
+        return
+
+    stop_workflow(workflow_dict, task)
+    if checkpoint:
+        checkpoint.set_rolled_back()
+
+
+def start_workflow(workflow_dict, task=None, checkpoint=None):
+    """
+    With a checkpoint the state is saved after each step, steps listed in
+    workflow_dict 'done_steps' (done by a previous run) are skipped
+    """
+    if workflow_dict.get('dependencies'):
+        return start_workflow_graph(workflow_dict, task, checkpoint)
 
-def start_workflow(workflow_dict, task=None):
     try:
         if 'steps' not in workflow_dict:
             return False
@@ -38,16 +133,28 @@ def start_workflow(workflow_dict, task=None):
                 workflow_dict['msgs'].append(msg)
                 task.update_details(persist=True, details=msg)
 
-            if not my_instance.do(workflow_dict):
-                workflow_dict['status'] = 0
-                raise Exception(
-                    "We caught an error while executing the steps...")
+            if is_step_done(step, workflow_dict):
+                if task:
+                    task.update_details(persist=False, details="ALREADY DONE")
+                continue
+
+            plan, environment = step_context(workflow_dict)
+            with step_timing(step, task, plan, environment):
+                if not my_instance.do(workflow_dict):
+                    workflow_dict['status'] = 0
+                    raise Exception(
+                        "We caught an error while executing the steps...")
+
+            if checkpoint:
+                checkpoint.step_done(step, workflow_dict)
 
             workflow_dict['status'] = 1
             if task:
-                task.update_details(persist=True, details="DONE!")
+                task.update_details(persist=False, details="DONE!")
 
         workflow_dict['created'] = True
+        if checkpoint:
+            checkpoint.set_success()
         return True
 
     except Exception:
@@ -64,11 +171,109 @@ def start_workflow(workflow_dict, task=None):
 
         workflow_dict['steps'] = workflow_dict[
             'steps'][:workflow_dict['step_counter']]
-        stop_workflow(workflow_dict, task)
+        stop_or_keep_workflow(
+            workflow_dict, task, checkpoint, workflow_dict['steps'][-1:]
+        )
 
         return False
 
 
+def get_graph_workers():
+    return Configuration.get_by_name_as_int(
+        'workflow_graph_workers', default=DEFAULT_GRAPH_WORKERS
+    )
+
+
+def start_workflow_graph(workflow_dict, task=None, checkpoint=None):
+    """
+    Runs each step once the steps it depends on (workflow_dict
+    'dependencies', see StepGraph) are done, at most 'workflow_graph_workers'
+    steps at the same time. On errors the failed steps and the ones done are
+    undone in the reverse order they finished
+    """
+    if 'steps' not in workflow_dict:
+        return False
+
+    workflow_dict['step_counter'] = 0
+    workflow_dict['msgs'] = []
+    workflow_dict['status'] = 0
+    workflow_dict['total_steps'] = len(workflow_dict['steps'])
+    workflow_dict['exceptions'] = {}
+    workflow_dict['exceptions']['traceback'] = []
+    workflow_dict['exceptions']['error_codes'] = []
+
+    graph = StepGraph(workflow_dict['steps'], workflow_dict['dependencies'])
+    counter_lock = threading.Lock()
+
+    def execute_step(step):
+        my_class = import_by_path(step)
+        my_instance = my_class()
+
+        with counter_lock:
+            workflow_dict['step_counter'] += 1
+            step_counter = workflow_dict['step_counter']
+
+        time_now = str(time.strftime("%m/%d/%Y %H:%M:%S"))
+        msg = "\n%s - Step %i of %i - %s" % (
+            time_now, step_counter, workflow_dict['total_steps'], str(my_instance))
+
+        LOG.info(msg)
+
+        if task:
+            workflow_dict['msgs'].append(msg)
+            task.update_details(persist=True, details=msg)
+
+        if is_step_done(step, workflow_dict):
+            if task:
+                task.update_details(
+                    persist=False, details="%s ALREADY DONE" % str(my_instance)
+                )
+            return
+
+        plan, environment = step_context(workflow_dict)
+        with step_timing(step, task, plan, environment):
+            if not my_instance.do(workflow_dict):
+                raise Exception(
+                    "We caught an error while executing the steps...")
+
+        if checkpoint:
+            checkpoint.step_done(step, workflow_dict)
+
+        if task:
+            # Other steps may have written after this one started
+            task.update_details(
+                persist=False, details="%s DONE!" % str(my_instance)
+            )
+
+    completed, failed = run_step_graph(graph, execute_step, get_graph_workers())
+    if not failed:
+        workflow_dict['status'] = 1
+        workflow_dict['created'] = True
+        if checkpoint:
+            checkpoint.set_success()
+        return True
+
+    if not workflow_dict['exceptions']['error_codes'] or not workflow_dict['exceptions']['traceback']:
+        workflow_dict['exceptions']['error_codes'].append(DBAAS_0001)
+        workflow_dict['exceptions']['traceback'].append(failed[0][2])
+
+    LOG.warn("\n".join(": ".join(error)
+                       for error in workflow_dict['exceptions']['error_codes']))
+    LOG.warn("\nException Traceback\n".join(
+        workflow_dict['exceptions']['traceback']))
+
+    # stop_workflow undoes from the last step to the first
+    workflow_dict['steps'] = tuple(completed) + tuple(
+        step for step, _, _ in failed
+    )
+    workflow_dict['step_counter'] = len(workflow_dict['steps'])
+    stop_or_keep_workflow(
+        workflow_dict, task, checkpoint, [step for step, _, _ in failed]
+    )
+
+    return False
+
+
 def stop_workflow(workflow_dict, task=None):
     LOG.info("Running undo...")
 
@@ -106,10 +311,12 @@ def stop_workflow(workflow_dict, task=None):
                 workflow_dict['msgs'].append(msg)
                 task.update_details(persist=True, details=msg)
 
-            my_instance.undo(workflow_dict)
+            plan, environment = step_context(workflow_dict)
+            with step_timing(step, task, plan, environment, is_rollback=True):
+                my_instance.undo(workflow_dict)
 
             if task:
-                task.update_details(persist=True, details="DONE!")
+                task.update_details(persist=False, details="DONE!")
 
         return True
     except Exception as e:
@@ -128,6 +335,30 @@ def stop_workflow(workflow_dict, task=None):
         return False
 
 
+def switch_master(driver, instance):
+    """
+    Moves the master role away from instance, waiting at most
+    SWITCH_MASTER_WAIT seconds for the replication to be ready before the
+    switch and for another instance to be elected master after it
+    """
+    def new_master():
+        master = driver.get_master_instance()
+        return master if master and master != instance else None
+
+    wait_until(
+        lambda: driver.is_replication_ok(instance),
+        timeout=SWITCH_MASTER_WAIT, ignore_errors=True,
+        description='Replication of {}'.format(instance)
+    )
+    driver.check_replication_and_switch(instance)
+    wait_until(
+        new_master, timeout=SWITCH_MASTER_WAIT,
+        ignore_errors=True, description='New master of {}'.format(
+            driver.databaseinfra
+        )
+    )
+
+
 def start_workflow_ha(workflow_dict, task=None):
     if 'steps' not in workflow_dict:
         return False
@@ -145,11 +376,7 @@ def start_workflow_ha(workflow_dict, task=None):
             workflow_dict['host'] = instance.hostname
 
             if workflow_dict['databaseinfra'].plan.is_ha and workflow_dict['driver'].check_instance_is_master(instance):
-                LOG.info("Waiting 60s to check continue...")
-                time.sleep(60)
-                workflow_dict['driver'].check_replication_and_switch(instance)
-                LOG.info("Waiting 60s to check continue...")
-                time.sleep(60)
+                switch_master(workflow_dict['driver'], instance)
 
             for step in workflow_dict['steps']:
                 workflow_dict['global_step_counter'] += 1
@@ -199,11 +426,7 @@ def stop_workflow_ha(workflow_dict, task=None):
             workflow_dict['host'] = instance.hostname
 
             if workflow_dict['databaseinfra'].plan.is_ha and workflow_dict['driver'].check_instance_is_master(instance):
-                LOG.info("Waiting 60s to check continue...")
-                time.sleep(60)
-                workflow_dict['driver'].check_replication_and_switch(instance)
-                LOG.info("Waiting 60s to check continue...")
-                time.sleep(60)
+                switch_master(workflow_dict['driver'], instance)
 
             for step in workflow_dict['steps'][::-1]:
                 execute(step, workflow_dict, True, task)
@@ -289,17 +512,97 @@ def execute(step, workflow_dict, is_rollback, task):
         workflow_dict['msgs'].append(msg)
         task.update_details(persist=True, details=msg)
 
-    if is_rollback:
-        my_instance.undo(workflow_dict)
-    else:
-        if not my_instance.do(workflow_dict):
-            workflow_dict['status'] = 0
-            raise Exception(
-                "We caught an error while executing the steps...")
-        workflow_dict['status'] = 1
+    plan, environment = step_context(workflow_dict)
+    with step_timing(step, task, plan, environment, is_rollback):
+        if is_rollback:
+            my_instance.undo(workflow_dict)
+        else:
+            if not my_instance.do(workflow_dict):
+                workflow_dict['status'] = 0
+                raise Exception(
+                    "We caught an error while executing the steps...")
+            workflow_dict['status'] = 1
 
     if task:
-        task.update_details(persist=True, details="DONE!")
+        task.update_details(persist=False, details="DONE!")
+
+
+def get_parallel_instances():
+    return Configuration.get_by_name_as_int(
+        'workflow_parallel_instances', default=DEFAULT_PARALLEL_INSTANCES
+    )
+
+
+def is_instance_parallel(steps):
+    """ A group of steps runs on all instances at once when every step can """
+    return all(getattr(import_by_path(step), 'parallel', False) for step in steps)
+
+
+def run_instance_step(
+        step, instance, task, step_current, steps_total, since_step=0,
+        in_parallel=False, context=None
+):
+    step_class = import_by_path(step)
+    step_instance = step_class(instance, context)
+
+    # Lines of instances running at the same time are mixed in the output
+    prefix = '{} - '.format(instance) if in_parallel else ''
+    task.add_step(
+        step_current, steps_total, '{}{}'.format(prefix, step_instance)
+    )
+
+    if step_current < since_step:
+        task.update_details("{}SKIPPED!".format(prefix))
+        return
+
+    infra = instance.databaseinfra
+    with step_timing(step, task, infra.plan, infra.environment):
+        step_instance.do()
+    task.update_details("{}SUCCESS!".format(prefix))
+
+
+def steps_for_instances_in_parallel(
+        steps, instances, task, step_first, steps_total,
+        step_counter_method=None, since_step=0, context=None
+):
+    """
+    Runs the steps on 'workflow_parallel_instances' instances at the same
+    time, the steps of each instance keep their order. Instances are
+    numbered as if they had run one after another
+    """
+    if step_counter_method:
+        # A retry runs the whole group again
+        step_counter_method(max(step_first + 1, since_step))
+
+    task.add_detail('Running on {} instances at the same time'.format(
+        min(len(instances), get_parallel_instances())
+    ))
+
+    def run(item):
+        index, instance = item
+        step_current = step_first + index * len(steps)
+        for step in steps:
+            step_current += 1
+            run_instance_step(
+                step, instance, task, step_current, steps_total, since_step,
+                in_parallel=True, context=context
+            )
+
+    results = run_in_parallel(
+        run, enumerate(instances), get_parallel_instances()
+    )
+
+    success = True
+    for result in results:
+        if result.succeeded:
+            continue
+        success = False
+        _, instance = result.item
+        task.update_details("{} - FAILED!".format(instance), persist=True)
+        task.add_detail(str(result.error))
+        task.add_detail(result.traceback)
+
+    return success
 
 
 def steps_for_instances(
@@ -311,6 +614,7 @@ def steps_for_instances(
 
     steps_total = steps_total * len(instances)
     step_current = 0
+    context = WorkflowContext()
 
     task.add_detail('Instances: {}'.format(len(instances)))
     for instance in instances:
@@ -325,31 +629,34 @@ def steps_for_instances(
             count, len(list_of_groups_of_steps), group_of_steps.keys()[0])
         )
         steps = group_of_steps.items()[0][1]
-        for instance in instances:
-            task.add_detail('Instance: {}'.format(instance))
-            for step in steps:
-                step_current += 1
-
-                if step_counter_method:
-                    step_counter_method(step_current)
-
-                try:
-                    step_class = import_by_path(step)
-                    step_instance = step_class(instance)
-
-                    task.add_step(step_current, steps_total, str(step_instance))
-
-                    if step_current < since_step:
-                        task.update_details("SKIPPED!", persist=True)
-                    else:
-                        step_instance.do()
-                        task.update_details("SUCCESS!", persist=True)
-
-                except Exception as e:
-                    task.update_details("FAILED!", persist=True)
-                    task.add_detail(str(e))
-                    task.add_detail(full_stack())
-                    return False
+
+        if len(instances) > 1 and is_instance_parallel(steps):
+            success = steps_for_instances_in_parallel(
+                steps, instances, task, step_current, steps_total,
+                step_counter_method, since_step, context
+            )
+            if not success:
+                return False
+            step_current += len(steps) * len(instances)
+        else:
+            for instance in instances:
+                task.add_detail('Instance: {}'.format(instance))
+                for step in steps:
+                    step_current += 1
+
+                    if step_counter_method:
+                        step_counter_method(step_current)
+
+                    try:
+                        run_instance_step(
+                            step, instance, task, step_current, steps_total,
+                            since_step, context=context
+                        )
+                    except Exception as e:
+                        task.update_details("FAILED!", persist=True)
+                        task.add_detail(str(e))
+                        task.add_detail(full_stack())
+                        return False
 
         task.add_detail('Ending group of steps: {} of {}\n'.format(
             count, len(list_of_groups_of_steps))